@@ -1,6 +1,18 @@
 from fastapi import APIRouter
 
-from app.routes import auth_route, user_route, province_route, user_travel_route
+from app.routes import (
+    admin_route,
+    auth_route,
+    booking_route,
+    coupon_route,
+    hotel_route,
+    operator_route,
+    province_route,
+    quote_route,
+    rights_route,
+    user_route,
+    user_travel_route,
+)
 
 api_router = APIRouter()
 
@@ -8,3 +20,10 @@ api_router.include_router(auth_route.router)
 api_router.include_router(user_route.router)
 api_router.include_router(user_travel_route.router)
 api_router.include_router(province_route.router)
+api_router.include_router(quote_route.router)
+api_router.include_router(coupon_route.router)
+api_router.include_router(operator_route.router)
+api_router.include_router(rights_route.router)
+api_router.include_router(hotel_route.router)
+api_router.include_router(booking_route.router)
+api_router.include_router(admin_route.router)
@@ -1,3 +1,4 @@
+from decimal import Decimal
 from typing import Literal
 from pydantic import (
     AnyUrl,
@@ -12,6 +13,8 @@ class AppConfig(BaseSettings):
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
     PROJECT_NAME: str = "THAI TRAVEL CO PAY"
     API_STR: str = "/api"
+    # * เขตเวลาของวันตามปฏิทินในโครงการ เช่น วันหมดอายุคูปอง ฐานข้อมูลเก็บเวลาเป็น UTC แบบ naive
+    TIMEZONE: str = "Asia/Bangkok"
 
     REFRESH_SECRET_KEY: str = "refresh_secret_key"
     REFRESH_TOKEN_EXPIRE: int = 10080
@@ -19,10 +22,74 @@ class AppConfig(BaseSettings):
     ACCESS_TOKEN_EXPIRE: int = 10080
     ALGORITHM: str = "HS256"
 
+    ADMIN_API_KEY: str = ""
+
+    PASSWORD_HASHING_POOL: Literal["thread", "process"] = "thread"
+    PASSWORD_HASHING_WORKERS: int = 4
+    PASSWORD_HASHING_QUEUE_LIMIT: int = 64
+    PASSWORD_HASHING_TIMEOUT: float = 5.0
+
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: float = 60.0
+    TOKEN_REVOCATION_POLL_INTERVAL_SECONDS: float = 2.0
+
+    CACHE_CONTROL_PROVINCES: str = "public, max-age=300"
+    CACHE_CONTROL_USER_TRAVELS: str = "private, no-cache"
+
+    PROVINCE_LIST_GZIP: bool = True
+
+    JSON_BACKEND: Literal["orjson", "stdlib"] = "orjson"
+
+    TRAVEL_PAGE_SIZE_DEFAULT: int = 50
+    TRAVEL_PAGE_SIZE_MAX: int = 200
+    TRAVEL_IMPORT_MAX_ROWS: int = 10000
+    TRAVEL_OVERLAP_PAGE_SIZE_DEFAULT: int = 1000
+    TRAVEL_OVERLAP_PAGE_SIZE_MAX: int = 10000
+    TRAVEL_SUMMARY_DAILY_SPEND: Decimal = Decimal("2000.00")
+
+    SUBSIDY_CAP_PER_NIGHT: Decimal = Decimal("3000.00")
+    # * สัดส่วนที่รัฐช่วยจ่ายตามประเภทเมือง แยกจาก tax_reduction_rate ซึ่งเป็นตัวคูณค่าลดหย่อนภาษี
+    SUBSIDY_RATE_MAIN_CITY: Decimal = Decimal("0.40")
+    SUBSIDY_RATE_SECONDARY_CITY: Decimal = Decimal("0.60")
+    QUOTE_BATCH_MAX_LINES: int = 100000
+
+    COUPON_AMOUNT: Decimal = Decimal("500.00")
+    COUPONS_PER_NIGHT: int = 1
+    COUPON_CODE_POOL_SIZE: int = 4096
+    COUPON_CODE_POOL_LOW_WATERMARK: int = 1024
+    COUPON_CODE_REFILL_BATCH: int = 512
+
+    RIGHTS_MAIN_CITY_QUOTA: int = 3
+    RIGHTS_SECONDARY_CITY_QUOTA: int = 2
+    RIGHTS_RESERVATION_TTL_SECONDS: int = 900
+    RIGHTS_SWEEP_INTERVAL_SECONDS: float = 30.0
+
+    SUBSIDY_BUDGET_SHARDS: int = 8
+    SUBSIDY_BUDGET_REBALANCE_INTERVAL_SECONDS: float = 60.0
+
+    PROJECT_CONFIG_POLL_INTERVAL_SECONDS: float = 5.0
+
+    BOOKING_MAX_NIGHTS: int = 30
+    ROOM_INVENTORY_MAX_DAYS: int = 366
+
     FRONTEND_URL: str = ""
     BACKEND_URL: list[AnyUrl] | str = []
 
     SQLITE_DATABASE_PATH: str = "instance.db"
+    SQLITE_ENGINE_PROFILE: Literal["legacy", "tuned"] = "tuned"
+    SQLITE_POOL_SIZE: int = 8
+    SQLITE_POOL_TIMEOUT: float = 30.0
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE: int = -65536
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_FOREIGN_KEYS: bool = True
+
+    GROUP_COMMIT_ENABLED: bool = False
+    GROUP_COMMIT_WINDOW_MS: float = 2.0
+    GROUP_COMMIT_MAX_BATCH: int = 64
 
     @computed_field
     @property
@@ -0,0 +1,316 @@
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+from fastapi import HTTPException
+from sqlalchemy import func, insert, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.configs.app_config import app_config
+from app.crud import budget_crud, province_crud, rights_crud
+from app.database.group_commit import run_write
+from app.models import (
+    Booking,
+    BookingStatusEnum,
+    BusinessTypeEnum,
+    Operator,
+    OperatorStatusEnum,
+    RoomInventory,
+)
+from app.schemas.quote_schema import QuoteLineIn
+from app.utils.project_settings import project_settings
+from app.utils.quote_engine import to_satang
+
+CANCELLABLE_STATUSES = (BookingStatusEnum.BOOKED, BookingStatusEnum.PAID)
+
+
+def stay_nights(check_in_date: date, check_out_date: date) -> int:
+    nights = (check_out_date - check_in_date).days
+    if nights < 1:
+        raise HTTPException(status_code=400, detail="Check-out date must be after check-in date")
+    if nights > app_config.BOOKING_MAX_NIGHTS:
+        raise HTTPException(
+            status_code=400, detail=f"Stays are limited to {app_config.BOOKING_MAX_NIGHTS} nights"
+        )
+    return nights
+
+
+def is_open_hotel(operator: Operator | None) -> bool:
+    return (
+        operator is not None
+        and operator.registration_status == OperatorStatusEnum.APPROVED
+        and operator.business_type == BusinessTypeEnum.HOTEL
+    )
+
+
+async def set_room_inventory(
+    db: AsyncSession,
+    operator_id: int,
+    start_date: date,
+    end_date: date,
+    total_rooms: int,
+    price_per_night: Decimal,
+) -> list[dict]:
+    """ตั้งจำนวนห้องและราคาทุกคืนตั้งแต่ start_date ถึง end_date ด้วย upsert เดียว
+
+    ห้องว่างเปลี่ยนตามส่วนต่างของจำนวนห้อง ห้องที่ถูกจองแล้วจึงยังถูกนับ
+    และลดจำนวนห้องต่ำกว่าที่จองไปแล้วไม่ได้
+    """
+    days = (end_date - start_date).days + 1
+    if days < 1:
+        raise HTTPException(status_code=400, detail="Start date cannot be after end date")
+    if days > app_config.ROOM_INVENTORY_MAX_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Inventory updates are limited to {app_config.ROOM_INVENTORY_MAX_DAYS} days",
+        )
+    stmt = sqlite_insert(RoomInventory).values(
+        [
+            {
+                "operator_id": operator_id,
+                "stay_date": start_date + timedelta(days=offset),
+                "total_rooms": total_rooms,
+                "available_rooms": total_rooms,
+                "price_per_night": price_per_night,
+            }
+            for offset in range(days)
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["operator_id", "stay_date"],
+        set_={
+            "total_rooms": stmt.excluded.total_rooms,
+            "available_rooms": RoomInventory.available_rooms
+            + stmt.excluded.total_rooms
+            - RoomInventory.total_rooms,
+            "price_per_night": stmt.excluded.price_per_night,
+        },
+    ).returning(*RoomInventory.__table__.columns)
+
+    async def unit(session: AsyncSession) -> list[dict]:
+        try:
+            result = await session.execute(stmt)
+        except IntegrityError:
+            raise HTTPException(
+                status_code=409, detail="Total rooms cannot be below rooms already booked"
+            )
+        return sorted((dict(row._mapping) for row in result), key=lambda row: row["stay_date"])
+
+    return await run_write(db, unit)
+
+
+async def get_room_inventory(
+    db: AsyncSession, operator_id: int, start_date: date, end_date: date
+) -> list[RoomInventory]:
+    result = await db.execute(
+        select(RoomInventory)
+        .where(
+            RoomInventory.operator_id == operator_id,
+            RoomInventory.stay_date >= start_date,
+            RoomInventory.stay_date <= end_date,
+        )
+        .order_by(RoomInventory.stay_date)
+    )
+    return list(result.scalars().all())
+
+
+def availability_query(
+    check_in_date: date, check_out_date: date, province_id: int | None = None, limit: int = 50
+):
+    """ที่พักที่มีห้องว่างครบทุกคืน: กรองช่วงวันที่และห้องว่างจาก index (stay_date, available_rooms)
+    แล้วนับคืนต่อที่พัก ต้องได้ครบจำนวนคืนจึงถือว่าว่าง
+    """
+    nights = (check_out_date - check_in_date).days
+    available = (
+        select(
+            RoomInventory.operator_id,
+            func.min(RoomInventory.available_rooms).label("available_rooms"),
+        )
+        .where(
+            RoomInventory.stay_date >= check_in_date,
+            RoomInventory.stay_date < check_out_date,
+            RoomInventory.available_rooms > 0,
+        )
+        .group_by(RoomInventory.operator_id)
+        .having(func.count() == nights)
+        .subquery()
+    )
+    query = (
+        select(
+            Operator.id.label("operator_id"),
+            Operator.business_name,
+            Operator.province_id,
+            available.c.available_rooms,
+        )
+        .join(available, available.c.operator_id == Operator.id)
+        .where(
+            Operator.registration_status == OperatorStatusEnum.APPROVED,
+            Operator.business_type == BusinessTypeEnum.HOTEL,
+        )
+        .order_by(available.c.available_rooms.desc(), Operator.id)
+        .limit(limit)
+    )
+    if province_id is not None:
+        query = query.where(Operator.province_id == province_id)
+    return query
+
+
+async def search_availability(
+    db: AsyncSession,
+    check_in_date: date,
+    check_out_date: date,
+    province_id: int | None = None,
+    limit: int = 50,
+) -> list[dict]:
+    stay_nights(check_in_date, check_out_date)
+    result = await db.execute(
+        availability_query(check_in_date, check_out_date, province_id=province_id, limit=limit)
+    )
+    return [dict(row._mapping) for row in result]
+
+
+async def create_booking(
+    db: AsyncSession,
+    tourist_id: int,
+    hotel_operator_id: int,
+    check_in_date: date,
+    check_out_date: date,
+) -> dict:
+    """จองหนึ่งห้องทุกคืนของการเข้าพักด้วย UPDATE แบบมีเงื่อนไขคำสั่งเดียว
+
+    UPDATE หักห้องว่างเฉพาะคืนที่ยังมีห้อง ถ้าจำนวนแถวที่หักได้ไม่เท่าจำนวนคืน
+    จะ raise ให้ write unit ถูก rollback ทั้งหมด จึงไม่มีการกันห้องไว้บางคืน
+    ราคารวมมาจากราคาของแต่ละคืนที่ RETURNING กลับมาในคำสั่งเดียวกัน
+    สิทธิ์ตามประเภทเมืองและงบส่วนที่รัฐช่วยจ่ายถูกหักใน write unit เดียวกัน
+    ถ้าอย่างใดไม่พอ การจองทั้งหมดจะถูก rollback
+    """
+    nights = stay_nights(check_in_date, check_out_date)
+
+    async def unit(session: AsyncSession) -> dict:
+        operator = await session.get(Operator, hotel_operator_id)
+        if not is_open_hotel(operator):
+            raise HTTPException(status_code=404, detail="Hotel not found")
+        province = await province_crud.get_province_by_id(session, operator.province_id)  # type: ignore
+        if province is None:
+            raise HTTPException(status_code=404, detail="Province not found")
+
+        result = await session.execute(
+            update(RoomInventory)
+            .where(
+                RoomInventory.operator_id == hotel_operator_id,
+                RoomInventory.stay_date >= check_in_date,
+                RoomInventory.stay_date < check_out_date,
+                RoomInventory.available_rooms > 0,
+            )
+            .values(available_rooms=RoomInventory.available_rooms - 1)
+            .returning(RoomInventory.price_per_night)
+            .execution_options(synchronize_session=False)
+        )
+        prices = result.scalars().all()
+        if len(prices) != nights:
+            raise HTTPException(
+                status_code=409, detail="No rooms available for every night of the stay"
+            )
+
+        line = QuoteLineIn(
+            province_id=province.id, nights=nights, total_cost=sum(prices, Decimal("0.00"))
+        )
+        quote = project_settings.current.quote_engine.quote(line, province)
+        await rights_crud.take_right(session, tourist_id, province.city_tier)
+        budget_shard_id = None
+        if quote.government_subsidy > 0:
+            budget_shard_id = await budget_crud.allocate_budget(
+                session, to_satang(quote.government_subsidy), key=tourist_id
+            )
+
+        result = await session.execute(
+            insert(Booking)
+            .values(
+                tourist_id=tourist_id,
+                hotel_operator_id=hotel_operator_id,
+                check_in_date=check_in_date,
+                check_out_date=check_out_date,
+                num_nights=nights,
+                total_cost=quote.total_cost,
+                subsidy_rate=quote.subsidy_rate,
+                government_subsidy=quote.government_subsidy,
+                tourist_payment=quote.tourist_payment,
+                booking_status=BookingStatusEnum.BOOKED,
+                city_tier=province.city_tier,
+                budget_shard_id=budget_shard_id,
+            )
+            .returning(*Booking.__table__.columns)
+        )
+        return dict(result.one()._mapping)
+
+    return await run_write(db, unit)
+
+
+async def get_user_bookings(db: AsyncSession, tourist_id: int) -> list[Booking]:
+    result = await db.execute(
+        select(Booking)
+        .where(Booking.tourist_id == tourist_id)
+        .order_by(Booking.check_in_date.desc(), Booking.id.desc())
+    )
+    return list(result.scalars().all())
+
+
+async def booking_not_cancellable_exception(
+    db: AsyncSession, id: int, tourist_id: int
+) -> HTTPException:
+    result = await db.execute(
+        select(Booking.booking_status).where(Booking.id == id, Booking.tourist_id == tourist_id)
+    )
+    status = result.scalar_one_or_none()
+    if status is None:
+        return HTTPException(status_code=404, detail="Booking not found or not authorized")
+    return HTTPException(status_code=409, detail=f"Booking is {status.value}")
+
+
+async def cancel_booking(db: AsyncSession, id: int, tourist_id: int) -> None:
+    """ยกเลิกการจองที่ยังไม่เช็คอินแล้วคืนห้องว่างทุกคืน สิทธิ์ และงบ ใน transaction เดียวกัน"""
+
+    async def unit(session: AsyncSession) -> None:
+        result = await session.execute(
+            update(Booking)
+            .where(
+                Booking.id == id,
+                Booking.tourist_id == tourist_id,
+                Booking.booking_status.in_(CANCELLABLE_STATUSES),
+            )
+            .values(booking_status=BookingStatusEnum.CANCELLED)
+            .returning(
+                Booking.hotel_operator_id,
+                Booking.check_in_date,
+                Booking.check_out_date,
+                Booking.government_subsidy,
+                Booking.city_tier,
+                Booking.budget_shard_id,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        booking = result.one_or_none()
+        if booking is None:
+            raise await booking_not_cancellable_exception(session, id, tourist_id)
+
+        await session.execute(
+            update(RoomInventory)
+            .where(
+                RoomInventory.operator_id == booking.hotel_operator_id,
+                RoomInventory.stay_date >= booking.check_in_date,
+                RoomInventory.stay_date < booking.check_out_date,
+            )
+            .values(available_rooms=RoomInventory.available_rooms + 1)
+            .execution_options(synchronize_session=False)
+        )
+        # * การจองที่สร้างก่อนมีการหักสิทธิ์และงบจะไม่มีค่าเหล่านี้ จึงไม่มีอะไรต้องคืน
+        if booking.city_tier is not None:
+            await rights_crud.restore_rights(session, Counter({(tourist_id, booking.city_tier): 1}))
+        if booking.budget_shard_id is not None:
+            await budget_crud.release_budget(
+                session, to_satang(booking.government_subsidy), booking.budget_shard_id
+            )
+
+    await run_write(db, unit)
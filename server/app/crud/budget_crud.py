@@ -0,0 +1,208 @@
+from decimal import Decimal
+from fastapi import HTTPException
+from sqlalchemy import bindparam, delete, func, insert, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.database.group_commit import run_write
+from app.models import BudgetShard, ProjectConfig
+from app.utils.quote_engine import from_satang, to_satang
+
+BUDGET_TOTAL_KEY = "subsidy_budget_total"
+
+
+def budget_exhausted_exception() -> HTTPException:
+    return HTTPException(status_code=409, detail="Subsidy budget exhausted")
+
+
+async def get_budget_total(db: AsyncSession) -> int | None:
+    result = await db.execute(
+        select(ProjectConfig.config_value).where(ProjectConfig.config_key == BUDGET_TOTAL_KEY)
+    )
+    value = result.scalar_one_or_none()
+    return to_satang(Decimal(value)) if value is not None else None
+
+
+async def get_budget_status(db: AsyncSession) -> dict:
+    total = await get_budget_total(db) or 0
+    result = await db.execute(
+        select(BudgetShard.id, BudgetShard.remaining_satang).order_by(BudgetShard.id)
+    )
+    shards = result.all()
+    remaining = sum(shard.remaining_satang for shard in shards)
+    return {
+        "total": from_satang(total),
+        "remaining": from_satang(remaining),
+        "allocated": from_satang(total - remaining),
+        "shards": [
+            {"id": shard.id, "remaining": from_satang(shard.remaining_satang)} for shard in shards
+        ],
+    }
+
+
+def split_evenly(amount: int, parts: int) -> list[int]:
+    share, extra = divmod(amount, parts)
+    return [share + (1 if index < extra else 0) for index in range(parts)]
+
+
+async def configure_budget(db: AsyncSession, total: Decimal, shards: int) -> dict:
+    """ตั้งงบรวมของโครงการและจำนวน shard ยอดที่จัดสรรไปแล้วยังคงนับอยู่"""
+
+    async def unit(session: AsyncSession) -> None:
+        current_total = await get_budget_total(session) or 0
+        current_remaining = await session.scalar(
+            select(func.coalesce(func.sum(BudgetShard.remaining_satang), 0))
+        )
+        allocated = current_total - current_remaining
+        remaining = to_satang(total) - allocated
+        if remaining < 0:
+            raise HTTPException(
+                status_code=409, detail="Budget total is below the amount already allocated"
+            )
+
+        await session.execute(delete(BudgetShard))
+        await session.execute(
+            insert(BudgetShard),
+            [
+                {"id": id, "remaining_satang": share}
+                for id, share in enumerate(split_evenly(remaining, shards))
+            ],
+        )
+        stmt = sqlite_insert(ProjectConfig).values(
+            config_key=BUDGET_TOTAL_KEY,
+            config_value=str(total),
+            description="งบประมาณส่วนที่รัฐช่วยจ่ายทั้งโครงการ (บาท)",
+        )
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["config_key"], set_={"config_value": stmt.excluded.config_value}
+            )
+        )
+
+    await run_write(db, unit)
+    return await get_budget_status(db)
+
+
+async def _take_from_shard(session: AsyncSession, shard_id, amount: int) -> int | None:
+    result = await session.execute(
+        update(BudgetShard)
+        .where(BudgetShard.id == shard_id, BudgetShard.remaining_satang >= amount)
+        .values(remaining_satang=BudgetShard.remaining_satang - amount)
+        .returning(BudgetShard.id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one_or_none()
+
+
+async def allocate_budget(session: AsyncSession, amount: int, key: int) -> int:
+    """หักงบ amount สตางค์จาก shard ของ key ด้วย UPDATE แบบมีเงื่อนไข คืน id ของ shard ที่หัก
+
+    ใช้ภายใน write unit เดียวกับการจอง ทุก shard หักได้เฉพาะเมื่อยอดคงเหลือพอ
+    ผลรวมที่จัดสรรจึงไม่มีทางเกินงบรวม ถ้า shard ของตัวเองไม่พอจะลอง shard ที่เหลือมากที่สุด
+    และถ้ายังไม่พอแต่ยอดรวมพอ จะรวมงบทั้งหมดไว้ที่ shard เดียวก่อนลองอีกครั้ง
+    """
+    shard_count = select(func.count(BudgetShard.id)).scalar_subquery()
+    shard_id = await _take_from_shard(session, key % shard_count, amount)
+    if shard_id is not None:
+        return shard_id
+
+    largest = (
+        select(BudgetShard.id)
+        .order_by(BudgetShard.remaining_satang.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    shard_id = await _take_from_shard(session, largest, amount)
+    if shard_id is not None:
+        return shard_id
+
+    if await consolidate_budget(session) < amount:
+        raise budget_exhausted_exception()
+    shard_id = await _take_from_shard(session, largest, amount)
+    if shard_id is None:
+        raise budget_exhausted_exception()
+    return shard_id
+
+
+async def release_budget(session: AsyncSession, amount: int, shard_id: int) -> None:
+    """คืนงบ (เช่น ยกเลิกการจอง) กลับเข้า shard เดิม
+
+    ถ้า shard เดิมถูกลบไปแล้วเพราะตั้งงบใหม่ด้วยจำนวน shard ที่น้อยลง
+    จะคืนเข้า shard ที่เหลือน้อยที่สุดแทน ยอดรวมจึงไม่หายไป
+    """
+    result = await session.execute(
+        update(BudgetShard)
+        .where(BudgetShard.id == shard_id)
+        .values(remaining_satang=BudgetShard.remaining_satang + amount)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        return
+
+    smallest = (
+        select(BudgetShard.id)
+        .order_by(BudgetShard.remaining_satang, BudgetShard.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        update(BudgetShard)
+        .where(BudgetShard.id == smallest)
+        .values(remaining_satang=BudgetShard.remaining_satang + amount)
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        raise HTTPException(status_code=409, detail="Subsidy budget is not configured")
+
+
+async def _set_shards(session: AsyncSession, shares: list[tuple[int, int]]) -> None:
+    table = BudgetShard.__table__
+    await session.execute(
+        update(table)
+        .where(table.c.id == bindparam("b_id"))
+        .values(remaining_satang=bindparam("b_remaining")),
+        [{"b_id": id, "b_remaining": remaining} for id, remaining in shares],
+    )
+
+
+async def consolidate_budget(session: AsyncSession) -> int:
+    """ย้ายงบคงเหลือทั้งหมดไปไว้ที่ shard ที่มากที่สุด คืนยอดรวม (ต้องอยู่ใน write transaction)"""
+    result = await session.execute(
+        select(BudgetShard.id, BudgetShard.remaining_satang).order_by(
+            BudgetShard.remaining_satang.desc()
+        )
+    )
+    shards = result.all()
+    remaining = sum(shard.remaining_satang for shard in shards)
+    if shards:
+        await _set_shards(
+            session,
+            [(shard.id, remaining if index == 0 else 0) for index, shard in enumerate(shards)],
+        )
+    return remaining
+
+
+async def rebalance_budget(db: AsyncSession) -> int:
+    """กระจายงบคงเหลือให้ทุก shard เท่ากัน อ่านและเขียนใน write transaction เดียว
+    ยอดรวมจึงไม่เปลี่ยนระหว่างกระจาย คืนจำนวน shard ที่ยอดเปลี่ยน
+    """
+
+    async def unit(session: AsyncSession) -> int:
+        result = await session.execute(
+            select(BudgetShard.id, BudgetShard.remaining_satang).order_by(BudgetShard.id)
+        )
+        shards = result.all()
+        if not shards:
+            return 0
+        shares = split_evenly(sum(shard.remaining_satang for shard in shards), len(shards))
+        changed = [
+            (shard.id, share)
+            for shard, share in zip(shards, shares)
+            if shard.remaining_satang != share
+        ]
+        if changed:
+            await _set_shards(session, changed)
+        return len(changed)
+
+    return await run_write(db, unit)
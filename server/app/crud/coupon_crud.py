@@ -0,0 +1,169 @@
+from datetime import date, datetime, time, timezone
+from zoneinfo import ZoneInfo
+from fastapi import HTTPException
+from decimal import Decimal
+from sqlalchemy import Row, exists, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.configs.app_config import app_config
+from app.database.group_commit import run_write
+from app.models import Booking, BookingStatusEnum, CouponStatusEnum, CouponTransaction, ECoupon
+from app.utils.coupon_pool import coupon_code_pool
+from app.utils.project_settings import project_settings
+
+
+def end_of_local_day_utc(day: date) -> datetime:
+    """สิ้นวัน day ตามเขตเวลาของโครงการ แปลงเป็น UTC แบบ naive ให้เทียบกับเวลาในฐานข้อมูลได้"""
+    end_of_day = datetime.combine(day, time.max, tzinfo=ZoneInfo(app_config.TIMEZONE))
+    return end_of_day.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+async def get_issuable_booking(db: AsyncSession, booking_id: int) -> Booking:
+    booking = await db.get(Booking, booking_id)
+    if booking is None:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    if booking.booking_status != BookingStatusEnum.CHECKED_IN:
+        raise HTTPException(status_code=409, detail="Coupons are issued only after check-in")
+    if await db.scalar(select(exists().where(ECoupon.booking_id == booking_id))):
+        raise HTTPException(status_code=409, detail="Coupons already issued for this booking")
+    return booking
+
+
+async def issue_booking_coupons(
+    read_db: AsyncSession, write_db: AsyncSession, booking_id: int
+) -> list[dict]:
+    """ออกคูปองทั้งหมดของการจองที่เช็คอินแล้วด้วย INSERT เดียว รหัสมาจาก pool ที่ตรวจซ้ำไว้ล่วงหน้า
+
+    ตรวจการจองและดึงรหัสจาก pool ก่อนเข้า write unit ถ้า pool ต้องเติมรหัส การสุ่มและ query
+    ตรวจซ้ำจะไม่เกิดขึ้นระหว่างถือ connection เดียวของ writer ถ้าออกไม่สำเร็จจะคืนรหัสเข้า pool
+    """
+    booking = await get_issuable_booking(read_db, booking_id)
+    settings = project_settings.current
+    count = booking.num_nights * settings.coupons_per_night
+    codes = await coupon_code_pool.take(count)  # type: ignore
+
+    async def unit(session: AsyncSession) -> list[dict]:
+        # * ตรวจซ้ำใน transaction เดียวกับ INSERT ซึ่งถือ write lock อยู่แล้ว จึงออกซ้ำไม่ได้
+        booking = await get_issuable_booking(session, booking_id)
+        if booking.num_nights * settings.coupons_per_night != count:
+            raise HTTPException(status_code=409, detail="Booking changed, please try again")
+
+        issue_date = datetime.now(timezone.utc).date()
+        # * คูปองใช้ได้ถึงสิ้นวันเช็คเอาท์ตามเวลาท้องถิ่น
+        expiry_datetime = end_of_local_day_utc(booking.check_out_date)  # type: ignore
+        rows = [
+            {
+                "booking_id": booking.id,
+                "tourist_id": booking.tourist_id,
+                "coupon_code": code,
+                "amount": settings.coupon_amount,
+                "issue_date": issue_date,
+                "expiry_datetime": expiry_datetime,
+                "status": CouponStatusEnum.ACTIVE,
+            }
+            for code in codes
+        ]
+        result = await session.execute(insert(ECoupon).returning(*ECoupon.__table__.columns), rows)
+        return sorted((dict(row._mapping) for row in result), key=lambda row: row["id"])
+
+    try:
+        return await run_write(write_db, unit)
+    except HTTPException:
+        # * unit ปฏิเสธก่อน INSERT รหัสยังไม่ถูกใช้ คืนเข้า pool ได้ ส่วน error อื่นอาจมาจากรหัสชน
+        # * unique constraint จึงทิ้งรหัสชุดนั้นไป
+        coupon_code_pool.put_back(codes)
+        raise
+
+
+async def get_user_coupons(db: AsyncSession, user_id: int) -> list[ECoupon]:
+    result = await db.execute(
+        select(ECoupon).where(ECoupon.tourist_id == user_id).order_by(ECoupon.id)
+    )
+    return list(result.scalars().all())
+
+
+async def find_coupon_transaction(
+    db: AsyncSession, operator_id: int, idempotency_key: str
+) -> Row | None:
+    result = await db.execute(
+        select(*CouponTransaction.__table__.columns, ECoupon.coupon_code)
+        .join(ECoupon, ECoupon.id == CouponTransaction.coupon_id)
+        .where(
+            CouponTransaction.service_operator_id == operator_id,
+            CouponTransaction.idempotency_key == idempotency_key,
+        )
+    )
+    return result.one_or_none()
+
+
+async def coupon_not_redeemable_exception(db: AsyncSession, coupon_code: str) -> HTTPException:
+    result = await db.execute(
+        select(ECoupon.status, ECoupon.expiry_datetime).where(ECoupon.coupon_code == coupon_code)
+    )
+    coupon = result.one_or_none()
+    if coupon is None:
+        return HTTPException(status_code=404, detail="Coupon not found")
+    if coupon.status == CouponStatusEnum.ACTIVE:
+        return HTTPException(status_code=410, detail="Coupon expired")
+    return HTTPException(status_code=409, detail=f"Coupon is {coupon.status.value}")
+
+
+async def redeem_coupon(
+    db: AsyncSession,
+    operator_id: int,
+    coupon_code: str,
+    total_amount: Decimal,
+    idempotency_key: str | None = None,
+) -> tuple[dict, bool]:
+    """ใช้คูปองด้วย UPDATE แบบมีเงื่อนไขคำสั่งเดียว แล้วบันทึก transaction ใน transaction เดียวกัน
+
+    ไม่มีการอ่านสถานะก่อนเขียน คำขอที่แย่งคูปองเดียวกันจะมีเพียงคำขอเดียวที่ UPDATE ได้แถว
+    ส่วนคำขอที่ส่ง Idempotency-Key ซ้ำจะได้ผลเดิมกลับไป (replayed=True) แทน error
+    """
+
+    async def unit(session: AsyncSession) -> tuple[dict, bool]:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        result = await session.execute(
+            update(ECoupon)
+            .where(
+                ECoupon.coupon_code == coupon_code,
+                ECoupon.status == CouponStatusEnum.ACTIVE,
+                ECoupon.expiry_datetime > now,
+            )
+            .values(status=CouponStatusEnum.USED)
+            .returning(ECoupon.id, ECoupon.amount)
+            .execution_options(synchronize_session=False)
+        )
+        coupon = result.one_or_none()
+
+        if coupon is None:
+            # * คำขอที่ส่งซ้ำหลังจากครั้งแรกสำเร็จแล้ว จะมาถึงตรงนี้เพราะคูปองเป็น USED ไปแล้ว
+            if idempotency_key is not None:
+                previous = await find_coupon_transaction(session, operator_id, idempotency_key)
+                if previous is not None and previous.coupon_code == coupon_code:
+                    return dict(previous._mapping), True
+            raise await coupon_not_redeemable_exception(session, coupon_code)
+
+        try:
+            result = await session.execute(
+                insert(CouponTransaction)
+                .values(
+                    coupon_id=coupon.id,
+                    service_operator_id=operator_id,
+                    idempotency_key=idempotency_key,
+                    total_amount=total_amount,
+                    discount_applied=min(coupon.amount, total_amount),
+                    transaction_time=now,
+                )
+                .returning(*CouponTransaction.__table__.columns)
+            )
+        except IntegrityError:
+            # * key นี้เคยใช้กับคูปองอื่นแล้ว การ UPDATE ด้านบนจะถูก rollback ไปพร้อมกัน
+            raise HTTPException(
+                status_code=422, detail="Idempotency-Key was already used for another coupon"
+            )
+        return {**result.one()._mapping, "coupon_code": coupon_code}, False
+
+    return await run_write(db, unit)
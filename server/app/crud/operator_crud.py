@@ -0,0 +1,9 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import Operator
+
+
+async def get_operator_by_user_id(db: AsyncSession, user_id: int) -> Operator | None:
+    result = await db.execute(select(Operator).filter(Operator.user_id == user_id))
+    return result.scalars().first()
@@ -0,0 +1,33 @@
+from fastapi import HTTPException
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.group_commit import run_write
+from app.models import ProjectConfig
+from app.utils.project_settings import SETTING_TYPES, parse_setting
+
+
+async def set_project_config(
+    db: AsyncSession, key: str, value: str, description: str | None = None
+) -> None:
+    """บันทึกค่าตั้งค่าที่รู้จักหลังตรวจชนิดแล้ว trigger จะเพิ่ม version ให้ worker อื่นโหลดใหม่เอง"""
+    if key not in SETTING_TYPES:
+        raise HTTPException(status_code=404, detail=f"Unknown config key: {key}")
+    try:
+        parse_setting(key, value)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    values = {"config_key": key, "config_value": value}
+    if description is not None:
+        values["description"] = description
+    stmt = sqlite_insert(ProjectConfig).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["config_key"],
+        set_={name: stmt.excluded[name] for name in values if name != "config_key"},
+    )
+
+    async def unit(session: AsyncSession) -> None:
+        await session.execute(stmt)
+
+    await run_write(db, unit)
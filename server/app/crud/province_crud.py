@@ -1,32 +1,35 @@
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
 from app.models import Province, CityTierEnum
 from app.schemas.province_schema import ProvinceCreate
+from app.utils.province_catalogue import CatalogueSnapshot, ProvinceRecord, province_catalogue
 
 
-async def get_province_by_id(db: AsyncSession, province_id: int) -> Province | None:
-    result = await db.execute(select(Province).filter(Province.id == province_id))
-    return result.scalars().first()
+async def get_catalogue(db: AsyncSession) -> CatalogueSnapshot:
+    return await province_catalogue.get(db)
 
 
-async def get_province_by_name_th(db: AsyncSession, name_th: str) -> Province | None:
-    result = await db.execute(select(Province).filter(Province.name_th == name_th))
-    return result.scalars().first()
+async def get_province_by_id(db: AsyncSession, province_id: int) -> ProvinceRecord | None:
+    catalogue = await province_catalogue.get(db)
+    return catalogue.by_id.get(province_id)
+
+
+async def get_province_by_name_th(db: AsyncSession, name_th: str) -> ProvinceRecord | None:
+    catalogue = await province_catalogue.get(db)
+    return catalogue.by_name_th.get(name_th)
 
 
 async def get_all_provinces(
     db: AsyncSession, city_tier: CityTierEnum | None = None
-) -> list[Province]:
-    query = select(Province)
+) -> list[ProvinceRecord]:
+    catalogue = await province_catalogue.get(db)
     if city_tier:
-        query = query.filter(Province.city_tier == city_tier)
-    result = await db.execute(query)
-    return list(result.scalars().all())
+        return list(catalogue.by_tier[city_tier])
+    return list(catalogue.records)
 
 
-async def create_province(db: AsyncSession, province: ProvinceCreate) -> Province:
+async def create_province(db: AsyncSession, province: ProvinceCreate) -> ProvinceRecord:
     existing_province = await get_province_by_name_th(db, province.name_th)
     if existing_province:
         raise HTTPException(status_code=409, detail="Province with this Thai name already exists")
@@ -35,4 +38,7 @@ async def create_province(db: AsyncSession, province: ProvinceCreate) -> Provinc
     db.add(db_province)
     await db.commit()
     await db.refresh(db_province)
-    return db_province
+
+    record = ProvinceRecord.from_province(db_province)
+    province_catalogue.add(record)
+    return record
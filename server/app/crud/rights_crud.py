@@ -0,0 +1,221 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.database.group_commit import run_write
+from app.models import (
+    CityTierEnum,
+    RightsReservation,
+    RightsReservationStatusEnum,
+    TouristRight,
+)
+from app.utils.project_settings import project_settings
+from app.utils.province_catalogue import ProvinceRecord
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def initial_rights() -> dict[CityTierEnum, int]:
+    settings = project_settings.current
+    return {
+        CityTierEnum.MAIN: settings.rights_main_city_quota,
+        CityTierEnum.SECONDARY: settings.rights_secondary_city_quota,
+    }
+
+
+async def ensure_tourist_rights(db: AsyncSession, user_id: int) -> None:
+    """สร้างสิทธิ์ตั้งต้นของผู้ใช้ถ้ายังไม่มี แถวที่มีอยู่แล้วไม่ถูกแตะ"""
+    await db.execute(
+        sqlite_insert(TouristRight)
+        .values(
+            [
+                {"user_id": user_id, "city_tier": city_tier, "remaining": remaining}
+                for city_tier, remaining in initial_rights().items()
+            ]
+        )
+        .on_conflict_do_nothing()
+    )
+
+
+async def get_tourist_rights(db: AsyncSession, user_id: int) -> dict[CityTierEnum, dict]:
+    rights = {
+        city_tier: {"city_tier": city_tier, "remaining": remaining, "held": 0}
+        for city_tier, remaining in initial_rights().items()
+    }
+    result = await db.execute(
+        select(TouristRight.city_tier, TouristRight.remaining).where(
+            TouristRight.user_id == user_id
+        )
+    )
+    for city_tier, remaining in result:
+        rights[city_tier]["remaining"] = remaining
+
+    result = await db.execute(
+        select(RightsReservation.city_tier).where(
+            RightsReservation.user_id == user_id,
+            RightsReservation.status == RightsReservationStatusEnum.HELD,
+        )
+    )
+    for city_tier in result.scalars():
+        rights[city_tier]["held"] += 1
+    return rights
+
+
+async def take_right(session: AsyncSession, user_id: int, city_tier: CityTierEnum) -> None:
+    """หักสิทธิ์ 1 ครั้งด้วย UPDATE แบบมีเงื่อนไข remaining > 0 ใช้ภายใน write unit"""
+
+    async def decrement() -> bool:
+        result = await session.execute(
+            update(TouristRight)
+            .where(
+                TouristRight.user_id == user_id,
+                TouristRight.city_tier == city_tier,
+                TouristRight.remaining > 0,
+            )
+            .values(remaining=TouristRight.remaining - 1)
+            .returning(TouristRight.remaining)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalar_one_or_none() is not None
+
+    if not await decrement():
+        # * ผู้ใช้ที่ยังไม่เคยจองจะยังไม่มีแถวสิทธิ์ สร้างแล้วลองหักอีกครั้ง
+        await ensure_tourist_rights(session, user_id)
+        if not await decrement():
+            raise HTTPException(
+                status_code=409, detail=f"No {city_tier.value.lower()} city rights remaining"
+            )
+
+
+async def reserve_right(db: AsyncSession, user_id: int, province: ProvinceRecord) -> dict:
+    """หักสิทธิ์ 1 ครั้งด้วย UPDATE แบบมีเงื่อนไข remaining > 0 แล้วบันทึกการจองพร้อมเวลาหมดอายุ
+
+    ไม่มีการอ่านยอดก่อนหัก คำขอพร้อมกันจึงได้สิทธิ์ไม่เกินจำนวนที่เหลือจริง
+    และ write lock ถูกถือไว้แค่สองคำสั่งสั้นๆ
+    """
+
+    async def unit(session: AsyncSession) -> dict:
+        await take_right(session, user_id, province.city_tier)
+
+        now = utc_now()
+        ttl = project_settings.current.rights_reservation_ttl_seconds
+        result = await session.execute(
+            insert(RightsReservation)
+            .values(
+                user_id=user_id,
+                province_id=province.id,
+                city_tier=province.city_tier,
+                status=RightsReservationStatusEnum.HELD,
+                expires_at=now + timedelta(seconds=ttl),
+                created_at=now,
+            )
+            .returning(*RightsReservation.__table__.columns)
+        )
+        return dict(result.one()._mapping)
+
+    return await run_write(db, unit)
+
+
+async def reservation_not_held_exception(db: AsyncSession, id: int, user_id: int) -> HTTPException:
+    result = await db.execute(
+        select(RightsReservation.status).where(
+            RightsReservation.id == id, RightsReservation.user_id == user_id
+        )
+    )
+    status = result.scalar_one_or_none()
+    if status is None:
+        return HTTPException(status_code=404, detail="Reservation not found or not authorized")
+    if status == RightsReservationStatusEnum.HELD:
+        return HTTPException(status_code=410, detail="Reservation expired")
+    return HTTPException(status_code=409, detail=f"Reservation is {status.value}")
+
+
+async def confirm_reservation(db: AsyncSession, id: int, user_id: int) -> dict:
+    async def unit(session: AsyncSession) -> dict:
+        result = await session.execute(
+            update(RightsReservation)
+            .where(
+                RightsReservation.id == id,
+                RightsReservation.user_id == user_id,
+                RightsReservation.status == RightsReservationStatusEnum.HELD,
+                RightsReservation.expires_at > utc_now(),
+            )
+            .values(status=RightsReservationStatusEnum.CONFIRMED)
+            .returning(*RightsReservation.__table__.columns)
+            .execution_options(synchronize_session=False)
+        )
+        row = result.one_or_none()
+        if row is None:
+            raise await reservation_not_held_exception(session, id, user_id)
+        return dict(row._mapping)
+
+    return await run_write(db, unit)
+
+
+async def release_reservation(db: AsyncSession, id: int, user_id: int) -> None:
+    async def unit(session: AsyncSession) -> None:
+        result = await session.execute(
+            update(RightsReservation)
+            .where(
+                RightsReservation.id == id,
+                RightsReservation.user_id == user_id,
+                RightsReservation.status == RightsReservationStatusEnum.HELD,
+            )
+            .values(status=RightsReservationStatusEnum.RELEASED)
+            .returning(RightsReservation.city_tier)
+            .execution_options(synchronize_session=False)
+        )
+        city_tier = result.scalar_one_or_none()
+        if city_tier is None:
+            raise await reservation_not_held_exception(session, id, user_id)
+        await restore_rights(session, Counter({(user_id, city_tier): 1}))
+
+    await run_write(db, unit)
+
+
+async def restore_rights(db: AsyncSession, counts: Counter) -> None:
+    if not counts:
+        return
+    # * ใช้ Table ตรงๆ ให้เป็น executemany ของ Core ไม่ใช่ ORM bulk update ตาม primary key
+    table = TouristRight.__table__
+    await db.execute(
+        update(table)
+        .where(
+            table.c.user_id == bindparam("b_user_id"),
+            table.c.city_tier == bindparam("b_city_tier"),
+        )
+        .values(remaining=table.c.remaining + bindparam("b_count")),
+        [
+            {"b_user_id": user_id, "b_city_tier": city_tier, "b_count": count}
+            for (user_id, city_tier), count in counts.items()
+        ],
+    )
+
+
+async def release_expired_reservations(db: AsyncSession, now: datetime | None = None) -> int:
+    """ปล่อยการจองที่หมดเวลาทั้งหมดในครั้งเดียว: UPDATE เดียวเปลี่ยนสถานะ
+    แล้วคืนสิทธิ์ด้วย executemany หนึ่งแถวต่อ (ผู้ใช้, ประเภทเมือง) แทนทีละการจอง
+    """
+
+    async def unit(session: AsyncSession) -> int:
+        result = await session.execute(
+            update(RightsReservation)
+            .where(
+                RightsReservation.status == RightsReservationStatusEnum.HELD,
+                RightsReservation.expires_at <= (now or utc_now()),
+            )
+            .values(status=RightsReservationStatusEnum.RELEASED)
+            .returning(RightsReservation.user_id, RightsReservation.city_tier)
+            .execution_options(synchronize_session=False)
+        )
+        counts = Counter((user_id, city_tier) for user_id, city_tier in result)
+        await restore_rights(session, counts)
+        return sum(counts.values())
+
+    return await run_write(db, unit)
@@ -1,9 +1,29 @@
 # crud/user_crud.py
-from fastapi import HTTPException
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, or_, update
 from sqlalchemy.future import select
+from app.database.group_commit import run_write
 from app.models import User
 from app.schemas.user_schema import UserCreate
+from app.utils.principal_cache import principal_cache
+
+REGISTRATION_CONFLICT_DETAILS = {
+    "email": "Email already registered",
+    "phone_number": "Phone number already registered",
+    "citizen_id": "Citizen id already registered",
+}
+
+# * ชื่อ constraint/index ที่ SQLite (table.column) และ PostgreSQL รายงานเมื่อค่าซ้ำ
+UNIQUE_CONSTRAINT_FIELDS = {
+    "users.email": "email",
+    "ix_users_email": "email",
+    "users.phone_number": "phone_number",
+    "users_phone_number_key": "phone_number",
+    "users.citizen_id": "citizen_id",
+    "ix_users_citizen_id": "citizen_id",
+}
 
 
 async def get_user_by_email(db: AsyncSession, email: str):
@@ -21,32 +41,103 @@ async def get_user_by_citizen_id(db: AsyncSession, citizen_id: str) -> User | No
     return result.scalars().first()
 
 
-async def create_user(db: AsyncSession, user: UserCreate, password_hash: str):
-    db_user = User(
-        email=user.email,
-        phone_number=user.phone_number,
-        citizen_id=user.citizen_id,
-        password_hash=password_hash,
-        first_name_th=user.first_name_th,
-        last_name_th=user.last_name_th,
-        user_type=user.user_type,
-        agreed_to_terms=user.agreed_to_terms,
+async def get_registration_conflict(db: AsyncSession, user: UserCreate) -> str | None:
+    """ตรวจ email/เบอร์โทร/เลขบัตรซ้ำใน query เดียว คืนชื่อ field ที่ซ้ำตามลำดับความสำคัญ"""
+    result = await db.execute(
+        select(User.email, User.phone_number, User.citizen_id)
+        .filter(
+            or_(
+                User.email == user.email.lower(),
+                User.phone_number == user.phone_number,
+                User.citizen_id == user.citizen_id,
+            )
+        )
+        .limit(3)
     )
-    db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
+    rows = result.all()
+    for field in REGISTRATION_CONFLICT_DETAILS:
+        value = user.email.lower() if field == "email" else getattr(user, field)
+        if any(getattr(row, field) == value for row in rows):
+            return field
+    return None
+
+
+def registration_conflict_exception(field: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT, detail=REGISTRATION_CONFLICT_DETAILS[field]
+    )
+
+
+async def create_user(db: AsyncSession, user: UserCreate, password_hash: str):
+    try:
+        result = await db.execute(
+            insert(User)
+            .values(
+                email=user.email,
+                phone_number=user.phone_number,
+                citizen_id=user.citizen_id,
+                password_hash=password_hash,
+                first_name_th=user.first_name_th,
+                last_name_th=user.last_name_th,
+                user_type=user.user_type,
+                agreed_to_terms=user.agreed_to_terms,
+            )
+            .returning(User)
+        )
+        db_user = result.scalar_one()
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        message = str(e.orig)
+        for constraint, field in UNIQUE_CONSTRAINT_FIELDS.items():
+            if constraint in message:
+                raise registration_conflict_exception(field)
+        raise
     return db_user
 
 
 async def pin_setup(db: AsyncSession, id: int, pin_hash: str):
+    async def unit(session: AsyncSession) -> User:
+        result = await session.execute(select(User).where(User.id == id))
+        db_user = result.scalar_one_or_none()
+        if not db_user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        setattr(db_user, "pin_hash", pin_hash)
+
+        session.add(db_user)
+        await session.flush()
+        await session.refresh(db_user)
+        return db_user
+
+    db_user = await run_write(db, unit)
+    principal_cache.invalidate_user(id)
+    return db_user
+
+
+async def set_user_active(db: AsyncSession, id: int, is_active: bool):
     result = await db.execute(select(User).where(User.id == id))
     db_user = result.scalar_one_or_none()
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    setattr(db_user, "pin_hash", pin_hash)
+    if db_user.is_active != is_active:
+        setattr(db_user, "is_active", is_active)
+        setattr(db_user, "token_version", User.token_version + 1)
+        db.add(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+        principal_cache.invalidate_user(id, token_version=db_user.token_version)  # type: ignore
+    return db_user
+
 
-    db.add(db_user)
+async def bump_token_version(db: AsyncSession, id: int) -> None:
+    result = await db.execute(
+        update(User)
+        .where(User.id == id)
+        .values(token_version=User.token_version + 1)
+        .returning(User.token_version)
+    )
+    token_version = result.scalar_one_or_none()
     await db.commit()
-    await db.refresh(db_user)
-    return db_user
+    principal_cache.invalidate_user(id, token_version=token_version)
@@ -1,40 +1,176 @@
+from datetime import date, datetime, timedelta, timezone
 from fastapi import HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Integer, Row, cast, delete, func, insert, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 
 
-from app.models import UserTravel
-from app.schemas.user_travel_schema import UserTravelCreate, UserTravelUpdate
+from app.database.group_commit import run_write
+from app.models import Province, UserTravel, UserTravelSummary
+from app.schemas.user_travel_schema import OverlapPolicyEnum, UserTravelCreate, UserTravelUpdate
+from app.utils.intervals import sweep_overlaps
+from app.utils.province_catalogue import ProvinceRecord
 
+OVERLAPPING_TRAVELS_HEADER = "X-Overlapping-Travels"
 
-async def create_user_travel(
-    db: AsyncSession, user_id: int, user_travel: UserTravelCreate
-) -> UserTravel:
-    db_travel = UserTravel(
-        user_id=user_id,
-        province_id=user_travel.province_id,
-        start_date=user_travel.start_date,
-        end_date=user_travel.end_date,
-        notes=user_travel.notes,
+
+def travel_with_province(row: Row, province: ProvinceRecord) -> dict:
+    return {**row._mapping, "province": province}
+
+
+def travel_overlap_exception(overlapping_ids: list[int]) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail="Travel dates overlap with existing travel plans",
+        headers={OVERLAPPING_TRAVELS_HEADER: ",".join(map(str, overlapping_ids))},
     )
-    db.add(db_travel)
-    await db.commit()
-    await db.refresh(db_travel)
-    result = await db.execute(
-        select(UserTravel)
-        .options(selectinload(UserTravel.province))
-        .filter(UserTravel.id == db_travel.id)
+
+
+async def find_overlapping_travel_ids(
+    db: AsyncSession,
+    user_id: int,
+    start_date: date,
+    end_date: date,
+    exclude_id: int | None = None,
+) -> list[int]:
+    """ช่วง [start, end] ทับกันเมื่อ start <= end ของอีกฝั่ง และ end >= start ของอีกฝั่ง
+    เรียงตามคอลัมน์ของ ix_user_travels_user_id_start_date_end_date ให้ SQLite ใช้เป็น covering index
+    """
+    query = (
+        select(UserTravel.id)
+        .where(
+            UserTravel.user_id == user_id,
+            UserTravel.start_date <= end_date,
+            UserTravel.end_date >= start_date,
+        )
+        .order_by(UserTravel.start_date, UserTravel.end_date, UserTravel.id)
     )
-    db_travel_with_province = result.scalar_one_or_none()
+    if exclude_id is not None:
+        query = query.where(UserTravel.id != exclude_id)
 
-    if not db_travel_with_province:
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to retrieve created user travel plan with province data after creation.",
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def create_user_travel(
+    db: AsyncSession,
+    user_id: int,
+    user_travel: UserTravelCreate,
+    province: ProvinceRecord,
+    on_overlap: OverlapPolicyEnum = OverlapPolicyEnum.REJECT,
+) -> tuple[dict, list[int]]:
+    """INSERT ... RETURNING แถวเดียว ใช้ province จาก catalogue ที่ route ตรวจไว้แล้ว
+    คืน id ของแผนที่วันทับกันด้วย (ถ้า on_overlap เป็น report)
+    """
+
+    async def unit(session: AsyncSession) -> tuple[Row, list[int]]:
+        # * ตรวจใน transaction เดียวกับ INSERT ให้ writer ตัวเดียวกันเป็นผู้ตัดสิน ไม่เกิด race
+        overlapping_ids = await find_overlapping_travel_ids(
+            session, user_id, user_travel.start_date, user_travel.end_date
         )
+        if overlapping_ids and on_overlap == OverlapPolicyEnum.REJECT:
+            raise travel_overlap_exception(overlapping_ids)
+
+        result = await session.execute(
+            insert(UserTravel)
+            .values(
+                user_id=user_id,
+                province_id=user_travel.province_id,
+                start_date=user_travel.start_date,
+                end_date=user_travel.end_date,
+                notes=user_travel.notes,
+            )
+            .returning(*UserTravel.__table__.columns)
+        )
+        return result.one(), overlapping_ids
+
+    row, overlapping_ids = await run_write(db, unit)
+    return travel_with_province(row, province), overlapping_ids
+
 
-    return db_travel_with_province
+async def bulk_create_user_travels(
+    db: AsyncSession,
+    user_id: int,
+    user_travels: list[UserTravelCreate],
+    on_overlap: OverlapPolicyEnum = OverlapPolicyEnum.REJECT,
+) -> list[tuple[int | None, list[int]]]:
+    """เพิ่มแผนการเดินทางหลายรายการด้วย executemany ใน transaction เดียว
+
+    ตรวจวันทับกันทั้งกับแผนที่มีอยู่และระหว่างแถวที่นำเข้าด้วย sweep ครั้งเดียว
+    on_overlap เป็น reject จะข้ามแถวที่ทับกับแผนที่มีอยู่หรือกับแถวก่อนหน้าที่รับไว้แล้ว
+    ส่วน report เพิ่มทุกแถว คืน (id หรือ None ถ้าถูกข้าม, id ของแผนที่ทับกัน) ตามลำดับที่ส่งมา
+    """
+    if not user_travels:
+        return []
+
+    async def unit(session: AsyncSession) -> list[tuple[int | None, list[int]]]:
+        # * อ่านแผนเดิมใน transaction เดียวกับ INSERT ให้ writer ตัวเดียวกันเป็นผู้ตัดสิน ไม่เกิด race
+        result = await session.execute(
+            select(UserTravel.id, UserTravel.start_date, UserTravel.end_date).where(
+                UserTravel.user_id == user_id,
+                UserTravel.start_date <= max(travel.end_date for travel in user_travels),
+                UserTravel.end_date >= min(travel.start_date for travel in user_travels),
+            )
+        )
+        # * แถวที่นำเข้าใช้ id ติดลบ (-1 - index) เพื่อแยกจาก id ของแผนที่มีอยู่
+        intervals = sorted(
+            [
+                *result.all(),
+                *(
+                    (-1 - index, travel.start_date, travel.end_date)
+                    for index, travel in enumerate(user_travels)
+                ),
+            ],
+            key=lambda interval: (interval[1], interval[2], interval[0]),
+        )
+        overlaps: list[list[int]] = [[] for _ in user_travels]
+        for overlap in sweep_overlaps(intervals):
+            for id, other_id in ((overlap.id, overlap.other_id), (overlap.other_id, overlap.id)):
+                if id < 0:
+                    overlaps[-1 - id].append(other_id)
+
+        accepted = [True] * len(user_travels)
+        if on_overlap == OverlapPolicyEnum.REJECT:
+            for index, others in enumerate(overlaps):
+                accepted[index] = not any(
+                    other_id >= 0 or (-1 - other_id < index and accepted[-1 - other_id])
+                    for other_id in others
+                )
+
+        new_ids: dict[int, int] = {}
+        rows = [index for index, ok in enumerate(accepted) if ok]
+        if rows:
+            result = await session.execute(
+                insert(UserTravel).returning(UserTravel.id),
+                [
+                    {
+                        "user_id": user_id,
+                        "province_id": user_travels[index].province_id,
+                        "start_date": user_travels[index].start_date,
+                        "end_date": user_travels[index].end_date,
+                        "notes": user_travels[index].notes,
+                    }
+                    for index in rows
+                ],
+            )
+            # * SQLite ไม่รับประกันลำดับแถวของ RETURNING แต่ rowid ถูกแจกเรียงตามลำดับ VALUES ภายใน
+            # * transaction ของ writer เดียว การเรียง id จึงได้ลำดับเดียวกับข้อมูลที่ส่งมา
+            new_ids = {-1 - index: id for index, id in zip(rows, sorted(result.scalars().all()))}
+
+        return [
+            (
+                new_ids.get(-1 - index),
+                sorted(
+                    new_ids[other_id] if other_id < 0 else other_id
+                    for other_id in others
+                    if other_id >= 0 or other_id in new_ids
+                ),
+            )
+            for index, others in enumerate(overlaps)
+        ]
+
+    return await run_write(db, unit)
 
 
 async def get_user_travel_by_id(db: AsyncSession, id: int, user_id: int) -> UserTravel | None:
@@ -46,36 +182,222 @@ async def get_user_travel_by_id(db: AsyncSession, id: int, user_id: int) -> User
     return result.scalars().first()
 
 
-async def get_user_travels_by_user_id(db: AsyncSession, user_id: int) -> list[UserTravel]:
-    result = await db.execute(
+async def get_user_travels_by_user_id(
+    db: AsyncSession,
+    user_id: int,
+    limit: int,
+    after: tuple[date, int] | None = None,
+    from_date: date | None = None,
+    to_date: date | None = None,
+) -> tuple[list[UserTravel], tuple[date, int] | None]:
+    """Keyset pagination เรียงตาม (start_date, id) ใช้ index ix_user_travels_user_id_start_date_id
+
+    from_date/to_date เลือกเฉพาะแผนที่มีวันอยู่ในช่วง [from_date, to_date]
+    """
+    query = (
         select(UserTravel)
         .options(selectinload(UserTravel.province))
         .filter(UserTravel.user_id == user_id)
+        .order_by(UserTravel.start_date, UserTravel.id)
+        .limit(limit + 1)
     )
-    return list(result.scalars().all())
+    if after is not None:
+        query = query.filter(tuple_(UserTravel.start_date, UserTravel.id) > tuple_(*after))
+    if from_date is not None:
+        query = query.filter(UserTravel.end_date >= from_date)
+    if to_date is not None:
+        query = query.filter(UserTravel.start_date <= to_date)
+
+    result = await db.execute(query)
+    travels = list(result.scalars().all())
+
+    next_key = None
+    if len(travels) > limit:
+        travels = travels[:limit]
+        next_key = (travels[-1].start_date, travels[-1].id)
+    return travels, next_key  # type: ignore
+
+
+async def get_user_travel_calendar(
+    db: AsyncSession, user_id: int, month_start: date, month_end: date
+) -> dict[int, list[date]]:
+    """วันที่อยู่ในแผนการเดินทางของแต่ละจังหวัดภายในเดือน
+
+    ดึงเฉพาะแผนที่ทับเดือนนั้นด้วย range scan บน (user_id, start_date, end_date)
+    แล้วตัดช่วงให้อยู่ในเดือน จำนวนวันที่ต้องกระจายจึงไม่เกิน 31 ต่อแผน
+    """
+    result = await db.execute(
+        select(UserTravel.province_id, UserTravel.start_date, UserTravel.end_date).where(
+            UserTravel.user_id == user_id,
+            UserTravel.start_date <= month_end,
+            UserTravel.end_date >= month_start,
+        )
+    )
+
+    days: dict[int, set[date]] = {}
+    for province_id, start_date, end_date in result:
+        day = max(start_date, month_start)
+        last_day = min(end_date, month_end)
+        province_days = days.setdefault(province_id, set())
+        while day <= last_day:
+            province_days.add(day)
+            day += timedelta(days=1)
+
+    return {province_id: sorted(province_days) for province_id, province_days in days.items()}
+
+
+async def get_user_travels_fingerprint(db: AsyncSession, user_id: int) -> tuple:
+    result = await db.execute(
+        select(
+            func.count(UserTravel.id),
+            func.max(UserTravel.id),
+            func.max(UserTravel.created_at),
+            func.max(UserTravel.updated_at),
+        ).filter(UserTravel.user_id == user_id)
+    )
+    return tuple(result.one())
 
 
 async def update_user_travel(
-    db: AsyncSession, id: int, user_id: int, travel_update: UserTravelUpdate
-) -> UserTravel:
-    db_travel = await get_user_travel_by_id(db, id, user_id)
-    if not db_travel:
-        raise HTTPException(status_code=404, detail="Travel  not found or not authorized")
+    db: AsyncSession,
+    id: int,
+    user_id: int,
+    travel_update: UserTravelUpdate,
+    province: ProvinceRecord,
+    on_overlap: OverlapPolicyEnum = OverlapPolicyEnum.REJECT,
+) -> tuple[dict, list[int]]:
+    async def unit(session: AsyncSession) -> tuple[Row | None, list[int]]:
+        overlapping_ids = await find_overlapping_travel_ids(
+            session, user_id, travel_update.start_date, travel_update.end_date, exclude_id=id
+        )
+        if overlapping_ids and on_overlap == OverlapPolicyEnum.REJECT:
+            raise travel_overlap_exception(overlapping_ids)
 
-    for field, value in travel_update.dict(exclude_unset=True).items():
-        setattr(db_travel, field, value)
+        result = await session.execute(
+            update(UserTravel)
+            .where(UserTravel.id == id, UserTravel.user_id == user_id)
+            .values(
+                **travel_update.dict(exclude_unset=True),
+                # * ตั้งเวลาละเอียดระดับไมโครวินาที เพื่อให้ ETag ของรายการเปลี่ยนแม้แก้ไขภายในวินาทีเดียวกัน
+                updated_at=datetime.now(timezone.utc),
+            )
+            .returning(*UserTravel.__table__.columns)
+            .execution_options(synchronize_session=False)
+        )
+        return result.one_or_none(), overlapping_ids
 
-    db.add(db_travel)
-    await db.commit()
-    await db.refresh(db_travel)
-    return db_travel
+    row, overlapping_ids = await run_write(db, unit)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Travel  not found or not authorized")
+    return travel_with_province(row, province), overlapping_ids
 
 
 async def delete_user_travel(db: AsyncSession, id: int, user_id: int):
-    db_travel = await get_user_travel_by_id(db, id, user_id)
-    if not db_travel:
-        raise HTTPException(status_code=404, detail="Travel  not found or not authorized")
+    async def unit(session: AsyncSession) -> int | None:
+        result = await session.execute(
+            delete(UserTravel)
+            .where(UserTravel.id == id, UserTravel.user_id == user_id)
+            .returning(UserTravel.id)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalar_one_or_none()
 
-    await db.delete(db_travel)
-    await db.commit()
+    if await run_write(db, unit) is None:
+        raise HTTPException(status_code=404, detail="Travel  not found or not authorized")
     return {"message": "Travel  deleted successfully"}
+
+
+async def find_all_travel_overlaps(
+    db: AsyncSession, limit: int, after_user_id: int | None = None
+) -> tuple[dict, int | None]:
+    """รายงานแผนการเดินทางที่วันทับกันของผู้ใช้ทุกคน แบ่งหน้าแบบ keyset ตาม user_id
+
+    อ่านแบบ stream เรียงตาม (user_id, start_date) จาก index แล้ว sweep ทีละผู้ใช้
+    หน้าหนึ่งจบเมื่อมีรายการครบ limit หลังจบผู้ใช้คนล่าสุด รายการของผู้ใช้คนเดียวไม่ถูกแบ่งข้ามหน้า
+    หน้าหนึ่งจึงอาจเกิน limit ได้ไม่เกินจำนวนรายการของผู้ใช้คนสุดท้ายในหน้า
+    """
+    stmt = select(UserTravel.user_id, UserTravel.id, UserTravel.start_date, UserTravel.end_date)
+    if after_user_id is not None:
+        stmt = stmt.where(UserTravel.user_id > after_user_id)
+    result = await db.stream(
+        stmt.order_by(
+            UserTravel.user_id, UserTravel.start_date, UserTravel.end_date, UserTravel.id
+        ).execution_options(yield_per=1000)
+    )
+
+    users = travels = 0
+    overlaps: list[dict] = []
+    current_user_id = None
+    next_user_id = None
+    intervals: list[tuple[int, date, date]] = []
+
+    def flush() -> None:
+        for overlap in sweep_overlaps(intervals):
+            overlaps.append(
+                {
+                    "user_id": current_user_id,
+                    "travel_id": overlap.id,
+                    "other_travel_id": overlap.other_id,
+                    "overlap_start": overlap.start_date,
+                    "overlap_end": overlap.end_date,
+                }
+            )
+
+    try:
+        async for user_id, travel_id, start_date, end_date in result:
+            if user_id != current_user_id:
+                flush()
+                if len(overlaps) >= limit:
+                    next_user_id = current_user_id
+                    break
+                current_user_id = user_id
+                intervals = []
+                users += 1
+            intervals.append((travel_id, start_date, end_date))
+            travels += 1
+        else:
+            flush()
+    finally:
+        await result.close()
+
+    return {"users": users, "travels": travels, "overlaps": overlaps}, next_user_id
+
+
+async def get_user_travel_summary(db: AsyncSession, user_id: int) -> list[UserTravelSummary]:
+    """อ่านสรุปที่ trigger ของ user_travels ปรับไว้แล้ว ไม่ต้องโหลดแผนการเดินทางทุกรายการ"""
+    result = await db.execute(
+        select(UserTravelSummary)
+        .where(UserTravelSummary.user_id == user_id)
+        .order_by(UserTravelSummary.city_tier)
+    )
+    return list(result.scalars().all())
+
+
+async def rebuild_user_travel_summaries(db: AsyncSession | AsyncConnection) -> int:
+    """คำนวณตารางสรุปใหม่ทั้งหมดด้วย aggregate ใน SQL ใช้กระทบยอดเมื่อสงสัยว่าค่าเพี้ยน
+    หรือหลังอัตราลดหย่อนของจังหวัดเปลี่ยน (trigger ไม่ย้อนคำนวณแผนเดิมให้)
+    """
+    days = (
+        cast(func.julianday(UserTravel.end_date) - func.julianday(UserTravel.start_date), Integer)
+        + 1
+    )
+    rate_points = cast(func.round(Province.tax_reduction_rate * 100), Integer)
+    aggregate = (
+        select(
+            UserTravel.user_id,
+            Province.city_tier,
+            func.count(UserTravel.id),
+            func.sum(days),
+            func.sum(days * rate_points),
+        )
+        .join(Province, Province.id == UserTravel.province_id)
+        .group_by(UserTravel.user_id, Province.city_tier)
+    )
+
+    await db.execute(delete(UserTravelSummary))
+    result = await db.execute(
+        insert(UserTravelSummary).from_select(
+            ["user_id", "city_tier", "trips", "travel_days", "rate_day_points"], aggregate
+        )
+    )
+    return result.rowcount
@@ -0,0 +1,117 @@
+# group_commit.py
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.configs.app_config import app_config
+from app.database.session import WriteSessionLocal
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WriteUnit = Callable[[AsyncSession], Awaitable[T]]
+
+
+class GroupCommitter:
+    """รวมงานเขียนเล็กๆ ที่เข้ามาในช่วงเวลาสั้นๆ ให้ commit ใน transaction เดียว
+
+    แต่ละงานรันใน SAVEPOINT ของตัวเอง งานที่ error จะ rollback เฉพาะส่วนของตัวเอง
+    และผู้เรียกแต่ละรายได้ผลลัพธ์หรือ error ของงานตัวเองกลับไป
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        window_ms: float = 2.0,
+        max_batch: int = 64,
+    ):
+        self.session_factory = session_factory
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+
+        self._pending: list[tuple[WriteUnit[Any], asyncio.Future]] = []
+        self._drainer: asyncio.Task | None = None
+        self._batches = 0
+        self._units = 0
+        self._failed_batches = 0
+
+    async def submit(self, unit: WriteUnit[T]) -> T:
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending.append((unit, future))
+        if self._drainer is None or self._drainer.done():
+            self._drainer = asyncio.create_task(self._drain())
+        return await future
+
+    async def _drain(self) -> None:
+        while self._pending:
+            if len(self._pending) < self.max_batch:
+                await asyncio.sleep(self.window)
+            batch = self._pending[: self.max_batch]
+            del self._pending[: self.max_batch]
+            await self._commit_batch(batch)
+
+    async def _commit_batch(self, batch: list[tuple[WriteUnit[Any], asyncio.Future]]) -> None:
+        outcomes: list[tuple[asyncio.Future, Any, BaseException | None]] = []
+        try:
+            async with self.session_factory() as session:
+                for unit, future in batch:
+                    try:
+                        async with session.begin_nested():
+                            result = await unit(session)
+                        outcomes.append((future, result, None))
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+                await session.commit()
+        except Exception as e:
+            logger.error("❌ Group commit of %d writes failed: %s", len(batch), e)
+            self._failed_batches += 1
+            outcomes = [(future, None, e) for _, future in batch]
+
+        self._batches += 1
+        self._units += len(batch)
+        for future, result, error in outcomes:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "pending": len(self._pending),
+            "batches": self._batches,
+            "writes": self._units,
+            "avg_batch_size": round(self._units / self._batches, 2) if self._batches else 0.0,
+            "failed_batches": self._failed_batches,
+        }
+
+
+group_committer = (
+    GroupCommitter(
+        WriteSessionLocal,
+        window_ms=app_config.GROUP_COMMIT_WINDOW_MS,
+        max_batch=app_config.GROUP_COMMIT_MAX_BATCH,
+    )
+    if app_config.GROUP_COMMIT_ENABLED
+    else None
+)
+
+
+async def run_write(db: AsyncSession, unit: WriteUnit[T]) -> T:
+    """รันงานเขียนแล้ว commit ถ้าเปิด group commit จะส่งไปรวม batch แทนการใช้ session ของ request
+
+    ถ้า session ของ request เปิด transaction ไว้แล้ว (เช่น อ่านข้อมูลก่อนเรียก) session นั้นถือ
+    connection เดียวของ writer อยู่ group committer จะรอ connection จนหมดเวลา
+    กรณีนี้จึงรันงานบน session ของ request เองแทนการส่งเข้า batch
+    """
+    if group_committer is not None and not db.in_transaction():
+        return await group_committer.submit(unit)
+
+    result = await unit(db)
+    await db.commit()
+    return result
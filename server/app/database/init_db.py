@@ -1,12 +1,28 @@
 # init_db.py
+import argparse
+import hashlib
+import json
 import logging
 import asyncio
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from decimal import Decimal
+from pathlib import Path
+from sqlalchemy import Column, Connection, MetaData, String, Table, inspect, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
 from sqlalchemy.ext.asyncio import async_sessionmaker
-from tenacity import after_log, before_log, retry, stop_after_attempt, wait_fixed
+from sqlalchemy.schema import CreateIndex, CreateTable
+from tenacity import (
+    after_log,
+    before_log,
+    retry,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_fixed,
+)
 
-from app.database.session import engine
+from app.crud.user_travel_crud import rebuild_user_travel_summaries
+from app.database.session import write_engine
 from app.database.base import Base
 from app.models import *  # type: ignore # noqa: F403
 
@@ -16,34 +32,172 @@ logger = logging.getLogger(__name__)
 max_tries = 60 * 5  # 5 minutes
 wait_seconds = 1
 
+PROVINCES_DATA_PATH = Path(__file__).parent / "data" / "provinces.json"
+PROVINCE_UPSERT_COLUMNS = (
+    "name_en",
+    "region",
+    "city_tier",
+    "tax_reduction_rate",
+    "tax_description",
+)
+
+# * ตารางสถานะ bootstrap อยู่นอก Base.metadata เพื่อไม่ให้นับรวมใน schema fingerprint
+bootstrap_metadata = MetaData()
+schema_state = Table(
+    "schema_state",
+    bootstrap_metadata,
+    Column("key", String(50), primary_key=True),
+    Column("value", String(64), nullable=False),
+)
+
+
+class SchemaDriftError(RuntimeError):
+    """ตารางที่มีอยู่แล้วไม่ตรงกับ model ปัจจุบัน create_all แก้ให้ไม่ได้"""
+
+
+def schema_fingerprint(dialect: Dialect) -> str:
+    """sha256 ของ DDL ทุกตารางและ index ที่ model ปัจจุบันจะสร้าง"""
+    ddl = []
+    for table in Base.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)).strip())
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            ddl.append(str(CreateIndex(index).compile(dialect=dialect)).strip())
+    return hashlib.sha256("\n".join(ddl).encode()).hexdigest()
+
+
+def find_schema_drift(conn: Connection) -> list[str]:
+    """เทียบคอลัมน์และ index จริงในฐานข้อมูลกับ model คืนรายการส่วนที่ไม่ตรง"""
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    drift = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            drift.append(f"{table.name}: missing table")
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        expected = {column.name for column in table.columns}
+        drift.extend(f"{table.name}.{name}: missing column" for name in sorted(expected - columns))
+        drift.extend(
+            f"{table.name}.{name}: column not in model" for name in sorted(columns - expected)
+        )
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        drift.extend(
+            f"{table.name}: missing index {index.name}"
+            for index in sorted(table.indexes, key=lambda index: index.name or "")
+            if index.name not in indexes
+        )
+    return drift
+
+
+def load_province_seed(path: Path = PROVINCES_DATA_PATH) -> tuple[str, list[dict]]:
+    raw = path.read_bytes()
+    rows = json.loads(raw)
+    for row in rows:
+        row["city_tier"] = CityTierEnum(row["city_tier"])  # noqa: F405
+        row["tax_reduction_rate"] = Decimal(row["tax_reduction_rate"])
+    return hashlib.sha256(raw).hexdigest(), rows
+
+
+async def get_state(conn: AsyncConnection, key: str) -> str | None:
+    result = await conn.execute(select(schema_state.c.value).where(schema_state.c.key == key))
+    return result.scalar_one_or_none()
+
+
+async def set_state(conn: AsyncConnection, key: str, value: str) -> None:
+    stmt = sqlite_insert(schema_state).values(key=key, value=value)
+    await conn.execute(
+        stmt.on_conflict_do_update(index_elements=["key"], set_={"value": stmt.excluded.value})
+    )
+
+
+async def ensure_schema(conn: AsyncConnection, drop: bool = False) -> bool:
+    fingerprint = schema_fingerprint(conn.dialect)
+    if drop:
+        logger.info("🧨 Dropping all tables...")
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(bootstrap_metadata.drop_all)
+
+    await conn.run_sync(bootstrap_metadata.create_all)
+    current = await get_state(conn, "schema")
+    if current == fingerprint:
+        logger.info("⏭️ Schema is up to date, skipping DDL")
+        return False
+
+    logger.info("🛠 Creating missing tables...")
+    await conn.run_sync(Base.metadata.create_all)
+
+    # * create_all ไม่แก้ตารางที่มีอยู่แล้ว ต้องตรวจของจริงก่อนบันทึก fingerprint
+    # * ถ้าไม่ตรงให้ล้มทั้ง transaction ดีกว่าเปิดบริการแล้วทุก query พังเพราะไม่มีคอลัมน์
+    drift = await conn.run_sync(find_schema_drift)
+    if drift:
+        raise SchemaDriftError(
+            "Existing database does not match the models ("
+            + "; ".join(drift)
+            + "). Run `python -m app.database.init_db --drop` to recreate it"
+            " or migrate the tables before starting the service."
+        )
+    await set_state(conn, "schema", fingerprint)
+    return True
+
+
+async def seed_provinces(conn: AsyncConnection, path: Path = PROVINCES_DATA_PATH) -> int:
+    """upsert จังหวัดจากไฟล์ข้อมูลตาม name_th ข้ามถ้าไฟล์ไม่เปลี่ยนจากครั้งก่อน"""
+    fingerprint, rows = load_province_seed(path)
+    if await get_state(conn, "provinces") == fingerprint:
+        logger.info("⏭️ Provinces are up to date, skipping seed")
+        return 0
+
+    stmt = sqlite_insert(Province)  # noqa: F405
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["name_th"],
+        set_={column: stmt.excluded[column] for column in PROVINCE_UPSERT_COLUMNS},
+    )
+    await conn.execute(stmt, rows)
+    await set_state(conn, "provinces", fingerprint)
+    logger.info("🌱 Upserted %d provinces", len(rows))
+    return len(rows)
+
 
 @retry(
+    # * schema ไม่ตรงไม่ได้หายเองเมื่อรอ จึงไม่ต้องลองซ้ำ
+    retry=retry_if_not_exception_type(SchemaDriftError),
     stop=stop_after_attempt(max_tries),
     wait=wait_fixed(wait_seconds),
     before=before_log(logger, logging.INFO),
     after=after_log(logger, logging.WARN),
 )
-async def init(db_engine: AsyncEngine) -> None:
+async def init(db_engine: AsyncEngine, drop: bool = False) -> dict:
     try:
+        # * DDL และ seed อยู่ใน transaction เดียว ถ้าล้มกลางทางจะไม่เหลือสถานะครึ่งๆ กลางๆ
         async with db_engine.begin() as conn:
-            logger.info("🧨 Dropping all tables...")
-            await conn.run_sync(Base.metadata.drop_all)
-            logger.info("🛠 Creating all tables...")
-            await conn.run_sync(Base.metadata.create_all)
+            schema_created = await ensure_schema(conn, drop=drop)
+            provinces = await seed_provinces(conn)
+            # * trigger ปรับสรุปเฉพาะแผนที่เขียนหลังจากนี้ ตารางใหม่หรืออัตราที่เปลี่ยนต้องคำนวณใหม่
+            if schema_created or provinces:
+                summaries = await rebuild_user_travel_summaries(conn)
+                logger.info("📊 Rebuilt %d travel summary rows", summaries)
 
         # Optional test query
         async_session = async_sessionmaker(bind=db_engine, class_=AsyncSession)
         async with async_session() as session:
             await session.execute(text("SELECT 1"))
 
+        return {"schema_created": schema_created, "provinces": provinces}
+
     except Exception as e:
         logger.error("❌ Database initialization failed: %s", e)
         raise e
 
 
 async def main() -> None:
-    logger.info("🔧 Initializing service (drop + create all tables)")
-    await init(engine)
+    parser = argparse.ArgumentParser(description="Bootstrap the database schema and seed data")
+    parser.add_argument("--drop", action="store_true", help="drop all tables before creating")
+    args = parser.parse_args()
+
+    logger.info(
+        "🔧 Initializing service (%s)", "drop + create" if args.drop else "create if needed"
+    )
+    await init(write_engine, drop=args.drop)
     logger.info("✅ Database is ready")
 
 
@@ -1,24 +1,119 @@
 # session.py
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    create_async_engine,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
 
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Literal
 from app.configs.app_config import app_config
 
 DATABASE_URL = str(app_config.SQLALCHEMY_DATABASE_URI)
 
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=False,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
+
+def sqlite_pragmas() -> list[str]:
+    return [
+        f"journal_mode={app_config.SQLITE_JOURNAL_MODE}",
+        f"synchronous={app_config.SQLITE_SYNCHRONOUS}",
+        f"busy_timeout={app_config.SQLITE_BUSY_TIMEOUT_MS}",
+        f"cache_size={app_config.SQLITE_CACHE_SIZE}",
+        f"mmap_size={app_config.SQLITE_MMAP_SIZE}",
+        f"temp_store={app_config.SQLITE_TEMP_STORE}",
+        f"foreign_keys={'ON' if app_config.SQLITE_FOREIGN_KEYS else 'OFF'}",
+    ]
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma in sqlite_pragmas():
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+
+def _apply_sqlite_read_only_pragmas(dbapi_connection, connection_record) -> None:
+    _apply_sqlite_pragmas(dbapi_connection, connection_record)
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+def _disable_driver_transactions(dbapi_connection, connection_record) -> None:
+    # * ให้ SQLAlchemy เป็นผู้ออกคำสั่ง BEGIN เอง SAVEPOINT (begin_nested) จึงทำงานถูกต้องบน pysqlite
+    dbapi_connection.isolation_level = None
+
+
+def _begin_immediate(conn) -> None:
+    # * writer จอง write lock ตั้งแต่เริ่ม transaction ไม่ต้องอัปเกรด lock กลางทาง
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def create_sqlite_engine(
+    url: str = DATABASE_URL,
+    profile: Literal["legacy", "tuned"] = app_config.SQLITE_ENGINE_PROFILE,
+    pool_size: int = app_config.SQLITE_POOL_SIZE,
+    read_only: bool = False,
+) -> AsyncEngine:
+    if profile == "legacy":
+        return create_async_engine(
+            url,
+            echo=False,
+            pool_size=10,
+            max_overflow=20,
+            pool_pre_ping=True,
+        )
+
+    # * SQLite เป็นไฟล์ในเครื่อง ไม่มีการเชื่อมต่อหลุดแบบ server จึงไม่ต้อง pre-ping
+    # * และจำกัดจำนวน connection ให้คงที่ เพราะ PRAGMA ถูกตั้งตอนเปิด connection
+    engine = create_async_engine(
+        url,
+        echo=False,
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_timeout=app_config.SQLITE_POOL_TIMEOUT,
+        pool_pre_ping=False,
+    )
+    if read_only:
+        event.listen(engine.sync_engine, "connect", _apply_sqlite_read_only_pragmas)
+    else:
+        event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+        event.listen(engine.sync_engine, "connect", _disable_driver_transactions)
+        event.listen(engine.sync_engine, "begin", _begin_immediate)
+    return engine
+
+
+# * SQLite เขียนได้ทีละ connection: ให้ writer มี connection เดียว งานเขียนจะรอคิวใน pool
+# * แบบ FIFO แทนการแย่ง lock กันจนเกิด "database is locked" ส่วนงานอ่านกระจายไปหลาย connection
+write_engine = create_sqlite_engine(pool_size=1)
+read_engine = (
+    create_sqlite_engine(read_only=True)
+    if app_config.SQLITE_ENGINE_PROFILE == "tuned"
+    else write_engine
 )
 
-AsyncSessionLocal = async_sessionmaker(
-    autocommit=False, autoflush=False, bind=engine, class_=AsyncSession
+ReadSessionLocal = async_sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=read_engine,
+    class_=AsyncSession,
 )
 
+WriteSessionLocal = async_sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=write_engine,
+    class_=AsyncSession,
+)
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with ReadSessionLocal() as session:
+        yield session
+
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
+async def get_write_db() -> AsyncGenerator[AsyncSession, None]:
+    async with WriteSessionLocal() as session:
         yield session
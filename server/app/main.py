@@ -1,5 +1,5 @@
 import logging
-from fastapi import FastAPI, status
+from fastapi import Depends, FastAPI, status
 from fastapi.routing import APIRoute
 from fastapi.responses import JSONResponse
 from fastapi.openapi.utils import get_openapi
@@ -9,8 +9,18 @@ from contextlib import asynccontextmanager
 
 from app.api import api_router
 from app.configs.app_config import app_config
-from app.database.session import engine
-
+from app.database.session import read_engine, write_engine, ReadSessionLocal
+from app.database.group_commit import group_committer
+from app.security import hashing_pool, require_admin_key
+from app.utils.budget_rebalancer import budget_rebalancer
+from app.utils.coupon_pool import coupon_code_pool
+from app.utils.fast_json import JSONResponseClass
+from app.utils.principal_cache import principal_cache
+from app.utils.project_settings import project_settings
+from app.utils.province_catalogue import province_catalogue
+from app.utils.province_response_cache import province_response_cache
+from app.utils.rights_sweeper import rights_sweeper
+from app.utils.token_revocations import token_revocation_feed
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -25,22 +35,58 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     try:
-        async with engine.begin() as conn:
+        async with write_engine.begin() as conn:
+            await conn.execute(text("SELECT 1"))
+        async with read_engine.begin() as conn:
             await conn.execute(text("SELECT 1"))
         logger.info("🚀 Connected to SQLite")
     except Exception as e:
         logger.error("❌ Failed to connect to SQLite: %s", e)
         raise e
 
+    try:
+        async with ReadSessionLocal() as session:
+            catalogue = await province_catalogue.load(session)
+        logger.info("🗺️ Loaded %d provinces into catalogue", len(catalogue.records))
+    except Exception as e:
+        logger.warning("⚠️ Province catalogue will load on first use: %s", e)
+
+    try:
+        settings = await project_settings.reload()
+        logger.info("⚙️ Loaded project config version %d", settings.version)
+    except Exception as e:
+        logger.warning("⚠️ Project config uses defaults until the next poll: %s", e)
+    project_settings.start()
+
+    try:
+        revoked = await token_revocation_feed.refresh()
+        logger.info("🔒 Loaded %d token revocations", revoked)
+    except Exception as e:
+        logger.warning("⚠️ Token revocations load on the next poll: %s", e)
+    token_revocation_feed.start()
+
+    # * เติมรหัสคูปองล่วงหน้าใน background ไม่ต้องรอให้ครบก่อนรับ request
+    coupon_code_pool.schedule_refill()
+    rights_sweeper.start()
+    budget_rebalancer.start()
+
     yield
 
-    await engine.dispose()
-    logger.info("🧹 Async engine disposed")
+    await budget_rebalancer.shutdown()
+    await project_settings.shutdown()
+    await token_revocation_feed.shutdown()
+    await rights_sweeper.shutdown()
+    await coupon_code_pool.shutdown()
+    hashing_pool.shutdown()
+    await read_engine.dispose()
+    await write_engine.dispose()
+    logger.info("🧹 Async engines disposed")
 
 
 app = FastAPI(
     title=app_config.PROJECT_NAME,
     generate_unique_id_function=custom_generate_unique_id,
+    default_response_class=JSONResponseClass,
     lifespan=lifespan,
     docs_url="/docs" if app_config.ENVIRONMENT != "production" else None,
     redoc_url=None,
@@ -67,7 +113,7 @@ async def root():
 @app.get("/health", tags=["Monitoring"])
 async def health_check():
     try:
-        async with engine.begin() as conn:
+        async with read_engine.begin() as conn:
             await conn.execute(text("SELECT 1"))
         return {"status": "ok"}
     except Exception:
@@ -77,6 +123,22 @@ async def health_check():
         )
 
 
+@app.get("/metrics", tags=["Monitoring"], dependencies=[Depends(require_admin_key)])
+async def metrics():
+    return {
+        "password_hashing": hashing_pool.stats(),
+        "principal_cache": principal_cache.stats(),
+        "province_catalogue": province_catalogue.stats(),
+        "province_response_cache": province_response_cache.stats(),
+        "group_commit": group_committer.stats() if group_committer else None,
+        "coupon_code_pool": coupon_code_pool.stats(),
+        "rights_sweeper": rights_sweeper.stats(),
+        "budget_rebalancer": budget_rebalancer.stats(),
+        "project_settings": project_settings.stats(),
+        "token_revocations": token_revocation_feed.stats(),
+    }
+
+
 def custom_openapi():
     if app.openapi_schema:
         return app.openapi_schema
@@ -101,10 +163,19 @@ def custom_openapi():
             "bearerFormat": "JWT",
             "description": "Use access token",
         },
+        "AdminKey": {
+            "type": "apiKey",
+            "in": "header",
+            "name": "X-Admin-Key",
+            "description": "Use ADMIN_API_KEY",
+        },
     }
 
     protected_access_token_paths = [
         f"{app_config.API_STR}/users/me",
+        f"{app_config.API_STR}/auth/logout",
+        f"{app_config.API_STR}/quotes",
+        f"{app_config.API_STR}/operators/me",
     ]
 
     protected_refresh_token_paths = [
@@ -10,13 +10,17 @@ from sqlalchemy import (
     DECIMAL,
     Date,
     ForeignKey,
+    Index,
+    UniqueConstraint,
+    CheckConstraint,
+    DDL,
+    event,
 )
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
 from app.database.base import Base
 
-
 # * ====== Enum Definitions ======
 
 
@@ -30,6 +34,41 @@ class UserTypeEnum(str, enum.Enum):
     OPERATOR = "OPERATOR"
 
 
+class BusinessTypeEnum(str, enum.Enum):
+    HOTEL = "HOTEL"
+    RESTAURANT = "RESTAURANT"
+    ATTRACTION = "ATTRACTION"
+    OTOP = "OTOP"
+    SPA = "SPA"
+    TRANSPORT = "TRANSPORT"
+
+
+class BookingStatusEnum(str, enum.Enum):
+    BOOKED = "BOOKED"
+    PAID = "PAID"
+    CHECKED_IN = "CHECKED_IN"
+    CHECKED_OUT = "CHECKED_OUT"
+    CANCELLED = "CANCELLED"
+
+
+class CouponStatusEnum(str, enum.Enum):
+    ACTIVE = "ACTIVE"
+    USED = "USED"
+    EXPIRED = "EXPIRED"
+
+
+class OperatorStatusEnum(str, enum.Enum):
+    PENDING = "PENDING"
+    APPROVED = "APPROVED"
+    REJECTED = "REJECTED"
+
+
+class RightsReservationStatusEnum(str, enum.Enum):
+    HELD = "HELD"
+    CONFIRMED = "CONFIRMED"
+    RELEASED = "RELEASED"
+
+
 # * ====== Tables ======
 
 
@@ -37,6 +76,10 @@ class UserTravel(Base):
     """ตารางเก็บข้อมูลแผนการเดินทางของผู้ใช้"""
 
     __tablename__ = "user_travels"
+    __table_args__ = (
+        Index("ix_user_travels_user_id_start_date_id", "user_id", "start_date", "id"),
+        Index("ix_user_travels_user_id_start_date_end_date", "user_id", "start_date", "end_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -90,9 +133,288 @@ class User(Base):
     user_type = Column(Enum(UserTypeEnum), nullable=False)
     agreed_to_terms = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # * Relationships
     travels = relationship("UserTravel", back_populates="user")
+    operator_profile = relationship("Operator", back_populates="user", uselist=False)
+
+
+class Operator(Base):
+    """ตารางเก็บข้อมูลผู้ประกอบการ"""
+
+    __tablename__ = "operators"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, unique=True)
+    business_name = Column(String(255), nullable=False)
+    business_type = Column(Enum(BusinessTypeEnum), nullable=False)
+    registration_status = Column(Enum(OperatorStatusEnum), default=OperatorStatusEnum.PENDING)
+    address = Column(TEXT, nullable=False)
+    province_id = Column(Integer, ForeignKey("provinces.id"), nullable=False)
+    approved_at = Column(DateTime)
+    created_at = Column(DateTime, server_default=func.now())
+
+    # * Relationships
+    user = relationship("User", back_populates="operator_profile")
+    bookings_received = relationship("Booking", back_populates="hotel")
+
+
+class Booking(Base):
+    """ตารางสำหรับการจองที่พัก"""
+
+    __tablename__ = "bookings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # * ข้อมูลนักท่องเที่ยวรวมอยู่ในตาราง users จึงอ้างถึง users.id แทนตาราง tourists ของร่างเดิม
+    tourist_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    hotel_operator_id = Column(Integer, ForeignKey("operators.id"), nullable=False)
+    check_in_date = Column(Date, nullable=False)
+    check_out_date = Column(Date, nullable=False)
+    num_nights = Column(Integer, nullable=False)
+    total_cost = Column(DECIMAL(10, 2), nullable=False)
+    subsidy_rate = Column(DECIMAL(4, 2), nullable=False)
+    government_subsidy = Column(DECIMAL(10, 2), nullable=False)
+    tourist_payment = Column(DECIMAL(10, 2), nullable=False)
+    booking_status = Column(Enum(BookingStatusEnum), nullable=False)
+    # * สิทธิ์และ shard งบที่การจองนี้ใช้ไป เพื่อคืนให้ถูกที่เมื่อยกเลิก
+    city_tier = Column(Enum(CityTierEnum))
+    budget_shard_id = Column(Integer)
+    created_at = Column(DateTime, server_default=func.now())
+
+    # * Relationships
+    hotel = relationship("Operator", back_populates="bookings_received")
+    e_coupons = relationship("ECoupon", back_populates="booking")
+
+
+class RoomInventory(Base):
+    """ตารางจำนวนห้องว่างของที่พักแต่ละคืน หนึ่งแถวต่อ (ผู้ประกอบการ, วันที่เข้าพัก)"""
+
+    __tablename__ = "room_inventory"
+    __table_args__ = (
+        CheckConstraint(
+            "available_rooms >= 0 AND available_rooms <= total_rooms",
+            name="ck_room_inventory_available_rooms",
+        ),
+        # * ค้นห้องว่างตามช่วงวันที่ข้ามทุกที่พัก อ่านจาก index นี้ได้ครบโดยไม่แตะตาราง
+        Index(
+            "ix_room_inventory_stay_date_available",
+            "stay_date",
+            "available_rooms",
+            "operator_id",
+        ),
+    )
+
+    operator_id = Column(Integer, ForeignKey("operators.id"), primary_key=True)
+    stay_date = Column(Date, primary_key=True)
+    total_rooms = Column(Integer, nullable=False)
+    available_rooms = Column(Integer, nullable=False)
+    price_per_night = Column(DECIMAL(10, 2), nullable=False)
+
+
+class ECoupon(Base):
+    """ตารางสำหรับ E-Coupon ที่ได้รับจากการเช็คอิน"""
+
+    __tablename__ = "e_coupons"
+
+    id = Column(Integer, primary_key=True, index=True)
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=False, index=True)
+    tourist_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    coupon_code = Column(String(20), nullable=False, unique=True)
+    amount = Column(DECIMAL(10, 2), nullable=False, default=500.00)
+    issue_date = Column(Date, nullable=False)
+    expiry_datetime = Column(DateTime, nullable=False)
+    status = Column(Enum(CouponStatusEnum), default=CouponStatusEnum.ACTIVE)
+
+    # * Relationships
+    booking = relationship("Booking", back_populates="e_coupons")
+    transactions = relationship("CouponTransaction", back_populates="coupon")
+
+
+class CouponTransaction(Base):
+    """ตารางเก็บประวัติการใช้ E-Coupon"""
+
+    __tablename__ = "coupon_transactions"
+    __table_args__ = (
+        # * ผู้ประกอบการส่ง Idempotency-Key เดิมซ้ำได้อย่างปลอดภัย แถวเดียวต่อ key ต่อร้าน
+        UniqueConstraint(
+            "service_operator_id",
+            "idempotency_key",
+            name="uq_coupon_transactions_operator_idempotency_key",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    coupon_id = Column(Integer, ForeignKey("e_coupons.id"), nullable=False, unique=True)
+    service_operator_id = Column(Integer, ForeignKey("operators.id"), nullable=False)
+    idempotency_key = Column(String(64))
+    total_amount = Column(DECIMAL(10, 2), nullable=False)
+    discount_applied = Column(DECIMAL(10, 2), nullable=False)
+    transaction_time = Column(DateTime, server_default=func.now())
+
+    # * Relationships
+    coupon = relationship("ECoupon", back_populates="transactions")
+
+
+class UserTravelSummary(Base):
+    """ตารางสรุปแผนการเดินทางต่อผู้ใช้และประเภทเมือง ปรับปรุงด้วย trigger ของ user_travels"""
+
+    __tablename__ = "user_travel_summaries"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    city_tier = Column(Enum(CityTierEnum), primary_key=True)
+
+    trips = Column(Integer, nullable=False, default=0, server_default="0")
+    travel_days = Column(Integer, nullable=False, default=0, server_default="0")
+    # * ผลรวมของ จำนวนวัน × tax_reduction_rate × 100 เก็บเป็นจำนวนเต็มเพื่อไม่ให้เศษทศนิยมสะสม
+    rate_day_points = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class TouristRight(Base):
+    """ตารางสิทธิ์คงเหลือของนักท่องเที่ยวต่อประเภทเมือง แทนคอลัมน์ *_city_rights_remaining ของร่างเดิม"""
+
+    __tablename__ = "tourist_rights"
+    __table_args__ = (CheckConstraint("remaining >= 0", name="ck_tourist_rights_remaining"),)
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    city_tier = Column(Enum(CityTierEnum), primary_key=True)
+    remaining = Column(Integer, nullable=False)
+
+
+class RightsReservation(Base):
+    """ตารางการจองสิทธิ์ล่วงหน้า สิทธิ์ถูกหักตั้งแต่จอง และคืนเมื่อยกเลิกหรือหมดเวลา"""
+
+    __tablename__ = "rights_reservations"
+    __table_args__ = (Index("ix_rights_reservations_status_expires_at", "status", "expires_at"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    province_id = Column(Integer, ForeignKey("provinces.id"), nullable=False)
+    city_tier = Column(Enum(CityTierEnum), nullable=False)
+    status = Column(
+        Enum(RightsReservationStatusEnum),
+        nullable=False,
+        default=RightsReservationStatusEnum.HELD,
+    )
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+
+class ProjectConfig(Base):
+    """ตารางสำหรับเก็บค่าตั้งค่ากลางของโครงการ"""
+
+    __tablename__ = "project_config"
+
+    config_key = Column(String(100), primary_key=True)
+    config_value = Column(String(255), nullable=False)
+    description = Column(TEXT)
+
+
+class ProjectConfigVersion(Base):
+    """แถวเดียวที่เก็บเลข version ของ project_config เพิ่มขึ้นอัตโนมัติด้วย trigger ทุกครั้งที่ค่าเปลี่ยน"""
+
+    __tablename__ = "project_config_version"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class TokenRevocation(Base):
+    """การเพิกถอน token ล่าสุดของผู้ใช้แต่ละคน เขียนด้วย trigger ทุกครั้งที่ token_version เพิ่มขึ้น
+    ทุก worker poll แถวใหม่ตาม id จึงต้องใช้ AUTOINCREMENT ให้ id ไม่ถูกนำกลับมาใช้ซ้ำ
+    """
+
+    __tablename__ = "token_revocations"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, nullable=False, unique=True)
+    token_version = Column(Integer, nullable=False)
+    revoked_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class BudgetShard(Base):
+    """ตารางงบประมาณคงเหลือที่แบ่งเป็นหลายแถว ผลรวมทุกแถวคืองบที่ยังจัดสรรได้ทั้งโครงการ"""
+
+    __tablename__ = "budget_shards"
+    __table_args__ = (CheckConstraint("remaining_satang >= 0", name="ck_budget_shards_remaining"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    remaining_satang = Column(Integer, nullable=False)
+
+
+# * ====== Triggers ======
+
+_TRAVEL_SUMMARY_ADD = """
+    INSERT INTO user_travel_summaries (user_id, city_tier, trips, travel_days, rate_day_points)
+    SELECT NEW.user_id, provinces.city_tier, 1, days,
+           days * CAST(ROUND(provinces.tax_reduction_rate * 100) AS INTEGER)
+    FROM provinces,
+         (SELECT CAST(julianday(NEW.end_date) - julianday(NEW.start_date) AS INTEGER) + 1 AS days)
+    WHERE provinces.id = NEW.province_id
+    ON CONFLICT (user_id, city_tier) DO UPDATE SET
+        trips = trips + excluded.trips,
+        travel_days = travel_days + excluded.travel_days,
+        rate_day_points = rate_day_points + excluded.rate_day_points;
+"""
+
+_TRAVEL_SUMMARY_REMOVE = """
+    UPDATE user_travel_summaries SET
+        trips = trips - 1,
+        travel_days = travel_days - days,
+        rate_day_points = rate_day_points - days * rate_points
+    FROM (
+        SELECT provinces.city_tier AS tier,
+               CAST(julianday(OLD.end_date) - julianday(OLD.start_date) AS INTEGER) + 1 AS days,
+               CAST(ROUND(provinces.tax_reduction_rate * 100) AS INTEGER) AS rate_points
+        FROM provinces
+        WHERE provinces.id = OLD.province_id
+    )
+    WHERE user_id = OLD.user_id AND city_tier = tier;
+    DELETE FROM user_travel_summaries WHERE user_id = OLD.user_id AND trips <= 0;
+"""
+
+USER_TRAVEL_SUMMARY_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_user_travels_summary_insert
+    AFTER INSERT ON user_travels
+    BEGIN {_TRAVEL_SUMMARY_ADD} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_user_travels_summary_update
+    AFTER UPDATE OF user_id, province_id, start_date, end_date ON user_travels
+    BEGIN {_TRAVEL_SUMMARY_REMOVE} {_TRAVEL_SUMMARY_ADD} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_user_travels_summary_delete
+    AFTER DELETE ON user_travels
+    BEGIN {_TRAVEL_SUMMARY_REMOVE} END""",
+]
+
+_PROJECT_CONFIG_VERSION_BUMP = """
+    INSERT INTO project_config_version (id, version) VALUES (1, 1)
+    ON CONFLICT (id) DO UPDATE SET version = version + 1;
+"""
+
+PROJECT_CONFIG_VERSION_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_project_config_version_{event_name.lower()}
+    AFTER {event_name} ON project_config
+    BEGIN {_PROJECT_CONFIG_VERSION_BUMP} END""" for event_name in ("INSERT", "UPDATE", "DELETE")
+]
+
+# * เก็บเฉพาะแถวล่าสุดของผู้ใช้ ลบแล้วเพิ่มใหม่ให้ได้ id ใหม่ที่ worker อื่นยังไม่เคยเห็น
+_TOKEN_REVOCATION_RECORD = """
+    DELETE FROM token_revocations WHERE user_id = NEW.id;
+    INSERT INTO token_revocations (user_id, token_version) VALUES (NEW.id, NEW.token_version);
+"""
+
+TOKEN_REVOCATION_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_users_token_revocation
+    AFTER UPDATE OF token_version ON users
+    WHEN NEW.token_version > OLD.token_version
+    BEGIN {_TOKEN_REVOCATION_RECORD} END""",
+]
+
+# * สร้าง trigger หลังสร้างครบทุกตาราง เพราะอ้างถึงทั้ง user_travels และ user_travel_summaries
+for trigger in (
+    USER_TRAVEL_SUMMARY_TRIGGERS + PROJECT_CONFIG_VERSION_TRIGGERS + TOKEN_REVOCATION_TRIGGERS
+):
+    event.listen(Base.metadata, "after_create", DDL(trigger).execute_if(dialect="sqlite"))
@@ -0,0 +1,123 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.configs.app_config import app_config
+from app.crud import budget_crud, coupon_crud, project_config_crud, user_travel_crud
+from app.database.group_commit import run_write
+from app.database.session import get_read_db, get_write_db
+from app.schemas.budget_schema import BudgetConfigIn, BudgetRebalanceResult, BudgetStatus
+from app.schemas.coupon_schema import ECouponOut
+from app.schemas.project_config_schema import ProjectConfigIn, ProjectSettingsOut
+from app.schemas.rights_schema import RightsSweepResult
+from app.schemas.user_travel_schema import TravelOverlapReport, TravelSummaryRebuild
+from app.security import require_admin_key
+from app.utils.budget_rebalancer import budget_rebalancer
+from app.utils.fast_json import JSONRouteClass
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.project_settings import project_settings
+from app.utils.rights_sweeper import rights_sweeper
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin_key)],
+    route_class=JSONRouteClass,
+)
+
+
+@router.get("/travels/overlaps", response_model=TravelOverlapReport)
+async def read_travel_overlaps(
+    limit: int = Query(
+        default=app_config.TRAVEL_OVERLAP_PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=app_config.TRAVEL_OVERLAP_PAGE_SIZE_MAX,
+    ),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    after_user_id = None
+    if cursor:
+        try:
+            (after_user_id,) = decode_cursor(cursor)
+            after_user_id = int(after_user_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    report, next_user_id = await user_travel_crud.find_all_travel_overlaps(
+        db, limit=limit, after_user_id=after_user_id
+    )
+    return {
+        **report,
+        "next_cursor": encode_cursor(next_user_id) if next_user_id is not None else None,
+    }
+
+
+@router.post("/travels/summary/rebuild", response_model=TravelSummaryRebuild)
+async def rebuild_travel_summaries(db: AsyncSession = Depends(get_write_db)):
+    rows = await run_write(db, user_travel_crud.rebuild_user_travel_summaries)
+    return {"rows": rows}
+
+
+@router.post(
+    "/bookings/{booking_id}/coupons",
+    response_model=list[ECouponOut],
+    status_code=status.HTTP_201_CREATED,
+)
+async def issue_booking_coupons(
+    booking_id: int,
+    read_db: AsyncSession = Depends(get_read_db),
+    write_db: AsyncSession = Depends(get_write_db),
+):
+    return await coupon_crud.issue_booking_coupons(read_db, write_db, booking_id=booking_id)
+
+
+@router.post("/rights/sweep", response_model=RightsSweepResult)
+async def sweep_rights_reservations():
+    return {"released": await rights_sweeper.sweep()}
+
+
+@router.get("/budget", response_model=BudgetStatus)
+async def read_budget(db: AsyncSession = Depends(get_read_db)):
+    return await budget_crud.get_budget_status(db)
+
+
+@router.put("/budget", response_model=BudgetStatus)
+async def configure_budget(budget: BudgetConfigIn, db: AsyncSession = Depends(get_write_db)):
+    return await budget_crud.configure_budget(db, total=budget.total, shards=budget.shards)
+
+
+@router.post("/budget/rebalance", response_model=BudgetRebalanceResult)
+async def rebalance_budget():
+    return {"changed_shards": await budget_rebalancer.rebalance()}
+
+
+def project_settings_response() -> dict:
+    settings = project_settings.current
+    return {
+        "version": settings.version,
+        "loaded": project_settings.loaded,
+        **settings.as_dict(),
+    }
+
+
+@router.get("/config", response_model=ProjectSettingsOut)
+async def read_project_settings():
+    return project_settings_response()
+
+
+@router.put("/config/{key}", response_model=ProjectSettingsOut)
+async def update_project_config(
+    key: str, config: ProjectConfigIn, db: AsyncSession = Depends(get_write_db)
+):
+    await project_config_crud.set_project_config(
+        db, key=key, value=config.value, description=config.description
+    )
+    # * worker นี้โหลดใหม่ทันที worker อื่นจะเห็น version ใหม่ในรอบ poll ถัดไป
+    await project_settings.reload()
+    return project_settings_response()
+
+
+@router.post("/config/invalidate", response_model=ProjectSettingsOut)
+async def invalidate_project_settings():
+    await project_settings.reload()
+    return project_settings_response()
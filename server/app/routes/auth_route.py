@@ -7,41 +7,37 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import User
 from app.schemas.user_schema import UserCreate, UserOut, Pin
 from app.crud import user_crud
-from app.database.session import get_db
+from app.database.session import get_read_db, get_write_db
 from app.security import (
-    get_password_hash,
-    verify_password,
-    get_pin_hash,
-    verify_pin,
+    get_password_hash_async,
+    verify_password_async,
+    get_pin_hash_async,
+    verify_pin_async,
     create_refresh_token,
     create_access_token,
     get_current_user_with_refresh_token,
+    get_current_user_with_access_token,
+    user_token_claims,
 )
+from app.utils.fast_json import JSONRouteClass
+from app.utils.principal_cache import UserSnapshot
 
-router = APIRouter(prefix="/auth", tags=["Auth"])
+router = APIRouter(prefix="/auth", tags=["Auth"], route_class=JSONRouteClass)
 
 
 @router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-async def register(user_create: UserCreate, db: AsyncSession = Depends(get_db)):
-    existing_user_by_email = await user_crud.get_user_by_email(db, user_create.email)
-    if existing_user_by_email:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
-
-    existing_user_by_phone = await user_crud.get_user_by_phone_number(db, user_create.phone_number)
-    if existing_user_by_phone:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Phone number already registered",
-        )
-
-    existing_user_by_citizen_id = await user_crud.get_user_by_citizen_id(db, user_create.citizen_id)
-    if existing_user_by_citizen_id:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT, detail="Citizen id already registered"
-        )
+async def register(
+    user_create: UserCreate,
+    read_db: AsyncSession = Depends(get_read_db),
+    write_db: AsyncSession = Depends(get_write_db),
+):
+    # * ตรวจล่วงหน้าเพื่อไม่เสียเวลา hash รหัสผ่านกับข้อมูลที่ซ้ำ ส่วนการแข่งกันให้ unique constraint ตัดสิน
+    conflict = await user_crud.get_registration_conflict(read_db, user_create)
+    if conflict:
+        raise user_crud.registration_conflict_exception(conflict)
 
-    password_hash = get_password_hash(user_create.password)
-    user = await user_crud.create_user(db, user_create, password_hash)
+    password_hash = await get_password_hash_async(user_create.password)
+    user = await user_crud.create_user(write_db, user_create, password_hash)
     return user
 
 
@@ -49,7 +45,7 @@ async def register(user_create: UserCreate, db: AsyncSession = Depends(get_db)):
 async def login(
     # * username = Email/ หมายเลขโทรศัพท์ / รหัสบัตรประชาชน
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     user: User | None = None
     input_identifier = form_data.username.strip().lower()
@@ -66,14 +62,14 @@ async def login(
     elif input_identifier.isdigit():
         user = await user_crud.get_user_by_phone_number(db, input_identifier)
 
-    if not user or not verify_password(form_data.password, str(user.password_hash)):
+    if not user or not await verify_password_async(form_data.password, str(user.password_hash)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email, phone number, citizen id or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+    refresh_token = create_refresh_token(data=user_token_claims(user))
     return {
         "refresh_token": refresh_token,
         "token_type": "bearer",
@@ -84,12 +80,12 @@ async def login(
 async def pin_setup(
     pin: Pin,
     current_user: User = Depends(get_current_user_with_refresh_token),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
 ):
-    pin_hash = get_pin_hash(pin.pin)
+    pin_hash = await get_pin_hash_async(pin.pin)
     user = await user_crud.pin_setup(db, id=current_user.id, pin_hash=pin_hash)  # type: ignore
 
-    access_token = create_access_token(data={"sub": str(user.id)})
+    access_token = create_access_token(data=user_token_claims(user, include_profile=True))
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -100,18 +96,27 @@ async def pin_setup(
 async def pin_access(
     pin: Pin,
     current_user: User = Depends(get_current_user_with_refresh_token),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
 
-    if not verify_pin(pin.pin, str(current_user.pin_hash)):
+    if not await verify_pin_async(pin.pin, str(current_user.pin_hash)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token = create_access_token(data={"sub": str(current_user.id)})
+    access_token = create_access_token(data=user_token_claims(current_user, include_profile=True))
     return {
         "access_token": access_token,
         "token_type": "bearer",
     }
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    current_user: UserSnapshot = Depends(get_current_user_with_access_token),
+    db: AsyncSession = Depends(get_write_db),
+):
+    await user_crud.bump_token_version(db, id=current_user.id)
+    return
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import booking_crud
+from app.database.session import get_read_db, get_write_db
+from app.schemas.booking_schema import BookingIn, BookingOut
+from app.security import (
+    get_current_user_from_access_token_claims,
+    get_current_user_with_access_token,
+)
+from app.utils.fast_json import JSONRouteClass
+from app.utils.principal_cache import UserSnapshot
+
+router = APIRouter(prefix="/users/me/bookings", tags=["Bookings"], route_class=JSONRouteClass)
+
+
+@router.get("/", response_model=list[BookingOut])
+async def read_bookings(
+    current_user: UserSnapshot = Depends(get_current_user_from_access_token_claims),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await booking_crud.get_user_bookings(db, tourist_id=current_user.id)  # type: ignore
+
+
+@router.post("/", response_model=BookingOut, status_code=status.HTTP_201_CREATED)
+async def create_booking(
+    booking: BookingIn,
+    current_user: UserSnapshot = Depends(get_current_user_with_access_token),
+    db: AsyncSession = Depends(get_write_db),
+):
+    return await booking_crud.create_booking(
+        db,
+        tourist_id=current_user.id,  # type: ignore
+        hotel_operator_id=booking.hotel_operator_id,
+        check_in_date=booking.check_in_date,
+        check_out_date=booking.check_out_date,
+    )
+
+
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_booking(
+    id: int,
+    current_user: UserSnapshot = Depends(get_current_user_with_access_token),
+    db: AsyncSession = Depends(get_write_db),
+):
+    await booking_crud.cancel_booking(db, id=id, tourist_id=current_user.id)  # type: ignore
+    return
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import coupon_crud
+from app.database.session import get_read_db
+from app.schemas.coupon_schema import ECouponOut
+from app.security import get_current_user_from_access_token_claims
+from app.utils.fast_json import JSONRouteClass
+from app.utils.principal_cache import UserSnapshot
+
+router = APIRouter(prefix="/users/me/coupons", tags=["Coupons"], route_class=JSONRouteClass)
+
+
+@router.get("/", response_model=list[ECouponOut])
+async def read_coupons(
+    current_user: UserSnapshot = Depends(get_current_user_from_access_token_claims),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await coupon_crud.get_user_coupons(db, user_id=current_user.id)
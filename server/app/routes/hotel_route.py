@@ -0,0 +1,27 @@
+from datetime import date
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import booking_crud
+from app.database.session import get_read_db
+from app.schemas.booking_schema import HotelAvailabilityOut
+from app.utils.fast_json import JSONRouteClass
+
+router = APIRouter(prefix="/hotels", tags=["Hotels"], route_class=JSONRouteClass)
+
+
+@router.get("/availability", response_model=list[HotelAvailabilityOut])
+async def search_availability(
+    check_in_date: date,
+    check_out_date: date,
+    province_id: int | None = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await booking_crud.search_availability(
+        db,
+        check_in_date=check_in_date,
+        check_out_date=check_out_date,
+        province_id=province_id,
+        limit=limit,
+    )
@@ -0,0 +1,97 @@
+from datetime import date
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import booking_crud, coupon_crud, operator_crud
+from app.database.session import get_read_db, get_write_db
+from app.models import BusinessTypeEnum, Operator, OperatorStatusEnum
+from app.schemas.booking_schema import RoomInventoryIn, RoomInventoryOut
+from app.schemas.coupon_schema import CouponRedeemIn, CouponTransactionOut
+from app.security import (
+    get_current_user_from_access_token_claims,
+    get_current_user_with_access_token,
+)
+from app.utils.fast_json import JSONRouteClass
+from app.utils.principal_cache import UserSnapshot
+
+router = APIRouter(prefix="/operators/me", tags=["Operators"], route_class=JSONRouteClass)
+
+IDEMPOTENCY_REPLAYED_HEADER = "Idempotency-Replayed"
+
+
+async def get_approved_operator(db: AsyncSession, user_id: int) -> Operator:
+    operator = await operator_crud.get_operator_by_user_id(db, user_id=user_id)
+    if operator is None or operator.registration_status != OperatorStatusEnum.APPROVED:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Approved operator account required"
+        )
+    return operator
+
+
+async def get_approved_hotel(db: AsyncSession, user_id: int) -> Operator:
+    operator = await get_approved_operator(db, user_id)
+    if operator.business_type != BusinessTypeEnum.HOTEL:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Hotel operator account required"
+        )
+    return operator
+
+
+@router.post(
+    "/redemptions",
+    response_model=CouponTransactionOut,
+    status_code=status.HTTP_201_CREATED,
+)
+async def redeem_coupon(
+    redemption: CouponRedeemIn,
+    response: Response,
+    idempotency_key: str | None = Header(default=None, max_length=64),
+    current_user: UserSnapshot = Depends(get_current_user_with_access_token),
+    read_db: AsyncSession = Depends(get_read_db),
+    write_db: AsyncSession = Depends(get_write_db),
+):
+    # * ตรวจสิทธิ์ผู้ประกอบการผ่าน session อ่าน session เขียนต้องว่างไว้ให้ group commit
+    operator = await get_approved_operator(read_db, user_id=current_user.id)  # type: ignore
+
+    transaction, replayed = await coupon_crud.redeem_coupon(
+        write_db,
+        operator_id=operator.id,  # type: ignore
+        coupon_code=redemption.coupon_code,
+        total_amount=redemption.total_amount,
+        idempotency_key=idempotency_key,
+    )
+    if replayed:
+        response.status_code = status.HTTP_200_OK
+        response.headers[IDEMPOTENCY_REPLAYED_HEADER] = "true"
+    return {**transaction, "replayed": replayed}
+
+
+@router.get("/inventory", response_model=list[RoomInventoryOut])
+async def read_room_inventory(
+    start_date: date,
+    end_date: date,
+    current_user: UserSnapshot = Depends(get_current_user_from_access_token_claims),
+    db: AsyncSession = Depends(get_read_db),
+):
+    operator = await get_approved_hotel(db, user_id=current_user.id)  # type: ignore
+    return await booking_crud.get_room_inventory(
+        db, operator_id=operator.id, start_date=start_date, end_date=end_date  # type: ignore
+    )
+
+
+@router.put("/inventory", response_model=list[RoomInventoryOut])
+async def set_room_inventory(
+    inventory: RoomInventoryIn,
+    current_user: UserSnapshot = Depends(get_current_user_from_access_token_claims),
+    read_db: AsyncSession = Depends(get_read_db),
+    write_db: AsyncSession = Depends(get_write_db),
+):
+    operator = await get_approved_hotel(read_db, user_id=current_user.id)  # type: ignore
+    return await booking_crud.set_room_inventory(
+        write_db,
+        operator_id=operator.id,  # type: ignore
+        start_date=inventory.start_date,
+        end_date=inventory.end_date,
+        total_rooms=inventory.total_rooms,
+        price_per_night=inventory.price_per_night,
+    )
@@ -1,13 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.database.session import get_db
+from app.configs.app_config import app_config
+from app.database.session import get_read_db, get_write_db
 from app.schemas.province_schema import ProvinceCreate, ProvinceOut
 from app.crud import province_crud
 from app.models import CityTierEnum
+from app.utils.fast_json import JSONRouteClass
+from app.utils.http_cache import (
+    accepts_encoding,
+    cache_headers,
+    etag_matches,
+    make_etag,
+    not_modified_response,
+)
+from app.utils.province_response_cache import province_response_cache
 
-router = APIRouter(prefix="/provinces", tags=["Provinces"], redirect_slashes=False)
+router = APIRouter(
+    prefix="/provinces", tags=["Provinces"], redirect_slashes=False, route_class=JSONRouteClass
+)
 
 
 @router.post(
@@ -17,7 +29,7 @@ router = APIRouter(prefix="/provinces", tags=["Provinces"], redirect_slashes=Fal
 )
 async def create_province(
     province_create: ProvinceCreate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
 ):
     new_province = await province_crud.create_province(db, province_create)
     return new_province
@@ -25,15 +37,29 @@ async def create_province(
 
 @router.get("/", response_model=List[ProvinceOut])
 async def read_provinces(
+    request: Request,
     city_tier: CityTierEnum | None = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    provinces = await province_crud.get_all_provinces(db, city_tier=city_tier)
-    return provinces
+    catalogue = await province_crud.get_catalogue(db)
+    body, gzipped = province_response_cache.get(
+        catalogue, city_tier, accepts_encoding(request, "gzip")
+    )
+    # * ETag แบบ strong ต้องต่างกันตาม content-coding ของ body ที่ส่งจริง
+    etag = make_etag(
+        "provinces", catalogue.fingerprint, city_tier, "gzip" if gzipped else "identity"
+    )
+    if etag_matches(request, etag):
+        return not_modified_response(etag, app_config.CACHE_CONTROL_PROVINCES, "Accept-Encoding")
+
+    headers = cache_headers(etag, app_config.CACHE_CONTROL_PROVINCES, "Accept-Encoding")
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/{province_id}", response_model=ProvinceOut)
-async def read_province(province_id: int, db: AsyncSession = Depends(get_db)):
+async def read_province(province_id: int, db: AsyncSession = Depends(get_read_db)):
     province = await province_crud.get_province_by_id(db, province_id)
     if not province:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Province not found")
@@ -44,6 +70,6 @@ async def read_province(province_id: int, db: AsyncSession = Depends(get_db)):
     "/secondary",
     response_model=List[ProvinceOut],
 )
-async def read_secondary_provinces(db: AsyncSession = Depends(get_db)):
+async def read_secondary_provinces(db: AsyncSession = Depends(get_read_db)):
     provinces = await province_crud.get_all_provinces(db, city_tier=CityTierEnum.SECONDARY)
     return provinces
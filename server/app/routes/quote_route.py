@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.configs.app_config import app_config
+from app.crud import province_crud
+from app.database.session import get_read_db
+from app.schemas.quote_schema import QuoteBatchIn, QuoteBatchOut, QuoteLineIn
+from app.security import get_current_user_from_access_token_claims
+from app.utils.fast_json import JSONRouteClass, dumps
+from app.utils.province_catalogue import CatalogueSnapshot
+from app.utils.project_settings import project_settings
+from app.utils.quote_engine import UnknownProvinceError
+
+router = APIRouter(prefix="/quotes", tags=["Quotes"], route_class=JSONRouteClass)
+
+QUOTE_BATCH_BODY_SCHEMA = {
+    "type": "object",
+    "required": ["lines"],
+    "properties": {"lines": {"type": "array", "items": QuoteLineIn.model_json_schema()}},
+}
+
+
+def build_quote_batch_response(body: bytes, catalogue: CatalogueSnapshot) -> bytes:
+    try:
+        batch = QuoteBatchIn.model_validate_json(body)
+    except ValidationError as e:
+        errors = e.errors(include_url=False)
+        if any(error["type"] == "too_long" and error["loc"] == ("lines",) for error in errors):
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Quote batch is limited to {app_config.QUOTE_BATCH_MAX_LINES} lines",
+            )
+        raise RequestValidationError(errors)
+
+    try:
+        result = project_settings.current.quote_engine.quote_batch(catalogue, batch.lines)
+    except UnknownProvinceError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return dumps({"quotes": result.rows(), **result.totals()})
+
+
+@router.post(
+    "/batch",
+    response_model=QuoteBatchOut,
+    dependencies=[Depends(get_current_user_from_access_token_claims)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": QUOTE_BATCH_BODY_SCHEMA}},
+        }
+    },
+)
+async def quote_batch(request: Request, db: AsyncSession = Depends(get_read_db)):
+    catalogue = await province_crud.get_catalogue(db)
+    body = await request.body()
+    # * validate, คำนวณ และแปลง JSON ของ batch ใหญ่ใช้ CPU นาน ย้ายไป thread ไม่ให้ event loop ค้าง
+    content = await run_in_threadpool(build_quote_batch_response, body, catalogue)
+    return Response(content=content, media_type="application/json")
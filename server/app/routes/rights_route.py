@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import province_crud, rights_crud
+from app.database.session import get_read_db, get_write_db
+from app.schemas.rights_schema import RightsReservationIn, RightsReservationOut, TouristRightOut
+from app.security import (
+    get_current_user_from_access_token_claims,
+    get_current_user_with_access_token,
+)
+from app.utils.fast_json import JSONRouteClass
+from app.utils.principal_cache import UserSnapshot
+
+router = APIRouter(prefix="/users/me/rights", tags=["Rights"], route_class=JSONRouteClass)
+
+
+@router.get("/", response_model=list[TouristRightOut])
+async def read_rights(
+    current_user: UserSnapshot = Depends(get_current_user_from_access_token_claims),
+    db: AsyncSession = Depends(get_read_db),
+):
+    rights = await rights_crud.get_tourist_rights(db, user_id=current_user.id)
+    return list(rights.values())
+
+
+@router.post(
+    "/reservations",
+    response_model=RightsReservationOut,
+    status_code=status.HTTP_201_CREATED,
+)
+async def reserve_right(
+    reservation: RightsReservationIn,
+    current_user: UserSnapshot = Depends(get_current_user_with_access_token),
+    db: AsyncSession = Depends(get_write_db),
+):
+    province = await province_crud.get_province_by_id(db, reservation.province_id)
+    if not province:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Province not found")
+
+    return await rights_crud.reserve_right(db, user_id=current_user.id, province=province)  # type: ignore
+
+
+@router.post("/reservations/{id}/confirm", response_model=RightsReservationOut)
+async def confirm_reservation(
+    id: int,
+    current_user: UserSnapshot = Depends(get_current_user_with_access_token),
+    db: AsyncSession = Depends(get_write_db),
+):
+    return await rights_crud.confirm_reservation(db, id=id, user_id=current_user.id)  # type: ignore
+
+
+@router.delete("/reservations/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def release_reservation(
+    id: int,
+    current_user: UserSnapshot = Depends(get_current_user_with_access_token),
+    db: AsyncSession = Depends(get_write_db),
+):
+    await rights_crud.release_reservation(db, id=id, user_id=current_user.id)  # type: ignore
+    return
@@ -1,14 +1,18 @@
 from fastapi import APIRouter, Depends
 
-from app.models import User
+from app.utils.fast_json import JSONRouteClass
+from app.utils.principal_cache import UserSnapshot
 from app.schemas.user_schema import UserOut
 from app.security import (
     get_current_user_with_access_token,
 )
 
-router = APIRouter(prefix="/users", tags=["Users"])
+router = APIRouter(prefix="/users", tags=["Users"], route_class=JSONRouteClass)
 
 
+# * UserOut มีเลขบัตรประชาชนและเบอร์โทรซึ่งไม่อยู่ใน claims จึงต้องอ่านจาก cache หรือตาราง users
 @router.get("/me", response_model=UserOut)
-async def read_me(current_user: User = Depends(get_current_user_with_access_token)):
+async def read_me(
+    current_user: UserSnapshot = Depends(get_current_user_with_access_token),
+):
     return current_user
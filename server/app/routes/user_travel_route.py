@@ -1,18 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import calendar
+from datetime import date
+from decimal import Decimal
+from typing import Any, AsyncIterator
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
 
-from app.database.session import get_db
+from app.configs.app_config import app_config
+from app.database.session import get_read_db, get_write_db
 from app.schemas.user_travel_schema import (
+    OverlapPolicyEnum,
+    TravelCalendar,
+    TravelSummary,
     UserTravelCreate,
     UserTravelUpdate,
     UserTravelOut,
+    UserTravelPage,
+    UserTravelImportResult,
 )
 from app.crud import user_travel_crud, province_crud
-from app.security import get_current_user_with_access_token
-from app.models import User
+from app.security import (
+    get_current_user_with_access_token,
+    get_current_user_from_access_token_claims,
+)
+from app.utils.fast_json import JSONRouteClass, iter_ndjson_lines, loads
+from app.utils.http_cache import cache_headers, etag_matches, make_etag, not_modified_response
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.principal_cache import UserSnapshot
+from app.utils.project_settings import project_settings
+from app.utils.quote_engine import estimate_tax_deduction
+
+router = APIRouter(prefix="/users/me/travels", tags=["User Travels"], route_class=JSONRouteClass)
+
 
-router = APIRouter(prefix="/users/me/travels", tags=["User Travels"])
+def set_overlapping_travels_header(response: Response, overlapping_ids: list[int]) -> None:
+    if overlapping_ids:
+        response.headers[user_travel_crud.OVERLAPPING_TRAVELS_HEADER] = ",".join(
+            map(str, overlapping_ids)
+        )
 
 
 @router.post(
@@ -22,8 +47,10 @@ router = APIRouter(prefix="/users/me/travels", tags=["User Travels"])
 )
 async def create_travel(
     user_travel: UserTravelCreate,
-    current_user: User = Depends(get_current_user_with_access_token),
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    on_overlap: OverlapPolicyEnum = OverlapPolicyEnum.REJECT,
+    current_user: UserSnapshot = Depends(get_current_user_with_access_token),
+    db: AsyncSession = Depends(get_write_db),
 ):
     province = await province_crud.get_province_by_id(db, user_travel.province_id)
     if not province:
@@ -34,28 +61,270 @@ async def create_travel(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Start date cannot be after end date"
         )
 
-    travel = await user_travel_crud.create_user_travel(
-        db, user_id=current_user.id, user_travel=user_travel  # type: ignore
+    travel, overlapping_ids = await user_travel_crud.create_user_travel(
+        db,
+        user_id=current_user.id,  # type: ignore
+        user_travel=user_travel,
+        province=province,
+        on_overlap=on_overlap,
     )
+    set_overlapping_travels_header(response, overlapping_ids)
     return travel
 
 
-@router.get("/", response_model=List[UserTravelOut])
+IMPORT_BODY_SCHEMA = {"type": "array", "items": {"$ref": "#/components/schemas/UserTravelCreate"}}
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def too_many_rows_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Import is limited to {app_config.TRAVEL_IMPORT_MAX_ROWS} rows",
+    )
+
+
+async def iter_import_rows(request: Request) -> AsyncIterator[Any]:
+    """คืนแต่ละแถวของ body: NDJSON อ่านแบบ stream เป็น bytes ทีละบรรทัด ส่วน JSON array คืนเป็น object"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_CONTENT_TYPES:
+        async for line in iter_ndjson_lines(request.stream()):
+            yield line
+        return
+
+    try:
+        rows = loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON body")
+    if not isinstance(rows, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a JSON array of travels"
+        )
+    if len(rows) > app_config.TRAVEL_IMPORT_MAX_ROWS:
+        raise too_many_rows_exception()
+    for row in rows:
+        yield row
+
+
+def format_validation_error(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in error['loc']) or 'row'}: {error['msg']}"
+        for error in e.errors()
+    )
+
+
+@router.post(
+    "/import",
+    response_model=UserTravelImportResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": IMPORT_BODY_SCHEMA},
+                "application/x-ndjson": {"schema": IMPORT_BODY_SCHEMA},
+            },
+        }
+    },
+)
+async def import_travels(
+    request: Request,
+    on_overlap: OverlapPolicyEnum = OverlapPolicyEnum.REJECT,
+    current_user: UserSnapshot = Depends(get_current_user_with_access_token),
+    read_db: AsyncSession = Depends(get_read_db),
+    write_db: AsyncSession = Depends(get_write_db),
+):
+    # * ตรวจ province_id กับ catalogue ในหน่วยความจำครั้งเดียว แทนการ query ทีละแถว
+    catalogue = await province_crud.get_catalogue(read_db)
+
+    results: list[dict] = []
+    valid_rows: list[tuple[dict, UserTravelCreate]] = []
+    async for row in iter_import_rows(request):
+        if len(results) >= app_config.TRAVEL_IMPORT_MAX_ROWS:
+            raise too_many_rows_exception()
+
+        result: dict = {"index": len(results), "id": None, "error": None}
+        results.append(result)
+        try:
+            if isinstance(row, bytes):
+                user_travel = UserTravelCreate.model_validate_json(row)
+            else:
+                user_travel = UserTravelCreate.model_validate(row)
+        except ValidationError as e:
+            result["error"] = format_validation_error(e)
+            continue
+
+        if user_travel.province_id not in catalogue.by_id:
+            result["error"] = "Province not found"
+        elif user_travel.start_date > user_travel.end_date:
+            result["error"] = "Start date cannot be after end date"
+        else:
+            valid_rows.append((result, user_travel))
+
+    created = await user_travel_crud.bulk_create_user_travels(
+        write_db,
+        user_id=current_user.id,  # type: ignore
+        user_travels=[user_travel for _, user_travel in valid_rows],
+        on_overlap=on_overlap,
+    )
+    imported = 0
+    for (result, _), (travel_id, overlapping_ids) in zip(valid_rows, created):
+        result["id"] = travel_id
+        result["overlapping_ids"] = overlapping_ids
+        if travel_id is None:
+            result["error"] = "Travel dates overlap with existing travel plans"
+        else:
+            imported += 1
+
+    return {"imported": imported, "failed": len(results) - imported, "results": results}
+
+
+@router.get("/", response_model=UserTravelPage)
 async def read_travels(
-    current_user: User = Depends(get_current_user_with_access_token),
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    limit: int = Query(
+        default=app_config.TRAVEL_PAGE_SIZE_DEFAULT, ge=1, le=app_config.TRAVEL_PAGE_SIZE_MAX
+    ),
+    cursor: str | None = None,
+    from_date: date | None = Query(default=None, alias="from"),
+    to_date: date | None = Query(default=None, alias="to"),
+    current_user: UserSnapshot = Depends(get_current_user_from_access_token_claims),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    travels = await user_travel_crud.get_user_travels_by_user_id(
-        db, user_id=current_user.id  # type: ignore
+    if from_date and to_date and from_date > to_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="From date cannot be after to date"
+        )
+
+    after = None
+    if cursor:
+        try:
+            start_date, travel_id = decode_cursor(cursor)
+            after = (date.fromisoformat(start_date), int(travel_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    catalogue = await province_crud.get_catalogue(db)
+    fingerprint = await user_travel_crud.get_user_travels_fingerprint(db, user_id=current_user.id)
+    etag = make_etag(
+        "travels",
+        current_user.id,
+        limit,
+        cursor,
+        from_date,
+        to_date,
+        catalogue.fingerprint,
+        *fingerprint,
+    )
+    if etag_matches(request, etag):
+        return not_modified_response(etag, app_config.CACHE_CONTROL_USER_TRAVELS)
+
+    response.headers.update(cache_headers(etag, app_config.CACHE_CONTROL_USER_TRAVELS))
+    travels, next_key = await user_travel_crud.get_user_travels_by_user_id(
+        db,
+        user_id=current_user.id,  # type: ignore
+        limit=limit,
+        after=after,
+        from_date=from_date,
+        to_date=to_date,
     )
-    return travels
+    return {
+        "items": travels,
+        "next_cursor": encode_cursor(*next_key) if next_key else None,
+    }
+
+
+@router.get("/calendar", response_model=TravelCalendar)
+async def read_travel_calendar(
+    request: Request,
+    response: Response,
+    # * ปี 0000 ไม่มีใน datetime.date จึงต้องกันไว้ตั้งแต่ตรวจรูปแบบ
+    month: str = Query(
+        pattern=r"^(000[1-9]|00[1-9]\d|0[1-9]\d{2}|[1-9]\d{3})-(0[1-9]|1[0-2])$",
+        examples=["2025-01"],
+    ),
+    current_user: UserSnapshot = Depends(get_current_user_from_access_token_claims),
+    db: AsyncSession = Depends(get_read_db),
+):
+    year, month_number = map(int, month.split("-"))
+    month_start = date(year, month_number, 1)
+    month_end = date(year, month_number, calendar.monthrange(year, month_number)[1])
+
+    catalogue = await province_crud.get_catalogue(db)
+    fingerprint = await user_travel_crud.get_user_travels_fingerprint(db, user_id=current_user.id)
+    etag = make_etag("calendar", current_user.id, month, catalogue.fingerprint, *fingerprint)
+    if etag_matches(request, etag):
+        return not_modified_response(etag, app_config.CACHE_CONTROL_USER_TRAVELS)
+
+    response.headers.update(cache_headers(etag, app_config.CACHE_CONTROL_USER_TRAVELS))
+    days = await user_travel_crud.get_user_travel_calendar(
+        db, user_id=current_user.id, month_start=month_start, month_end=month_end  # type: ignore
+    )
+    return {
+        "month": month,
+        "provinces": [
+            {"province": catalogue.by_id[province_id], "days": province_days}
+            for province_id, province_days in sorted(days.items())
+            # * จังหวัดที่เพิ่มจาก worker อื่นหลัง catalogue โหลดจะแสดงหลัง catalogue รีเฟรช
+            if province_id in catalogue.by_id
+        ],
+    }
+
+
+@router.get("/summary", response_model=TravelSummary)
+async def read_travel_summary(
+    request: Request,
+    response: Response,
+    current_user: UserSnapshot = Depends(get_current_user_from_access_token_claims),
+    db: AsyncSession = Depends(get_read_db),
+):
+    fingerprint = await user_travel_crud.get_user_travels_fingerprint(db, user_id=current_user.id)
+    settings = project_settings.current
+    daily_spend = settings.travel_summary_daily_spend
+    etag = make_etag(
+        "summary",
+        current_user.id,
+        daily_spend,
+        settings.subsidy_cap_per_night,
+        settings.subsidy_rate_main_city,
+        settings.subsidy_rate_secondary_city,
+        *fingerprint,
+    )
+    if etag_matches(request, etag):
+        return not_modified_response(etag, app_config.CACHE_CONTROL_USER_TRAVELS)
+
+    response.headers.update(cache_headers(etag, app_config.CACHE_CONTROL_USER_TRAVELS))
+    summaries = await user_travel_crud.get_user_travel_summary(db, user_id=current_user.id)  # type: ignore
+    tiers = [
+        {
+            "city_tier": summary.city_tier,
+            "trips": summary.trips,
+            "travel_days": summary.travel_days,
+            "estimated_subsidy": settings.quote_engine.estimate_subsidy(
+                daily_spend, summary.travel_days, summary.city_tier  # type: ignore
+            ),
+            "estimated_tax_deduction": estimate_tax_deduction(
+                daily_spend, summary.rate_day_points  # type: ignore
+            ),
+        }
+        for summary in summaries
+    ]
+    return {
+        "trips": sum(tier["trips"] for tier in tiers),
+        "travel_days": sum(tier["travel_days"] for tier in tiers),
+        "daily_spend": daily_spend,
+        "estimated_subsidy": sum((tier["estimated_subsidy"] for tier in tiers), Decimal("0.00")),
+        "estimated_tax_deduction": sum(
+            (tier["estimated_tax_deduction"] for tier in tiers), Decimal("0.00")
+        ),
+        "tiers": tiers,
+    }
 
 
 @router.get("/{id}", response_model=UserTravelOut)
 async def read_travel(
     id: int,
-    current_user: User = Depends(get_current_user_with_access_token),
-    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user_from_access_token_claims),
+    db: AsyncSession = Depends(get_read_db),
 ):
     travel = await user_travel_crud.get_user_travel_by_id(db, id=id, user_id=current_user.id)  # type: ignore
     if not travel:
@@ -69,13 +338,14 @@ async def read_travel(
 async def update_travel(
     id: int,
     travel_update: UserTravelUpdate,
-    current_user: User = Depends(get_current_user_with_access_token),
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    on_overlap: OverlapPolicyEnum = OverlapPolicyEnum.REJECT,
+    current_user: UserSnapshot = Depends(get_current_user_with_access_token),
+    db: AsyncSession = Depends(get_write_db),
 ):
-    if travel_update.province_id:
-        province = await province_crud.get_province_by_id(db, travel_update.province_id)
-        if not province:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Province not found")
+    province = await province_crud.get_province_by_id(db, travel_update.province_id)
+    if not province:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Province not found")
 
     if (
         travel_update.start_date
@@ -86,17 +356,23 @@ async def update_travel(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Start date cannot be after end date"
         )
 
-    travel = await user_travel_crud.update_user_travel(
-        db, id=id, user_id=current_user.id, travel_update=travel_update  # type: ignore
+    travel, overlapping_ids = await user_travel_crud.update_user_travel(
+        db,
+        id=id,
+        user_id=current_user.id,  # type: ignore
+        travel_update=travel_update,
+        province=province,
+        on_overlap=on_overlap,
     )
+    set_overlapping_travels_header(response, overlapping_ids)
     return travel
 
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_travel(
     id: int,
-    current_user: User = Depends(get_current_user_with_access_token),
-    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user_with_access_token),
+    db: AsyncSession = Depends(get_write_db),
 ):
 
     await user_travel_crud.delete_user_travel(db, id=id, user_id=current_user.id)  # type: ignore
@@ -0,0 +1,54 @@
+from datetime import date, datetime
+from decimal import Decimal
+from pydantic import BaseModel, Field
+
+from app.models import BookingStatusEnum
+
+
+class RoomInventoryIn(BaseModel):
+    start_date: date
+    end_date: date
+    total_rooms: int = Field(ge=0)
+    price_per_night: Decimal = Field(ge=0, max_digits=10, decimal_places=2)
+
+
+class RoomInventoryOut(BaseModel):
+    operator_id: int
+    stay_date: date
+    total_rooms: int
+    available_rooms: int
+    price_per_night: Decimal
+
+    class Config:
+        model_config = {"from_attributes": True}
+
+
+class HotelAvailabilityOut(BaseModel):
+    operator_id: int
+    business_name: str
+    province_id: int
+    available_rooms: int
+
+
+class BookingIn(BaseModel):
+    hotel_operator_id: int
+    check_in_date: date
+    check_out_date: date
+
+
+class BookingOut(BaseModel):
+    id: int
+    tourist_id: int
+    hotel_operator_id: int
+    check_in_date: date
+    check_out_date: date
+    num_nights: int
+    total_cost: Decimal
+    subsidy_rate: Decimal
+    government_subsidy: Decimal
+    tourist_payment: Decimal
+    booking_status: BookingStatusEnum
+    created_at: datetime
+
+    class Config:
+        model_config = {"from_attributes": True}
@@ -0,0 +1,25 @@
+from decimal import Decimal
+from pydantic import BaseModel, Field
+
+from app.configs.app_config import app_config
+
+
+class BudgetConfigIn(BaseModel):
+    total: Decimal = Field(ge=0, max_digits=14, decimal_places=2)
+    shards: int = Field(default=app_config.SUBSIDY_BUDGET_SHARDS, ge=1, le=256)
+
+
+class BudgetShardOut(BaseModel):
+    id: int
+    remaining: Decimal
+
+
+class BudgetStatus(BaseModel):
+    total: Decimal
+    remaining: Decimal
+    allocated: Decimal
+    shards: list[BudgetShardOut]
+
+
+class BudgetRebalanceResult(BaseModel):
+    changed_shards: int
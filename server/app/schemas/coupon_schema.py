@@ -0,0 +1,35 @@
+from datetime import date, datetime
+from decimal import Decimal
+from pydantic import BaseModel, Field
+
+from app.models import CouponStatusEnum
+
+
+class ECouponOut(BaseModel):
+    id: int
+    booking_id: int
+    tourist_id: int
+    coupon_code: str
+    amount: Decimal
+    issue_date: date
+    expiry_datetime: datetime
+    status: CouponStatusEnum
+
+    class Config:
+        model_config = {"from_attributes": True}
+
+
+class CouponRedeemIn(BaseModel):
+    coupon_code: str = Field(min_length=1, max_length=20)
+    total_amount: Decimal = Field(gt=0, max_digits=10, decimal_places=2)
+
+
+class CouponTransactionOut(BaseModel):
+    id: int
+    coupon_id: int
+    coupon_code: str
+    service_operator_id: int
+    total_amount: Decimal
+    discount_applied: Decimal
+    transaction_time: datetime
+    replayed: bool = False
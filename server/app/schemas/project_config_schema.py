@@ -0,0 +1,21 @@
+from decimal import Decimal
+from pydantic import BaseModel, Field
+
+
+class ProjectConfigIn(BaseModel):
+    value: str = Field(min_length=1, max_length=255)
+    description: str | None = None
+
+
+class ProjectSettingsOut(BaseModel):
+    version: int
+    loaded: bool
+    coupon_amount: Decimal
+    coupons_per_night: int
+    subsidy_cap_per_night: Decimal
+    subsidy_rate_main_city: Decimal
+    subsidy_rate_secondary_city: Decimal
+    rights_main_city_quota: int
+    rights_secondary_city_quota: int
+    rights_reservation_ttl_seconds: int
+    travel_summary_daily_spend: Decimal
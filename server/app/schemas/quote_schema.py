@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field
+from decimal import Decimal
+
+from app.configs.app_config import app_config
+
+
+class QuoteLineIn(BaseModel):
+    province_id: int
+    nights: int = Field(gt=0)
+    total_cost: Decimal = Field(ge=0, max_digits=10, decimal_places=2)
+
+
+class QuoteBatchIn(BaseModel):
+    # * จำกัดจำนวนบรรทัดใน schema การ validate จึงหยุดทันทีที่เกิน ไม่ต้อง validate ทุกบรรทัดก่อน
+    lines: list[QuoteLineIn] = Field(min_length=1, max_length=app_config.QUOTE_BATCH_MAX_LINES)
+
+
+class QuoteOut(BaseModel):
+    province_id: int
+    nights: int
+    total_cost: Decimal
+    subsidy_rate: Decimal
+    government_subsidy: Decimal
+    tourist_payment: Decimal
+
+
+class QuoteBatchOut(BaseModel):
+    quotes: list[QuoteOut]
+    total_cost: Decimal
+    government_subsidy: Decimal
+    tourist_payment: Decimal
@@ -0,0 +1,28 @@
+from datetime import datetime
+from pydantic import BaseModel
+
+from app.models import CityTierEnum, RightsReservationStatusEnum
+
+
+class TouristRightOut(BaseModel):
+    city_tier: CityTierEnum
+    remaining: int
+    held: int
+
+
+class RightsReservationIn(BaseModel):
+    province_id: int
+
+
+class RightsReservationOut(BaseModel):
+    id: int
+    user_id: int
+    province_id: int
+    city_tier: CityTierEnum
+    status: RightsReservationStatusEnum
+    expires_at: datetime
+    created_at: datetime
+
+
+class RightsSweepResult(BaseModel):
+    released: int
@@ -1,9 +1,17 @@
+import enum
 from pydantic import BaseModel
 from datetime import date, datetime
+from decimal import Decimal
 
+from app.models import CityTierEnum
 from app.schemas.province_schema import ProvinceOut
 
 
+class OverlapPolicyEnum(str, enum.Enum):
+    REJECT = "reject"
+    REPORT = "report"
+
+
 class UserTravelBase(BaseModel):
     province_id: int
     start_date: date
@@ -29,3 +37,69 @@ class UserTravelOut(UserTravelBase):
 
     class Config:
         model_config = {"from_attributes": True}
+
+
+class UserTravelPage(BaseModel):
+    items: list[UserTravelOut]
+    next_cursor: str | None = None
+
+
+class UserTravelImportRow(BaseModel):
+    index: int
+    id: int | None = None
+    error: str | None = None
+    overlapping_ids: list[int] = []
+
+
+class UserTravelImportResult(BaseModel):
+    imported: int
+    failed: int
+    results: list[UserTravelImportRow]
+
+
+class TravelCalendarProvince(BaseModel):
+    province: ProvinceOut
+    days: list[date]
+
+
+class TravelCalendar(BaseModel):
+    month: str
+    provinces: list[TravelCalendarProvince]
+
+
+class TravelOverlapOut(BaseModel):
+    user_id: int
+    travel_id: int
+    other_travel_id: int
+    overlap_start: date
+    overlap_end: date
+
+
+class TravelOverlapReport(BaseModel):
+    users: int
+    travels: int
+    overlaps: list[TravelOverlapOut]
+    next_cursor: str | None = None
+
+
+class TravelSummaryTier(BaseModel):
+    city_tier: CityTierEnum
+    trips: int
+    travel_days: int
+    # * ส่วนที่รัฐช่วยจ่าย (subsidy_rate ของประเภทเมือง ไม่เกินเพดานต่อคืน)
+    estimated_subsidy: Decimal
+    # * ค่าใช้จ่ายที่นำไปลดหย่อนภาษีได้ (ค่าใช้จ่าย × tax_reduction_rate ของจังหวัด)
+    estimated_tax_deduction: Decimal
+
+
+class TravelSummary(BaseModel):
+    trips: int
+    travel_days: int
+    daily_spend: Decimal
+    estimated_subsidy: Decimal
+    estimated_tax_deduction: Decimal
+    tiers: list[TravelSummaryTier]
+
+
+class TravelSummaryRebuild(BaseModel):
+    rows: int
@@ -1,22 +1,33 @@
 # security.py
+import secrets
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from typing import Any, Callable
 
-from app.database.session import get_db
+from app.database.session import get_read_db
 from app.models import User
 from app.configs.app_config import app_config
-
+from app.utils.hashing_pool import HashingPool, HashingPoolSaturatedError, HashingPoolTimeoutError
+from app.utils.principal_cache import UserSnapshot, principal_cache
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+hashing_pool = HashingPool(
+    kind=app_config.PASSWORD_HASHING_POOL,
+    max_workers=app_config.PASSWORD_HASHING_WORKERS,
+    queue_limit=app_config.PASSWORD_HASHING_QUEUE_LIMIT,
+    timeout=app_config.PASSWORD_HASHING_TIMEOUT,
+)
+
 
 refresh_token_scheme = OAuth2PasswordBearer(tokenUrl="/auth/refresh")
 access_token_scheme = OAuth2PasswordBearer(tokenUrl="/auth/access")
+admin_key_scheme = APIKeyHeader(name="X-Admin-Key", scheme_name="AdminKey", auto_error=False)
 
 
 def get_password_hash(password: str) -> str:
@@ -35,6 +46,41 @@ def verify_pin(plain_pin: str, pin_hash: str) -> bool:
     return pwd_context.verify(plain_pin, pin_hash)
 
 
+async def _run_hashing(fn: Callable[..., Any], *args: Any) -> Any:
+    try:
+        return await hashing_pool.run(fn, *args)
+    except (HashingPoolSaturatedError, HashingPoolTimeoutError):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy, please try again",
+            headers={"Retry-After": "1"},
+        )
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hashing(get_password_hash, password)
+
+
+async def get_pin_hash_async(pin: str) -> str:
+    return await _run_hashing(get_pin_hash, pin)
+
+
+async def verify_password_async(plain_password: str, password_hash: str) -> bool:
+    return await _run_hashing(verify_password, plain_password, password_hash)
+
+
+async def verify_pin_async(plain_pin: str, pin_hash: str) -> bool:
+    return await _run_hashing(verify_pin, plain_pin, pin_hash)
+
+
+def user_token_claims(user: User | UserSnapshot, include_profile: bool = False) -> dict:
+    claims = {"sub": str(user.id), "ver": user.token_version or 0}
+    if include_profile:
+        snapshot = user if isinstance(user, UserSnapshot) else UserSnapshot.from_user(user)
+        claims["usr"] = snapshot.to_claims()
+    return claims
+
+
 def create_refresh_token(
     data: dict, expires_delta: timedelta = timedelta(days=app_config.REFRESH_TOKEN_EXPIRE)
 ) -> str:
@@ -54,58 +100,86 @@ def create_access_token(
     return jwt.encode(to_encode, app_config.ACCESS_SECRET_KEY, algorithm=app_config.ALGORITHM)
 
 
-async def get_current_user_with_refresh_token(
-    refresh_token: str = Depends(refresh_token_scheme), db: AsyncSession = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
 
+def _decode_token(token: str, secret_key: str) -> tuple[int, dict]:
     try:
-        payload = jwt.decode(
-            refresh_token,
-            app_config.REFRESH_SECRET_KEY,
-            algorithms=[app_config.ALGORITHM],
-        )
+        payload = jwt.decode(token, secret_key, algorithms=[app_config.ALGORITHM])
         user_id = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-        int(user_id)
+        return int(user_id), payload
     except (JWTError, ValueError):
         raise credentials_exception
 
+
+async def get_current_user_with_refresh_token(
+    refresh_token: str = Depends(refresh_token_scheme), db: AsyncSession = Depends(get_read_db)
+) -> User:
+    user_id, payload = _decode_token(refresh_token, app_config.REFRESH_SECRET_KEY)
+
     result = await db.execute(select(User).filter(User.id == user_id))
     user = result.scalars().first()
 
-    if user is None:
+    if user is None or payload.get("ver", 0) != user.token_version:
         raise credentials_exception
     return user
 
 
 async def get_current_user_with_access_token(
-    access_token: str = Depends(access_token_scheme), db: AsyncSession = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(
-            access_token, app_config.ACCESS_SECRET_KEY, algorithms=[app_config.ALGORITHM]
-        )
-        user_id = payload.get("sub")
-        if user_id is None:
+    access_token: str = Depends(access_token_scheme), db: AsyncSession = Depends(get_read_db)
+) -> UserSnapshot:
+    """ตรวจ token กับข้อมูลผู้ใช้ล่าสุด (cache หรือตาราง users) ใช้กับ route ที่ต้องการข้อมูลสด"""
+    user_id, payload = _decode_token(access_token, app_config.ACCESS_SECRET_KEY)
+
+    snapshot = principal_cache.get(user_id, access_token)
+    if snapshot is None:
+        result = await db.execute(select(User).filter(User.id == user_id))
+        user = result.scalars().first()
+
+        if user is None:
             raise credentials_exception
-        int(user_id)
-    except (JWTError, ValueError):
+
+        snapshot = UserSnapshot.from_user(user)
+        principal_cache.set(access_token, snapshot)
+
+    if payload.get("ver", 0) != snapshot.token_version:
         raise credentials_exception
+    return snapshot
 
-    result = await db.execute(select(User).filter(User.id == user_id))
-    user = result.scalars().first()
 
-    if user is None:
+async def get_current_user_from_access_token_claims(
+    access_token: str = Depends(access_token_scheme), db: AsyncSession = Depends(get_read_db)
+) -> UserSnapshot:
+    """เชื่อ claims ใน access token โดยไม่แตะตาราง users ใช้กับ route อ่านอย่างเดียว
+
+    token ที่ถูกเพิกถอน (logout หรือปิดบัญชี) ถูกปฏิเสธจากเลข token_version ต่ำสุดที่ principal_cache
+    จำไว้ process ที่รับคำขอเพิกถอนมีผลทันที ส่วน worker อื่นและ process ที่เพิ่ง restart
+    ได้รับจากตาราง token_revocations ผ่าน token_revocation_feed ภายในหนึ่งรอบ poll
+    """
+    user_id, payload = _decode_token(access_token, app_config.ACCESS_SECRET_KEY)
+    if principal_cache.is_revoked(user_id, payload.get("ver", 0)):
         raise credentials_exception
-    return user
+
+    claims = payload.get("usr")
+    if claims is None:
+        # * token รุ่นเก่าไม่มี claims ของผู้ใช้ ต้องโหลดจากฐานข้อมูล
+        return await get_current_user_with_access_token(access_token, db)
+
+    try:
+        return UserSnapshot.from_claims(user_id, payload.get("ver", 0), claims)
+    except (KeyError, ValueError):
+        raise credentials_exception
+
+
+async def require_admin_key(admin_key: str | None = Depends(admin_key_scheme)) -> None:
+    """ป้องกัน route /admin ด้วย X-Admin-Key ถ้าไม่ได้ตั้ง ADMIN_API_KEY จะปิด route กลุ่มนี้ทั้งหมด"""
+    if not app_config.ADMIN_API_KEY:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin API is disabled")
+    if admin_key is None or not secrets.compare_digest(admin_key, app_config.ADMIN_API_KEY):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin key")
@@ -3,8 +3,15 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 from sqlalchemy.pool import StaticPool
 
 from app.database.base import Base
-from app.database.session import get_db
+from app.database.session import get_read_db, get_write_db
 from app.main import app
+from app.utils.budget_rebalancer import budget_rebalancer
+from app.utils.coupon_pool import coupon_code_pool
+from app.utils.principal_cache import principal_cache
+from app.utils.project_settings import project_settings
+from app.utils.province_catalogue import province_catalogue
+from app.utils.rights_sweeper import rights_sweeper
+from app.utils.token_revocations import token_revocation_feed
 
 DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
@@ -35,6 +42,32 @@ async def override_get_db_fixture():
         async with TestingSessionLocal() as session:
             yield session
 
-    app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_read_db] = _override_get_db
+    app.dependency_overrides[get_write_db] = _override_get_db
+    # * StaticPool ใช้ connection เดียวร่วมกัน การเติม pool ใน background จะ rollback ทับ request
+    # * จึงให้เติมเฉพาะตอนรหัสไม่พอภายใน request
+    coupon_code_pool.session_factory = TestingSessionLocal
+    coupon_code_pool.low_watermark = 0
+    rights_sweeper.session_factory = TestingSessionLocal
+    budget_rebalancer.session_factory = TestingSessionLocal
+    project_settings.session_factory = TestingSessionLocal
+    token_revocation_feed.session_factory = TestingSessionLocal
     yield
-    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_read_db, None)
+    app.dependency_overrides.pop(get_write_db, None)
+
+
+@pytest_asyncio.fixture(scope="function", autouse=True)
+async def clear_caches():
+    principal_cache.clear()
+    province_catalogue.clear()
+    coupon_code_pool.clear()
+    project_settings.clear()
+    token_revocation_feed.clear()
+    yield
+    await coupon_code_pool.shutdown()
+    principal_cache.clear()
+    province_catalogue.clear()
+    coupon_code_pool.clear()
+    project_settings.clear()
+    token_revocation_feed.clear()
@@ -1,10 +1,14 @@
 import pytest
-from fastapi import status
+from fastapi import HTTPException, status
 from httpx import AsyncClient
 from httpx import ASGITransport
+from sqlalchemy import event
 
 from app.main import app
+from app.crud import user_crud
 from app.models import UserTypeEnum
+from app.schemas.user_schema import UserCreate
+from app.tests.conftest import TestingSessionLocal, engine_test
 
 
 @pytest.mark.asyncio
@@ -292,3 +296,59 @@ async def test_register_invalid_last_name_th(last_name_th, prepare_database):
         )
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
         # assert "Last name (TH) must contain only Thai characters (no spaces, numbers, or symbols) and be 1-50 characters long." in response.text
+
+
+@pytest.mark.asyncio
+async def test_register_race_maps_unique_constraint(prepare_database):
+    user_create = UserCreate(
+        email="race@example.com",
+        phone_number="0812345678",
+        citizen_id="0123456789123",
+        first_name_th="ชื่อภาษาไทย",
+        last_name_th="นามสกุลภาษาไทย",
+        agreed_to_terms=True,
+        password="password",
+    )
+    async with TestingSessionLocal() as session:
+        await user_crud.create_user(session, user_create, password_hash="hash")
+
+    # * จำลองคำขอที่ผ่านการตรวจล่วงหน้ามาพร้อมกัน ให้ unique constraint เป็นตัวตัดสิน
+    duplicate = user_create.model_copy(
+        update={"email": "other@example.com", "citizen_id": "1234567890123"}
+    )
+    async with TestingSessionLocal() as session:
+        with pytest.raises(HTTPException) as exc_info:
+            await user_crud.create_user(session, duplicate, password_hash="hash")
+
+    assert exc_info.value.status_code == status.HTTP_409_CONFLICT
+    assert exc_info.value.detail == "Phone number already registered"
+
+
+@pytest.mark.asyncio
+async def test_register_statement_count(prepare_database):
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    event.listen(engine_test.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+            response = await client.post(
+                "/api/auth/register",
+                json={
+                    "email": "count@example.com",
+                    "phone_number": "0812345678",
+                    "citizen_id": "0123456789123",
+                    "first_name_th": "ชื่อภาษาไทย",
+                    "last_name_th": "นามสกุลภาษาไทย",
+                    "agreed_to_terms": True,
+                    "password": "password",
+                },
+            )
+    finally:
+        event.remove(engine_test.sync_engine, "before_cursor_execute", count_statement)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert statements == ["SELECT", "INSERT"]
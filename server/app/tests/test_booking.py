@@ -0,0 +1,355 @@
+import asyncio
+import os
+import tempfile
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException, status
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker
+
+from app.crud import booking_crud, budget_crud
+from app.database.base import Base
+from app.database.session import create_sqlite_engine
+from app.main import app
+from app.models import (
+    Booking,
+    BookingStatusEnum,
+    BudgetShard,
+    BusinessTypeEnum,
+    CityTierEnum,
+    Operator,
+    OperatorStatusEnum,
+    ProjectConfig,
+    Province,
+    RoomInventory,
+    TouristRight,
+    User,
+    UserTypeEnum,
+)
+from app.tests.conftest import TestingSessionLocal, engine_test
+from app.tests.test_coupon import approve_operator, create_booking
+
+FLASH_SALE_START = date(2030, 3, 1)
+
+
+@pytest.mark.asyncio
+async def test_booking_lifecycle(prepare_database):
+    tourist_headers, _ = await create_booking()
+    hotel_headers = await approve_operator()
+    async with TestingSessionLocal() as session:
+        await budget_crud.configure_budget(session, total=Decimal("10000.00"), shards=2)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.put(
+            "/api/operators/me/inventory",
+            headers=hotel_headers,
+            json={
+                "start_date": "2030-03-01",
+                "end_date": "2030-03-04",
+                "total_rooms": 2,
+                "price_per_night": "1000.00",
+            },
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [row["available_rooms"] for row in response.json()] == [2, 2, 2, 2]
+        hotel_id = response.json()[0]["operator_id"]
+
+        search_url = "/api/hotels/availability"
+        response = await client.get(
+            search_url, params={"check_in_date": "2030-03-01", "check_out_date": "2030-03-04"}
+        )
+        assert response.json() == [
+            {
+                "operator_id": hotel_id,
+                "business_name": "โรงแรมน่าน",
+                "province_id": 1,
+                "available_rooms": 2,
+            }
+        ]
+        # * คืนที่ 2030-03-05 ยังไม่มีห้องในระบบ จึงไม่ว่างครบทุกคืน
+        response = await client.get(
+            search_url, params={"check_in_date": "2030-03-01", "check_out_date": "2030-03-06"}
+        )
+        assert response.json() == []
+
+        booking_url = "/api/users/me/bookings/"
+        stay = {
+            "hotel_operator_id": hotel_id,
+            "check_in_date": "2030-03-01",
+            "check_out_date": "2030-03-03",
+        }
+        ids = []
+        for _ in range(2):
+            response = await client.post(booking_url, headers=tourist_headers, json=stay)
+            assert response.status_code == status.HTTP_201_CREATED
+            ids.append(response.json()["id"])
+        body = response.json()
+        assert body["num_nights"] == 2
+        assert body["booking_status"] == "BOOKED"
+        assert Decimal(body["total_cost"]) == Decimal("2000.00")
+        assert Decimal(body["government_subsidy"]) == Decimal("1200.00")
+        assert Decimal(body["tourist_payment"]) == Decimal("800.00")
+
+        # * คืน 2030-03-02 เต็มแล้ว การจองทั้งช่วงต้องล้มเหลวโดยไม่กันห้องคืน 2030-03-03 ไว้
+        response = await client.post(
+            booking_url,
+            headers=tourist_headers,
+            json={**stay, "check_in_date": "2030-03-02", "check_out_date": "2030-03-04"},
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+        response = await client.get(
+            "/api/operators/me/inventory",
+            headers=hotel_headers,
+            params={"start_date": "2030-03-01", "end_date": "2030-03-04"},
+        )
+        assert [row["available_rooms"] for row in response.json()] == [0, 0, 2, 2]
+
+        response = await client.post(
+            booking_url, headers=tourist_headers, json={**stay, "check_out_date": "2030-03-01"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        response = await client.post(
+            booking_url, headers=tourist_headers, json={**stay, "hotel_operator_id": 999}
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        response = await client.put(
+            "/api/operators/me/inventory",
+            headers=hotel_headers,
+            json={
+                "start_date": "2030-03-01",
+                "end_date": "2030-03-01",
+                "total_rooms": 1,
+                "price_per_night": "1000.00",
+            },
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        response = await client.delete(f"{booking_url}{ids[0]}", headers=tourist_headers)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        response = await client.delete(f"{booking_url}{ids[0]}", headers=tourist_headers)
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        response = await client.put(
+            "/api/operators/me/inventory",
+            headers=hotel_headers,
+            json={
+                "start_date": "2030-03-01",
+                "end_date": "2030-03-02",
+                "total_rooms": 3,
+                "price_per_night": "1200.00",
+            },
+        )
+        assert [row["available_rooms"] for row in response.json()] == [2, 2]
+
+        response = await client.get(booking_url, headers=tourist_headers)
+        assert [booking["booking_status"] for booking in response.json()] == [
+            "BOOKED",
+            "CANCELLED",
+            "CHECKED_IN",
+        ]
+
+
+@pytest.mark.asyncio
+async def test_availability_search_uses_index(prepare_database):
+    query = booking_crud.availability_query(date(2030, 3, 1), date(2030, 3, 4), province_id=1)
+    compiled = query.compile(dialect=engine_test.dialect)
+    async with engine_test.connect() as conn:
+        result = await conn.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {compiled}", tuple(None for _ in compiled.positiontup or ())
+        )
+        plan = " | ".join(row[3] for row in result)
+    assert "COVERING INDEX ix_room_inventory_stay_date_available" in plan
+
+
+@pytest.mark.asyncio
+async def test_booking_draws_rights_and_budget(prepare_database):
+    tourist_headers, _ = await create_booking()
+    hotel_headers = await approve_operator()
+    async with TestingSessionLocal() as session:
+        await budget_crud.configure_budget(session, total=Decimal("1500.00"), shards=2)
+
+    async def ledgers() -> tuple[int, Decimal, int]:
+        async with TestingSessionLocal() as session:
+            rights = await session.scalar(
+                select(TouristRight.remaining).where(
+                    TouristRight.city_tier == CityTierEnum.SECONDARY
+                )
+            )
+            budget = await budget_crud.get_budget_status(session)
+            rooms = await session.scalar(select(RoomInventory.available_rooms))
+        return rights, budget["remaining"], rooms
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        await client.put(
+            "/api/operators/me/inventory",
+            headers=hotel_headers,
+            json={
+                "start_date": "2030-03-01",
+                "end_date": "2030-03-01",
+                "total_rooms": 5,
+                "price_per_night": "1000.00",
+            },
+        )
+        booking_url = "/api/users/me/bookings/"
+        stay = {
+            "hotel_operator_id": 1,
+            "check_in_date": "2030-03-01",
+            "check_out_date": "2030-03-02",
+        }
+        ids = []
+        # * น่านเป็นเมืองรอง ได้สิทธิ์ 2 ครั้ง แต่ละครั้งรัฐช่วยจ่าย 600.00
+        for _ in range(2):
+            response = await client.post(booking_url, headers=tourist_headers, json=stay)
+            assert response.status_code == status.HTTP_201_CREATED
+            ids.append(response.json()["id"])
+        assert await ledgers() == (0, Decimal("300.00"), 3)
+
+        response = await client.post(booking_url, headers=tourist_headers, json=stay)
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.json()["detail"] == "No secondary city rights remaining"
+        assert await ledgers() == (0, Decimal("300.00"), 3)
+
+        response = await client.delete(f"{booking_url}{ids[0]}", headers=tourist_headers)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert await ledgers() == (1, Decimal("900.00"), 4)
+
+        # * ยอดที่จัดสรรไปแล้ว 600.00 งบรวม 1000.00 จึงเหลือไม่พอสำหรับการจองอีกหนึ่งคืน
+        async with TestingSessionLocal() as session:
+            await budget_crud.configure_budget(session, total=Decimal("1000.00"), shards=2)
+        response = await client.post(booking_url, headers=tourist_headers, json=stay)
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.json()["detail"] == "Subsidy budget exhausted"
+        assert await ledgers() == (1, Decimal("400.00"), 4)
+
+
+async def seed_flash_sale(conn: AsyncConnection, rooms: int, days: int, tourists: int) -> None:
+    """ที่พักหนึ่งแห่ง (id=1) มีห้อง rooms ห้องทุกคืนตั้งแต่ FLASH_SALE_START จำนวน days คืน
+    นักท่องเที่ยว id 2..tourists+1 และงบที่พอสำหรับทุกการจอง
+    """
+    await conn.run_sync(Base.metadata.create_all)
+    await conn.execute(
+        insert(User),
+        [
+            {
+                "id": user_id,
+                "email": f"flash{user_id}@example.com",
+                "phone_number": f"0810{user_id:06d}",
+                "citizen_id": f"{user_id:013d}",
+                "password_hash": "hash",
+                "first_name_th": "ชื่อ",
+                "last_name_th": "นามสกุล",
+                "user_type": UserTypeEnum.OPERATOR if user_id == 1 else UserTypeEnum.TOURIST,
+            }
+            for user_id in range(1, tourists + 2)
+        ],
+    )
+    await conn.execute(
+        insert(Province).values(
+            id=1,
+            name_th="เชียงใหม่",
+            region="North",
+            city_tier=CityTierEnum.MAIN,
+            tax_reduction_rate=Decimal("1.00"),
+        )
+    )
+    await conn.execute(
+        insert(Operator).values(
+            id=1,
+            user_id=1,
+            business_name="โรงแรม",
+            business_type=BusinessTypeEnum.HOTEL,
+            registration_status=OperatorStatusEnum.APPROVED,
+            address="เชียงใหม่",
+            province_id=1,
+        )
+    )
+    await conn.execute(
+        insert(RoomInventory),
+        [
+            {
+                "operator_id": 1,
+                "stay_date": FLASH_SALE_START + timedelta(days=offset),
+                "total_rooms": rooms,
+                "available_rooms": rooms,
+                "price_per_night": Decimal("1500.00"),
+            }
+            for offset in range(days)
+        ],
+    )
+    await conn.execute(
+        insert(ProjectConfig).values(
+            config_key=budget_crud.BUDGET_TOTAL_KEY, config_value="100000000.00"
+        )
+    )
+    await conn.execute(
+        insert(BudgetShard),
+        [{"id": id, "remaining_satang": 2_500_000_000} for id in range(4)],
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_bookings_never_oversell_or_hold_partially():
+    rooms = 5
+    tourists = 60
+    # * ช่วงเข้าพักที่ทับกันบางคืน ถ้ามีการกันห้องไว้บางคืนจะเห็นได้จากยอดที่ไม่ตรงกัน
+    stays = [(0, 2), (1, 3), (0, 3)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'booking.db')}"
+        engine = create_sqlite_engine(url, profile="tuned", pool_size=4)
+        session_factory = async_sessionmaker(
+            bind=engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with engine.begin() as conn:
+            await seed_flash_sale(conn, rooms=rooms, days=3, tourists=tourists)
+
+        async def book(tourist_id: int) -> int:
+            check_in, check_out = stays[tourist_id % len(stays)]
+            async with session_factory() as session:
+                try:
+                    await booking_crud.create_booking(
+                        session,
+                        tourist_id=tourist_id,
+                        hotel_operator_id=1,
+                        check_in_date=FLASH_SALE_START + timedelta(days=check_in),
+                        check_out_date=FLASH_SALE_START + timedelta(days=check_out),
+                    )
+                except HTTPException as e:
+                    return e.status_code
+                return 201
+
+        outcomes = await asyncio.gather(
+            *(book(tourist_id) for tourist_id in range(2, tourists + 2))
+        )
+        assert set(outcomes) == {201, 409}
+
+        async with session_factory() as session:
+            bookings = (
+                await session.execute(
+                    select(Booking.check_in_date, Booking.check_out_date).where(
+                        Booking.booking_status == BookingStatusEnum.BOOKED
+                    )
+                )
+            ).all()
+            booked_nights = Counter(
+                booking.check_in_date + timedelta(days=offset)
+                for booking in bookings
+                for offset in range((booking.check_out_date - booking.check_in_date).days)
+            )
+            inventory = (
+                await session.execute(
+                    select(RoomInventory.stay_date, RoomInventory.available_rooms)
+                )
+            ).all()
+        assert len(bookings) == outcomes.count(201)
+        for stay_date, available_rooms in inventory:
+            assert booked_nights[stay_date] == rooms - available_rooms
+            assert booked_nights[stay_date] <= rooms
+        await engine.dispose()
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import tempfile
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException, status
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.configs.app_config import app_config
+from app.crud import budget_crud
+from app.database.base import Base
+from app.database.group_commit import run_write
+from app.database.session import create_sqlite_engine
+from app.main import app
+from app.models import BudgetShard
+from app.tests.conftest import TestingSessionLocal
+from app.utils.budget_rebalancer import BudgetRebalancer
+
+
+@pytest.mark.asyncio
+async def test_configure_and_rebalance_budget(prepare_database, monkeypatch):
+    monkeypatch.setattr(app_config, "ADMIN_API_KEY", "admin-key")
+    admin = {"X-Admin-Key": "admin-key"}
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.get("/api/admin/budget", headers=admin)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["shards"] == []
+
+        response = await client.put(
+            "/api/admin/budget", headers=admin, json={"total": "100.01", "shards": 4}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert Decimal(body["remaining"]) == Decimal("100.01")
+        assert [Decimal(shard["remaining"]) for shard in body["shards"]] == [
+            Decimal("25.01"),
+            Decimal("25.00"),
+            Decimal("25.00"),
+            Decimal("25.00"),
+        ]
+
+        response = await client.post("/api/admin/budget/rebalance", headers=admin)
+        assert response.json() == {"changed_shards": 0}
+
+        # * ยอดที่จัดสรรแล้วต้องคงอยู่เมื่อตั้งงบใหม่ และตั้งงบต่ำกว่ายอดนั้นไม่ได้
+        async with TestingSessionLocal() as session:
+            await run_write(session, lambda s: budget_crud.allocate_budget(s, 6000, key=1))
+
+        response = await client.post("/api/admin/budget/rebalance", headers=admin)
+        assert response.json() == {"changed_shards": 4}
+
+        response = await client.put(
+            "/api/admin/budget", headers=admin, json={"total": "50.00", "shards": 2}
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        response = await client.put(
+            "/api/admin/budget", headers=admin, json={"total": "200.00", "shards": 2}
+        )
+        body = response.json()
+        assert Decimal(body["allocated"]) == Decimal("60.00")
+        assert Decimal(body["remaining"]) == Decimal("140.00")
+        assert len(body["shards"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_release_after_shard_count_drops(prepare_database):
+    async with TestingSessionLocal() as session:
+        await budget_crud.configure_budget(session, total=Decimal("100.00"), shards=4)
+        shard_id = await run_write(session, lambda s: budget_crud.allocate_budget(s, 2000, key=3))
+        assert shard_id == 3
+
+        await budget_crud.configure_budget(session, total=Decimal("100.00"), shards=2)
+        await run_write(session, lambda s: budget_crud.release_budget(s, 2000, shard_id))
+
+        budget = await budget_crud.get_budget_status(session)
+        assert budget["remaining"] == Decimal("100.00")
+        assert budget["allocated"] == Decimal("0.00")
+        assert len(budget["shards"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_allocations_never_exceed_budget():
+    attempts = 100
+    amount = 3000
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'budget.db')}"
+        engine = create_sqlite_engine(url, profile="tuned", pool_size=4)
+        session_factory = async_sessionmaker(
+            bind=engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with session_factory() as session:
+            await budget_crud.configure_budget(session, total=Decimal("1000.00"), shards=4)
+
+        async def allocate(key: int) -> int:
+            async with session_factory() as session:
+                try:
+                    await run_write(
+                        session, lambda s: budget_crud.allocate_budget(s, amount, key=key)
+                    )
+                except HTTPException as e:
+                    return e.status_code
+                return 201
+
+        outcomes = await asyncio.gather(*(allocate(key) for key in range(attempts)))
+        assert outcomes.count(201) == 100_000 // amount
+        assert outcomes.count(409) == attempts - 100_000 // amount
+
+        async with session_factory() as session:
+            remaining = await session.scalar(select(func.sum(BudgetShard.remaining_satang)))
+            assert remaining == 100_000 % amount
+
+        # * งบที่เหลือกระจายอยู่หลาย shard แต่ยังหักก้อนเดียวได้ด้วยการรวม shard
+        assert await BudgetRebalancer(session_factory).rebalance() > 0
+        async with session_factory() as session:
+            await run_write(session, lambda s: budget_crud.allocate_budget(s, 1000, key=0))
+            with pytest.raises(HTTPException) as exc_info:
+                await run_write(session, lambda s: budget_crud.allocate_budget(s, 1, key=0))
+            assert exc_info.value.status_code == status.HTTP_409_CONFLICT
+            budget = await budget_crud.get_budget_status(session)
+            assert budget["remaining"] == Decimal("0.00")
+            assert budget["allocated"] == Decimal("1000.00")
+        await engine.dispose()
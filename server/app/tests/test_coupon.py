@@ -0,0 +1,410 @@
+import asyncio
+import os
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException, status
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker
+
+from app.configs.app_config import app_config
+from app.crud import coupon_crud
+from app.database.base import Base
+from app.database.session import create_sqlite_engine
+from app.main import app
+from app.models import (
+    Booking,
+    BookingStatusEnum,
+    BusinessTypeEnum,
+    CityTierEnum,
+    CouponStatusEnum,
+    CouponTransaction,
+    ECoupon,
+    Operator,
+    OperatorStatusEnum,
+    Province,
+    User,
+    UserTypeEnum,
+)
+from app.security import create_access_token, get_password_hash, user_token_claims
+from app.tests.conftest import TestingSessionLocal, engine_test
+from app.utils import coupon_pool
+from app.utils.coupon_pool import COUPON_CODE_LENGTH, CouponCodePool, generate_coupon_codes
+
+ADMIN_HEADERS = {"X-Admin-Key": "admin-key"}
+
+
+async def create_booking(
+    booking_status: BookingStatusEnum = BookingStatusEnum.CHECKED_IN,
+) -> tuple[dict, int]:
+    tourist = User(
+        email="tourist@example.com",
+        phone_number="0812345678",
+        citizen_id="0123456789123",
+        first_name_th="ชื่อภาษาไทย",
+        last_name_th="นามสกุลภาษาไทย",
+        user_type=UserTypeEnum.TOURIST.value,
+        agreed_to_terms=True,
+        password_hash=get_password_hash("TestPassword"),
+    )
+    hotel_owner = User(
+        email="hotel@example.com",
+        phone_number="0898765432",
+        citizen_id="3210987654321",
+        first_name_th="เจ้าของ",
+        last_name_th="โรงแรม",
+        user_type=UserTypeEnum.OPERATOR.value,
+        agreed_to_terms=True,
+        password_hash=get_password_hash("TestPassword"),
+    )
+    province = Province(
+        name_th="น่าน",
+        name_en="Nan",
+        region="North",
+        city_tier=CityTierEnum.SECONDARY.value,
+        tax_reduction_rate="1.50",
+    )
+    async with TestingSessionLocal() as session:
+        session.add_all([tourist, hotel_owner, province])
+        await session.flush()
+        hotel = Operator(
+            user_id=hotel_owner.id,
+            business_name="โรงแรมน่าน",
+            business_type=BusinessTypeEnum.HOTEL,
+            address="น่าน",
+            province_id=province.id,
+        )
+        session.add(hotel)
+        await session.flush()
+        booking = Booking(
+            tourist_id=tourist.id,
+            hotel_operator_id=hotel.id,
+            check_in_date=date(2025, 1, 1),
+            check_out_date=date(2025, 1, 4),
+            num_nights=3,
+            total_cost=Decimal("6000.00"),
+            subsidy_rate=Decimal("0.60"),
+            government_subsidy=Decimal("3600.00"),
+            tourist_payment=Decimal("2400.00"),
+            booking_status=booking_status,
+        )
+        session.add(booking)
+        await session.commit()
+        await session.refresh(tourist)
+
+    access_token = create_access_token(data=user_token_claims(tourist, include_profile=True))
+    return {"Authorization": f"Bearer {access_token}"}, booking.id  # type: ignore
+
+
+def test_generate_coupon_codes():
+    codes = generate_coupon_codes(1000)
+    assert len(codes) == 1000
+    assert len(set(codes)) == 1000
+    assert all(len(code) == COUPON_CODE_LENGTH and code.isalnum() for code in codes)
+
+
+@pytest.mark.asyncio
+async def test_coupon_pool_skips_existing_codes(prepare_database, monkeypatch):
+    headers, booking_id = await create_booking()
+    async with TestingSessionLocal() as session:
+        session.add(
+            ECoupon(
+                booking_id=booking_id,
+                tourist_id=1,
+                coupon_code="TAKEN00000000000000A",
+                issue_date=date(2025, 1, 1),
+                expiry_datetime=date(2025, 1, 4),
+            )
+        )
+        await session.commit()
+
+    monkeypatch.setattr(
+        coupon_pool,
+        "generate_coupon_codes",
+        lambda count: ["TAKEN00000000000000A", "FRESH00000000000000A", "FRESH00000000000000A"],
+    )
+    pool = CouponCodePool(TestingSessionLocal, size=8, low_watermark=0, refill_batch=3)
+    assert await pool.refill(3) == 1
+    assert await pool.take(1) == ["FRESH00000000000000A"]
+    pool.put_back(["FRESH00000000000000A"])
+    assert await pool.take(1) == ["FRESH00000000000000A"]
+
+    stats = pool.stats()
+    assert stats["depth"] == 0
+    assert stats["issued"] == 1
+    assert stats["refills"] == 1
+    assert stats["collisions"] == 2
+
+
+@pytest.mark.asyncio
+async def test_issue_booking_coupons(prepare_database, monkeypatch):
+    headers, booking_id = await create_booking()
+    monkeypatch.setattr(app_config, "ADMIN_API_KEY", "admin-key")
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        event.listen(engine_test.sync_engine, "before_cursor_execute", record)
+        try:
+            response = await client.post(
+                f"/api/admin/bookings/{booking_id}/coupons", headers=ADMIN_HEADERS
+            )
+        finally:
+            event.remove(engine_test.sync_engine, "before_cursor_execute", record)
+        assert response.status_code == status.HTTP_201_CREATED
+        coupons = response.json()
+        assert len(coupons) == 3 * app_config.COUPONS_PER_NIGHT
+        assert len({coupon["coupon_code"] for coupon in coupons}) == len(coupons)
+        assert all(coupon["status"] == "ACTIVE" for coupon in coupons)
+        assert all(coupon["amount"] == "500.00" for coupon in coupons)
+        # * สิ้นวันเช็คเอาท์เวลาไทย (UTC+7) เก็บเป็น UTC
+        assert coupons[0]["expiry_datetime"].startswith("2025-01-04T16:59:59")
+
+        inserts = [s for s in statements if s.startswith("INSERT INTO e_coupons")]
+        assert len(inserts) == 1
+
+        response = await client.post(
+            f"/api/admin/bookings/{booking_id}/coupons", headers=ADMIN_HEADERS
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        response = await client.post("/api/admin/bookings/999/coupons", headers=ADMIN_HEADERS)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        response = await client.get("/api/users/me/coupons/", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert [coupon["id"] for coupon in response.json()] == [coupon["id"] for coupon in coupons]
+
+        response = await client.get("/metrics")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        response = await client.get("/metrics", headers=ADMIN_HEADERS)
+        assert response.json()["coupon_code_pool"]["issued"] >= len(coupons)
+
+
+@pytest.mark.asyncio
+async def test_issue_coupons_requires_check_in(prepare_database, monkeypatch):
+    _, booking_id = await create_booking(BookingStatusEnum.PAID)
+    monkeypatch.setattr(app_config, "ADMIN_API_KEY", "admin-key")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.post(
+            f"/api/admin/bookings/{booking_id}/coupons", headers=ADMIN_HEADERS
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+
+async def approve_operator(
+    registration_status: OperatorStatusEnum = OperatorStatusEnum.APPROVED,
+) -> dict:
+    async with TestingSessionLocal() as session:
+        await session.execute(update(Operator).values(registration_status=registration_status))
+        await session.commit()
+        owner = (
+            await session.execute(select(User).filter_by(email="hotel@example.com"))
+        ).scalar_one()
+
+    access_token = create_access_token(data=user_token_claims(owner, include_profile=True))
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+@pytest.mark.asyncio
+async def test_redeem_coupon(prepare_database, monkeypatch):
+    _, booking_id = await create_booking()
+    monkeypatch.setattr(app_config, "ADMIN_API_KEY", "admin-key")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.post(
+            f"/api/admin/bookings/{booking_id}/coupons", headers=ADMIN_HEADERS
+        )
+        codes = [coupon["coupon_code"] for coupon in response.json()]
+        redeem_url = "/api/operators/me/redemptions"
+        # * การจองในชุดทดสอบเช็คเอาท์ไปแล้ว เลื่อนวันหมดอายุให้คูปองยังใช้ได้
+        async with TestingSessionLocal() as session:
+            await session.execute(update(ECoupon).values(expiry_datetime=datetime(2999, 1, 1)))
+            await session.commit()
+
+        pending_headers = await approve_operator(OperatorStatusEnum.PENDING)
+        response = await client.post(
+            redeem_url,
+            headers=pending_headers,
+            json={"coupon_code": codes[0], "total_amount": "300.00"},
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+        headers = await approve_operator()
+        response = await client.post(
+            redeem_url,
+            headers={**headers, "Idempotency-Key": "scan-1"},
+            json={"coupon_code": codes[0], "total_amount": "300.00"},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        transaction = response.json()
+        assert transaction["discount_applied"] == "300.00"
+        assert transaction["replayed"] is False
+
+        # * ส่งซ้ำด้วย key เดิม ได้ผลเดิมโดยไม่ตัดคูปองซ้ำ
+        response = await client.post(
+            redeem_url,
+            headers={**headers, "Idempotency-Key": "scan-1"},
+            json={"coupon_code": codes[0], "total_amount": "300.00"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["idempotency-replayed"] == "true"
+        assert response.json()["id"] == transaction["id"]
+
+        response = await client.post(
+            redeem_url,
+            headers={**headers, "Idempotency-Key": "scan-2"},
+            json={"coupon_code": codes[0], "total_amount": "300.00"},
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        response = await client.post(
+            redeem_url,
+            headers={**headers, "Idempotency-Key": "scan-1"},
+            json={"coupon_code": codes[1], "total_amount": "800.00"},
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        response = await client.post(
+            redeem_url,
+            headers={**headers, "Idempotency-Key": "scan-3"},
+            json={"coupon_code": codes[1], "total_amount": "800.00"},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["discount_applied"] == "500.00"
+
+        async with TestingSessionLocal() as session:
+            await session.execute(
+                update(ECoupon)
+                .where(ECoupon.coupon_code == codes[2])
+                .values(expiry_datetime=datetime(2000, 1, 1))
+            )
+            await session.commit()
+        response = await client.post(
+            redeem_url, headers=headers, json={"coupon_code": codes[2], "total_amount": "100.00"}
+        )
+        assert response.status_code == status.HTTP_410_GONE
+
+        response = await client.post(
+            redeem_url, headers=headers, json={"coupon_code": "MISSING", "total_amount": "100.00"}
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        # * การใช้คูปองตรวจ token กับ token_version ล่าสุด token ที่ logout แล้วใช้ไม่ได้
+        response = await client.post("/api/auth/logout", headers=headers)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        response = await client.post(
+            redeem_url, headers=headers, json={"coupon_code": codes[2], "total_amount": "100.00"}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    async with TestingSessionLocal() as session:
+        transactions = await session.scalar(select(func.count(CouponTransaction.id)))
+        assert transactions == 2
+
+
+async def seed_hot_coupons(conn: AsyncConnection, coupons: int) -> None:
+    await conn.run_sync(Base.metadata.create_all)
+    await conn.execute(
+        insert(User).values(
+            id=1,
+            email="redeem@example.com",
+            phone_number="0812345678",
+            citizen_id="0123456789123",
+            password_hash="hash",
+            first_name_th="ชื่อ",
+            last_name_th="นามสกุล",
+            user_type=UserTypeEnum.OPERATOR,
+        )
+    )
+    await conn.execute(
+        insert(Province).values(
+            id=1, name_th="น่าน", region="North", city_tier=CityTierEnum.SECONDARY
+        )
+    )
+    await conn.execute(
+        insert(Operator).values(
+            id=1,
+            user_id=1,
+            business_name="ร้าน",
+            business_type=BusinessTypeEnum.RESTAURANT,
+            registration_status=OperatorStatusEnum.APPROVED,
+            address="น่าน",
+            province_id=1,
+        )
+    )
+    await conn.execute(
+        insert(Booking).values(
+            id=1,
+            tourist_id=1,
+            hotel_operator_id=1,
+            check_in_date=date(2025, 1, 1),
+            check_out_date=date(2025, 1, 2),
+            num_nights=1,
+            total_cost=Decimal("1000.00"),
+            subsidy_rate=Decimal("0.60"),
+            government_subsidy=Decimal("600.00"),
+            tourist_payment=Decimal("400.00"),
+            booking_status=BookingStatusEnum.CHECKED_IN,
+        )
+    )
+    await conn.execute(
+        insert(ECoupon),
+        [
+            {
+                "booking_id": 1,
+                "tourist_id": 1,
+                "coupon_code": f"HOT{index:017d}",
+                "amount": Decimal("500.00"),
+                "issue_date": date(2025, 1, 1),
+                "expiry_datetime": datetime(2999, 1, 1),
+                "status": CouponStatusEnum.ACTIVE,
+            }
+            for index in range(coupons)
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_redemption_never_double_spends():
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'redeem.db')}"
+        engine = create_sqlite_engine(url, profile="tuned", pool_size=8)
+        session_factory = async_sessionmaker(
+            bind=engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with engine.begin() as conn:
+            await seed_hot_coupons(conn, coupons=3)
+
+        async def redeem(attempt: int) -> int:
+            async with session_factory() as session:
+                try:
+                    await coupon_crud.redeem_coupon(
+                        session,
+                        operator_id=1,
+                        coupon_code=f"HOT{attempt % 3:017d}",
+                        total_amount=Decimal("500.00"),
+                        idempotency_key=f"scan-{attempt}",
+                    )
+                except HTTPException as e:
+                    return e.status_code
+                return 201
+
+        outcomes = await asyncio.gather(*(redeem(attempt) for attempt in range(150)))
+        assert outcomes.count(201) == 3
+        assert outcomes.count(409) == 147
+
+        async with session_factory() as session:
+            transactions = await session.scalar(select(func.count(CouponTransaction.id)))
+            assert transactions == 3
+        await engine.dispose()
@@ -0,0 +1,40 @@
+import pytest
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from fastapi import status
+from httpx import AsyncClient
+from httpx import ASGITransport
+
+from app.main import app
+from app.models import CityTierEnum
+from app.utils.fast_json import dumps, loads
+
+
+def test_dumps_handles_app_types():
+    content = {
+        "rate": Decimal("0.60"),
+        "day": date(2025, 1, 31),
+        "at": datetime(2025, 1, 31, 8, 30, tzinfo=timezone.utc),
+        "tier": CityTierEnum.SECONDARY,
+        "name_th": "น่าน",
+    }
+    assert loads(dumps(content)) == {
+        "rate": "0.60",
+        "day": "2025-01-31",
+        "at": "2025-01-31T08:30:00+00:00",
+        "tier": "SECONDARY",
+        "name_th": "น่าน",
+    }
+
+
+@pytest.mark.asyncio
+async def test_invalid_json_body_returns_422(prepare_database):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.post(
+            "/api/auth/register",
+            content=b'{"email": ',
+            headers={"Content-Type": "application/json"},
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json()["detail"][0]["type"] == "json_invalid"
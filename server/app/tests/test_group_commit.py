@@ -0,0 +1,195 @@
+import os
+import asyncio
+import tempfile
+import pytest
+from datetime import date, timedelta
+from fastapi import HTTPException, status
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.configs.app_config import app_config
+from app.database import group_commit
+from app.database.base import Base
+from app.database.group_commit import GroupCommitter
+from app.database.session import create_sqlite_engine, get_read_db, get_write_db
+from app.main import app
+from app.models import (
+    Booking,
+    BookingStatusEnum,
+    CityTierEnum,
+    Province,
+    User,
+    UserTravel,
+    UserTypeEnum,
+)
+from app.security import create_access_token, user_token_claims
+from app.tests.test_booking import FLASH_SALE_START, seed_flash_sale
+from app.utils.coupon_pool import coupon_code_pool
+
+
+@pytest.mark.asyncio
+async def test_group_commit_isolates_failing_units():
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'group.db')}"
+        engine = create_sqlite_engine(url, profile="tuned", pool_size=1)
+        session_factory = async_sessionmaker(
+            bind=engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                insert(User).values(
+                    id=1,
+                    email="group@example.com",
+                    phone_number="0812345678",
+                    citizen_id="0123456789123",
+                    password_hash="hash",
+                    first_name_th="ชื่อ",
+                    last_name_th="นามสกุล",
+                    user_type=UserTypeEnum.TOURIST,
+                )
+            )
+            await conn.execute(
+                insert(Province).values(
+                    id=1, name_th="น่าน", region="North", city_tier=CityTierEnum.SECONDARY
+                )
+            )
+
+        committer = GroupCommitter(session_factory, window_ms=20, max_batch=64)
+
+        def make_unit(day: int):
+            async def unit(session: AsyncSession) -> int:
+                travel = UserTravel(
+                    user_id=1,
+                    province_id=1,
+                    start_date=date(2025, 1, day),
+                    end_date=date(2025, 1, day),
+                )
+                session.add(travel)
+                await session.flush()
+                if day % 3 == 0:
+                    raise HTTPException(status_code=404, detail="not found")
+                return travel.id  # type: ignore
+
+            return unit
+
+        try:
+            results = await asyncio.gather(
+                *(committer.submit(make_unit(day)) for day in range(1, 10)),
+                return_exceptions=True,
+            )
+
+            errors = [result for result in results if isinstance(result, HTTPException)]
+            ids = [result for result in results if isinstance(result, int)]
+            assert len(errors) == 3
+            assert len(set(ids)) == 6
+
+            async with session_factory() as session:
+                result = await session.execute(select(func.count(UserTravel.id)))
+                assert result.scalar_one() == 6
+
+            stats = committer.stats()
+            assert stats["writes"] == 9
+            assert stats["batches"] < 9
+            assert stats["failed_batches"] == 0
+        finally:
+            await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_routes_with_group_commit_enabled(monkeypatch):
+    # * writer มี connection เดียวเหมือน production ถ้า route ใดถือ connection ไว้ก่อนส่งงาน
+    # * group committer จะรอจนหมด pool timeout แทนที่จะได้ผลทันที
+    monkeypatch.setattr(app_config, "SQLITE_POOL_TIMEOUT", 2.0)
+    monkeypatch.setattr(app_config, "ADMIN_API_KEY", "admin-key")
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'group.db')}"
+        write_engine = create_sqlite_engine(url, profile="tuned", pool_size=1)
+        read_engine = create_sqlite_engine(url, profile="tuned", pool_size=4, read_only=True)
+        write_factory = async_sessionmaker(
+            bind=write_engine, class_=AsyncSession, expire_on_commit=False
+        )
+        read_factory = async_sessionmaker(
+            bind=read_engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+        async def override_write_db():
+            async with write_factory() as session:
+                yield session
+
+        async def override_read_db():
+            async with read_factory() as session:
+                yield session
+
+        committer = GroupCommitter(write_factory, window_ms=2)
+        monkeypatch.setattr(group_commit, "group_committer", committer)
+        monkeypatch.setitem(app.dependency_overrides, get_write_db, override_write_db)
+        monkeypatch.setitem(app.dependency_overrides, get_read_db, override_read_db)
+        monkeypatch.setattr(coupon_code_pool, "session_factory", read_factory)
+
+        try:
+            async with write_engine.begin() as conn:
+                await seed_flash_sale(conn, rooms=2, days=2, tourists=1)
+            async with read_factory() as session:
+                owner, tourist = (
+                    (await session.execute(select(User).order_by(User.id))).scalars().all()
+                )
+            hotel_headers = auth_headers(owner)
+            tourist_headers = auth_headers(tourist)
+
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+                response = await client.put(
+                    "/api/operators/me/inventory",
+                    headers=hotel_headers,
+                    json={
+                        "start_date": FLASH_SALE_START.isoformat(),
+                        "end_date": FLASH_SALE_START.isoformat(),
+                        "total_rooms": 3,
+                        "price_per_night": "1500.00",
+                    },
+                )
+                assert response.status_code == status.HTTP_200_OK
+
+                response = await client.post(
+                    "/api/users/me/bookings/",
+                    headers=tourist_headers,
+                    json={
+                        "hotel_operator_id": 1,
+                        "check_in_date": FLASH_SALE_START.isoformat(),
+                        "check_out_date": (FLASH_SALE_START + timedelta(days=2)).isoformat(),
+                    },
+                )
+                assert response.status_code == status.HTTP_201_CREATED
+                booking_id = response.json()["id"]
+
+                async with write_factory() as session:
+                    await session.execute(
+                        update(Booking).values(booking_status=BookingStatusEnum.CHECKED_IN)
+                    )
+                    await session.commit()
+                response = await client.post(
+                    f"/api/admin/bookings/{booking_id}/coupons",
+                    headers={"X-Admin-Key": "admin-key"},
+                )
+                assert response.status_code == status.HTTP_201_CREATED
+                coupon_code = response.json()[0]["coupon_code"]
+
+                response = await client.post(
+                    "/api/operators/me/redemptions",
+                    headers={**hotel_headers, "Idempotency-Key": "scan-1"},
+                    json={"coupon_code": coupon_code, "total_amount": "300.00"},
+                )
+                assert response.status_code == status.HTTP_201_CREATED
+
+            assert committer.stats()["writes"] == 4
+        finally:
+            await write_engine.dispose()
+            await read_engine.dispose()
+
+
+def auth_headers(user: User) -> dict:
+    access_token = create_access_token(data=user_token_claims(user, include_profile=True))
+    return {"Authorization": f"Bearer {access_token}"}
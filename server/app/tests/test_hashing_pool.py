@@ -0,0 +1,69 @@
+import time
+import asyncio
+import pytest
+
+from app.security import get_password_hash_async, verify_password_async
+from app.utils.hashing_pool import (
+    HashingPool,
+    HashingPoolSaturatedError,
+    HashingPoolTimeoutError,
+)
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_async():
+    password_hash = await get_password_hash_async("TestPassword")
+    assert await verify_password_async("TestPassword", password_hash) is True
+    assert await verify_password_async("WrongPassword", password_hash) is False
+
+
+@pytest.mark.asyncio
+async def test_pool_rejects_when_saturated():
+    pool = HashingPool(max_workers=1, queue_limit=1, timeout=5)
+    try:
+        running = [asyncio.create_task(pool.run(time.sleep, 0.2)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(HashingPoolSaturatedError):
+            await pool.run(time.sleep, 0.2)
+
+        stats = pool.stats()
+        assert stats["in_flight"] == 1
+        assert stats["queued"] == 1
+        assert stats["rejected"] == 1
+
+        await asyncio.gather(*running)
+        assert pool.stats()["completed"] == 2
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_pool_timeout_keeps_worker_accounted():
+    pool = HashingPool(max_workers=1, queue_limit=0, timeout=0.05)
+    try:
+        with pytest.raises(HashingPoolTimeoutError):
+            await pool.run(time.sleep, 0.2)
+
+        # * worker ยังทำงานอยู่ จึงต้องถือว่า pool เต็ม
+        assert pool.stats()["in_flight"] == 1
+        with pytest.raises(HashingPoolSaturatedError):
+            await pool.run(time.sleep, 0)
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_pool_counts_failed_jobs_separately():
+    pool = HashingPool(max_workers=1, queue_limit=0, timeout=5)
+    try:
+        with pytest.raises(ValueError):
+            await pool.run(int, "not a number")
+        assert await pool.run(int, "1") == 1
+
+        stats = pool.stats()
+        assert stats["completed"] == 1
+        assert stats["failed"] == 1
+        assert stats["in_flight"] == 0
+    finally:
+        pool.shutdown()
@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import pytest
+from decimal import Decimal
+from pathlib import Path
+from sqlalchemy import event, func, insert, inspect, select
+
+from app.database.init_db import SchemaDriftError, find_schema_drift, init
+from app.database.session import create_sqlite_engine
+from app.models import CityTierEnum, Province, User
+
+# * ไฟล์ฐานข้อมูลที่ส่งมากับ repo สร้างจาก model รุ่นก่อนเพิ่ม token_version และตารางใหม่
+PRE_SERIES_DATABASE = Path(__file__).parents[2] / "instance.db"
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_is_idempotent_and_non_destructive():
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'init.db')}"
+        engine = create_sqlite_engine(url, profile="tuned", pool_size=1)
+        try:
+            assert await init(engine) == {"schema_created": True, "provinces": 77}
+
+            async with engine.connect() as conn:
+                result = await conn.execute(
+                    select(Province.city_tier, func.count()).group_by(Province.city_tier)
+                )
+                assert dict(result.all()) == {CityTierEnum.MAIN: 22, CityTierEnum.SECONDARY: 55}
+                result = await conn.execute(
+                    select(Province.tax_reduction_rate).where(Province.name_th == "น่าน")
+                )
+                assert result.scalar_one() == Decimal("1.50")
+
+            async with engine.begin() as conn:
+                await conn.execute(
+                    insert(Province).values(
+                        name_th="ทดสอบ", region="North", city_tier=CityTierEnum.SECONDARY
+                    )
+                )
+
+            statements = []
+
+            def count_statement(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement.split()[0].upper())
+
+            event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+            try:
+                assert await init(engine) == {"schema_created": False, "provinces": 0}
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+            assert "CREATE" not in statements
+            assert "INSERT" not in statements
+
+            async with engine.connect() as conn:
+                result = await conn.execute(select(func.count(Province.id)))
+                assert result.scalar_one() == 78
+
+            assert await init(engine, drop=True) == {"schema_created": True, "provinces": 77}
+        finally:
+            await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_refuses_pre_series_database():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "instance.db")
+        shutil.copyfile(PRE_SERIES_DATABASE, path)
+        engine = create_sqlite_engine(f"sqlite+aiosqlite:///{path}", profile="tuned", pool_size=1)
+        try:
+            with pytest.raises(SchemaDriftError, match=r"users\.token_version: missing column"):
+                await init(engine)
+
+            # * ล้มทั้ง transaction: ไม่บันทึก fingerprint และไม่สร้างตารางใหม่ค้างไว้
+            async with engine.connect() as conn:
+                tables = await conn.run_sync(lambda conn: inspect(conn).get_table_names())
+            assert "room_inventory" not in tables
+            assert "schema_state" not in tables
+
+            assert await init(engine, drop=True) == {"schema_created": True, "provinces": 77}
+            async with engine.connect() as conn:
+                assert await conn.run_sync(find_schema_drift) == []
+                assert (await conn.execute(select(func.count(User.id)))).scalar_one() == 0
+        finally:
+            await engine.dispose()
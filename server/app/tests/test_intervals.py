@@ -0,0 +1,25 @@
+import random
+from datetime import date, timedelta
+
+from app.utils.intervals import sweep_overlaps
+
+
+def test_sweep_matches_pairwise_comparison():
+    rng = random.Random(7)
+    base = date(2025, 1, 1)
+    intervals = []
+    for id in range(200):
+        start_date = base + timedelta(days=rng.randint(0, 365))
+        intervals.append((id, start_date, start_date + timedelta(days=rng.randint(0, 10))))
+    intervals.sort(key=lambda interval: (interval[1], interval[0]))
+
+    expected = {
+        frozenset((a[0], b[0]))
+        for i, a in enumerate(intervals)
+        for b in intervals[i + 1 :]
+        if a[1] <= b[2] and b[1] <= a[2]
+    }
+    found = [frozenset((overlap.id, overlap.other_id)) for overlap in sweep_overlaps(intervals)]
+
+    assert len(found) == len(set(found))
+    assert set(found) == expected
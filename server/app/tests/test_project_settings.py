@@ -0,0 +1,90 @@
+from decimal import Decimal
+
+import pytest
+from fastapi import status
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import update
+
+from app.configs.app_config import app_config
+from app.main import app
+from app.models import ProjectConfig
+from app.tests.conftest import TestingSessionLocal
+from app.tests.test_user_travel import create_user_and_province
+from app.utils.project_settings import parse_setting, project_settings
+
+
+@pytest.mark.asyncio
+async def test_project_settings_reload(prepare_database, monkeypatch):
+    headers, _ = await create_user_and_province()
+    monkeypatch.setattr(app_config, "ADMIN_API_KEY", "admin-key")
+    admin = {"X-Admin-Key": "admin-key"}
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.get("/api/admin/config", headers=admin)
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert body["loaded"] is False
+        assert body["rights_secondary_city_quota"] == app_config.RIGHTS_SECONDARY_CITY_QUOTA
+
+        response = await client.put(
+            "/api/admin/config/rights_secondary_city_quota", headers=admin, json={"value": "5"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["loaded"] is True
+        assert response.json()["version"] == 1
+        assert response.json()["rights_secondary_city_quota"] == 5
+
+        response = await client.get("/api/users/me/rights/", headers=headers)
+        assert response.json()[1] == {"city_tier": "SECONDARY", "remaining": 5, "held": 0}
+
+        response = await client.put(
+            "/api/admin/config/coupon_amount", headers=admin, json={"value": "-1"}
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        for value in ("40", "1.5"):
+            response = await client.put(
+                "/api/admin/config/subsidy_rate_main_city", headers=admin, json={"value": value}
+            )
+            assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert parse_setting("subsidy_rate_secondary_city", "1") == Decimal("1")
+        response = await client.put("/api/admin/config/unknown", headers=admin, json={"value": "1"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        # * worker อื่นแก้ค่า: snapshot เดิมไม่เปลี่ยนจนกว่า poll จะเห็น version ใหม่
+        held = project_settings.current
+        async with TestingSessionLocal() as session:
+            await session.execute(
+                update(ProjectConfig)
+                .where(ProjectConfig.config_key == "rights_secondary_city_quota")
+                .values(config_value="7")
+            )
+            await session.execute(
+                ProjectConfig.__table__.insert().values(
+                    config_key="subsidy_cap_per_night", config_value="1000.00"
+                )
+            )
+            await session.commit()
+        assert project_settings.current is held
+
+        assert await project_settings.refresh() is True
+        assert await project_settings.refresh() is False
+        settings = project_settings.current
+        assert settings.version == 3
+        assert settings.rights_secondary_city_quota == 7
+        assert settings.quote_engine.cap_per_night == Decimal("1000.00")
+        assert held.rights_secondary_city_quota == 5
+        assert held.quote_engine.cap_per_night == app_config.SUBSIDY_CAP_PER_NIGHT
+
+        # * ค่าที่แปลงไม่ได้ใช้ค่าตั้งต้นแทน
+        async with TestingSessionLocal() as session:
+            await session.execute(
+                update(ProjectConfig)
+                .where(ProjectConfig.config_key == "subsidy_cap_per_night")
+                .values(config_value="abc")
+            )
+            await session.commit()
+        response = await client.post("/api/admin/config/invalidate", headers=admin)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["version"] == 4
+        assert Decimal(response.json()["subsidy_cap_per_night"]) == app_config.SUBSIDY_CAP_PER_NIGHT
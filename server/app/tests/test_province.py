@@ -0,0 +1,129 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from httpx import ASGITransport
+
+from app.main import app
+from app.models import CityTierEnum
+from app.utils.province_catalogue import province_catalogue
+
+PROVINCES = [
+    {
+        "name_th": "เชียงใหม่",
+        "name_en": "Chiang Mai",
+        "region": "North",
+        "city_tier": CityTierEnum.MAIN.value,
+        "tax_reduction_rate": "0.40",
+    },
+    {
+        "name_th": "น่าน",
+        "name_en": "Nan",
+        "region": "North",
+        "city_tier": CityTierEnum.SECONDARY.value,
+        "tax_reduction_rate": "0.60",
+    },
+]
+
+
+@pytest.mark.asyncio
+async def test_province_catalogue_reads(prepare_database):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        for province in PROVINCES:
+            response = await client.post("/api/provinces/", json=province)
+            assert response.status_code == status.HTTP_201_CREATED
+
+        response = await client.get("/api/provinces/")
+        assert response.status_code == status.HTTP_200_OK
+        assert [p["name_th"] for p in response.json()] == ["เชียงใหม่", "น่าน"]
+
+        response = await client.get(
+            "/api/provinces/", params={"city_tier": CityTierEnum.SECONDARY.value}
+        )
+        assert [p["name_en"] for p in response.json()] == ["Nan"]
+
+        province_id = response.json()[0]["id"]
+        response = await client.get(f"/api/provinces/{province_id}")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["tax_reduction_rate"] == "0.60"
+
+        response = await client.get("/api/provinces/999")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_create_province_swaps_catalogue(prepare_database):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        await client.post("/api/provinces/", json=PROVINCES[0])
+        version = province_catalogue.version
+
+        response = await client.post("/api/provinces/", json=PROVINCES[1])
+        assert response.status_code == status.HTTP_201_CREATED
+        assert province_catalogue.version == version + 1
+        assert province_catalogue.stats()["size"] == 2
+
+        response = await client.post("/api/provinces/", json=PROVINCES[1])
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+
+@pytest.mark.asyncio
+async def test_read_provinces_etag(prepare_database):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        await client.post("/api/provinces/", json=PROVINCES[0])
+
+        response = await client.get("/api/provinces/")
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "public, max-age=300"
+
+        response = await client.get("/api/provinces/", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        response = await client.get(
+            "/api/provinces/",
+            params={"city_tier": CityTierEnum.MAIN.value},
+            headers={"If-None-Match": etag},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        await client.post("/api/provinces/", json=PROVINCES[1])
+        response = await client.get("/api/provinces/", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_read_provinces_serves_cached_body(prepare_database):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        for index in range(30):
+            province = {**PROVINCES[1], "name_th": f"จังหวัด{index}", "name_en": f"P{index}"}
+            await client.post("/api/provinces/", json=province)
+
+        plain = await client.get("/api/provinces/", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+
+        gzipped = await client.get("/api/provinces/", headers={"Accept-Encoding": "gzip"})
+        assert gzipped.headers["content-encoding"] == "gzip"
+        assert gzipped.json() == plain.json()
+        assert gzipped.headers["etag"] != plain.headers["etag"]
+        assert len(plain.json()) == 30
+
+        # * q=0 คือไม่รับ gzip
+        refused = await client.get("/api/provinces/", headers={"Accept-Encoding": "gzip;q=0, *"})
+        assert "content-encoding" not in refused.headers
+        assert refused.headers["etag"] == plain.headers["etag"]
+
+        response = await client.get(
+            "/api/provinces/",
+            headers={"Accept-Encoding": "identity", "If-None-Match": gzipped.headers["etag"]},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        response = await client.get(
+            "/api/provinces/",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["etag"]},
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert plain.json()[0]["tax_reduction_rate"] == "0.60"
@@ -0,0 +1,121 @@
+import random
+import pytest
+from decimal import Decimal
+from fastapi import status
+from httpx import AsyncClient
+from httpx import ASGITransport
+
+from app.configs.app_config import app_config
+from app.main import app
+from app.models import CityTierEnum
+from app.schemas.quote_schema import QuoteLineIn
+from app.tests.test_user_travel import create_user_and_province
+from app.utils.province_catalogue import CatalogueSnapshot, ProvinceRecord
+from app.utils.quote_engine import QuoteEngine
+
+
+def test_batch_matches_decimal_quotes():
+    rates = [Decimal("0.40"), Decimal("0.60"), Decimal("0.33"), Decimal("0.05"), Decimal("1.50")]
+    tiers = [CityTierEnum.MAIN, CityTierEnum.SECONDARY]
+    catalogue = CatalogueSnapshot.build(
+        1,
+        [
+            ProvinceRecord(
+                id=index + 1,
+                name_th=f"จังหวัด {index}",
+                name_en=None,
+                region="North",
+                city_tier=tiers[index % len(tiers)],
+                tax_reduction_rate=Decimal("1.50"),
+                tax_description=None,
+            )
+            for index in range(len(rates))
+        ],
+    )
+
+    rng = random.Random(11)
+    lines = [
+        QuoteLineIn(
+            province_id=rng.randint(1, len(rates)),
+            nights=rng.randint(1, 7),
+            total_cost=Decimal(rng.randint(0, 5_000_000)) / 100,
+        )
+        for _ in range(2000)
+    ]
+
+    for main_rate, secondary_rate in zip(rates, reversed(rates)):
+        engine = QuoteEngine(
+            cap_per_night=Decimal("3000.00"),
+            subsidy_rates={CityTierEnum.MAIN: main_rate, CityTierEnum.SECONDARY: secondary_rate},
+        )
+        batch = engine.quote_batch(catalogue, lines)
+        expected = [engine.quote(line, catalogue.by_id[line.province_id]) for line in lines]
+        assert batch.quotes() == expected
+        assert all(
+            quote.government_subsidy + quote.tourist_payment == quote.total_cost
+            for quote in expected
+        )
+        assert all(Decimal(0) <= quote.government_subsidy <= quote.total_cost for quote in expected)
+        assert [row["government_subsidy"] for row in batch.rows()] == [
+            str(quote.government_subsidy) for quote in expected
+        ]
+
+
+@pytest.mark.asyncio
+async def test_quote_batch(prepare_database):
+    headers, province_id = await create_user_and_province()
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.post(
+            "/api/quotes/batch",
+            headers=headers,
+            json={
+                "lines": [
+                    {"province_id": province_id, "nights": 2, "total_cost": "2500.55"},
+                    {"province_id": province_id, "nights": 1, "total_cost": "10000"},
+                    {"province_id": province_id, "nights": 1, "total_cost": 0.01},
+                ]
+            },
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [
+            (quote["government_subsidy"], quote["tourist_payment"]) for quote in data["quotes"]
+        ] == [("1500.33", "1000.22"), ("3000.00", "7000.00"), ("0.00", "0.01")]
+        assert data["quotes"][0]["subsidy_rate"] == "0.60"
+        assert data["total_cost"] == "12500.56"
+        assert data["government_subsidy"] == "4500.33"
+        assert data["tourist_payment"] == "8000.23"
+
+        response = await client.post(
+            "/api/quotes/batch",
+            headers=headers,
+            json={"lines": [{"province_id": 9999, "nights": 1, "total_cost": "100"}]},
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        response = await client.post(
+            "/api/quotes/batch",
+            headers=headers,
+            json={"lines": [{"province_id": province_id, "nights": 0, "total_cost": "1.001"}]},
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert {error["loc"][-1] for error in response.json()["detail"]} == {
+            "nights",
+            "total_cost",
+        }
+
+        line = {"province_id": province_id, "nights": 1, "total_cost": "100"}
+        response = await client.post(
+            "/api/quotes/batch",
+            headers=headers,
+            json={"lines": [line] * (app_config.QUOTE_BATCH_MAX_LINES + 1)},
+        )
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+        response = await client.post(
+            "/api/quotes/batch",
+            json={"lines": [{"province_id": province_id, "nights": 1, "total_cost": "100"}]},
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,195 @@
+import asyncio
+import os
+import tempfile
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException, status
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.configs.app_config import app_config
+from app.crud import rights_crud
+from app.database.base import Base
+from app.database.session import create_sqlite_engine
+from app.main import app
+from app.models import (
+    CityTierEnum,
+    Province,
+    RightsReservation,
+    RightsReservationStatusEnum,
+    TouristRight,
+    User,
+    UserTypeEnum,
+)
+from app.tests.conftest import TestingSessionLocal
+from app.tests.test_user_travel import create_user_and_province
+from app.utils.province_catalogue import ProvinceRecord
+from app.utils.rights_sweeper import RightsSweeper
+
+
+@pytest.mark.asyncio
+async def test_rights_reservation_lifecycle(prepare_database, monkeypatch):
+    headers, province_id = await create_user_and_province()
+    monkeypatch.setattr(app_config, "ADMIN_API_KEY", "admin-key")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.get("/api/users/me/rights/", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [
+            {"city_tier": "MAIN", "remaining": 3, "held": 0},
+            {"city_tier": "SECONDARY", "remaining": 2, "held": 0},
+        ]
+
+        ids = []
+        for _ in range(2):
+            response = await client.post(
+                "/api/users/me/rights/reservations",
+                headers=headers,
+                json={"province_id": province_id},
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+            assert response.json()["status"] == "HELD"
+            ids.append(response.json()["id"])
+
+        response = await client.post(
+            "/api/users/me/rights/reservations", headers=headers, json={"province_id": province_id}
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        response = await client.get("/api/users/me/rights/", headers=headers)
+        assert response.json()[1] == {"city_tier": "SECONDARY", "remaining": 0, "held": 2}
+
+        response = await client.post(
+            f"/api/users/me/rights/reservations/{ids[0]}/confirm", headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "CONFIRMED"
+        response = await client.post(
+            f"/api/users/me/rights/reservations/{ids[0]}/confirm", headers=headers
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        response = await client.delete(
+            f"/api/users/me/rights/reservations/{ids[1]}", headers=headers
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        response = await client.delete(
+            f"/api/users/me/rights/reservations/{ids[1]}", headers=headers
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+        response = await client.delete("/api/users/me/rights/reservations/999", headers=headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        response = await client.post(
+            "/api/users/me/rights/reservations", headers=headers, json={"province_id": province_id}
+        )
+        expired_id = response.json()["id"]
+        async with TestingSessionLocal() as session:
+            await session.execute(
+                update(RightsReservation)
+                .where(RightsReservation.id == expired_id)
+                .values(expires_at=datetime(2000, 1, 1))
+            )
+            await session.commit()
+
+        response = await client.post(
+            f"/api/users/me/rights/reservations/{expired_id}/confirm", headers=headers
+        )
+        assert response.status_code == status.HTTP_410_GONE
+
+        response = await client.post(
+            "/api/admin/rights/sweep", headers={"X-Admin-Key": "admin-key"}
+        )
+        assert response.json() == {"released": 1}
+
+        response = await client.get("/api/users/me/rights/", headers=headers)
+        assert response.json()[1] == {"city_tier": "SECONDARY", "remaining": 1, "held": 0}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reservations_never_over_allocate():
+    users = 5
+    attempts_per_user = 40
+    quota = app_config.RIGHTS_MAIN_CITY_QUOTA
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'rights.db')}"
+        engine = create_sqlite_engine(url, profile="tuned", pool_size=4)
+        session_factory = async_sessionmaker(
+            bind=engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                insert(User),
+                [
+                    {
+                        "id": user_id,
+                        "email": f"rights{user_id}@example.com",
+                        "phone_number": f"08100000{user_id:02d}",
+                        "citizen_id": f"{user_id:013d}",
+                        "password_hash": "hash",
+                        "first_name_th": "ชื่อ",
+                        "last_name_th": "นามสกุล",
+                        "user_type": UserTypeEnum.TOURIST,
+                    }
+                    for user_id in range(1, users + 1)
+                ],
+            )
+            await conn.execute(
+                insert(Province).values(
+                    id=1, name_th="เชียงใหม่", region="North", city_tier=CityTierEnum.MAIN
+                )
+            )
+        province = ProvinceRecord(
+            id=1,
+            name_th="เชียงใหม่",
+            name_en=None,
+            region="North",
+            city_tier=CityTierEnum.MAIN,
+            tax_reduction_rate=Decimal("1.00"),
+            tax_description=None,
+        )
+
+        async def reserve(user_id: int) -> int:
+            async with session_factory() as session:
+                try:
+                    await rights_crud.reserve_right(session, user_id=user_id, province=province)
+                except HTTPException as e:
+                    return e.status_code
+                return 201
+
+        outcomes = await asyncio.gather(
+            *(reserve(user_id) for _ in range(attempts_per_user) for user_id in range(1, users + 1))
+        )
+        assert outcomes.count(201) == users * quota
+        assert outcomes.count(409) == users * (attempts_per_user - quota)
+
+        async with session_factory() as session:
+            remaining = await session.scalars(
+                select(TouristRight.remaining).where(TouristRight.city_tier == CityTierEnum.MAIN)
+            )
+            assert set(remaining) == {0}
+            held = await session.scalar(select(func.count(RightsReservation.id)))
+            assert held == users * quota
+
+            await session.execute(update(RightsReservation).values(expires_at=datetime(2000, 1, 1)))
+            await session.commit()
+
+        # * sweeper สองตัวทำงานพร้อมกันต้องไม่คืนสิทธิ์ซ้ำ
+        sweepers = [RightsSweeper(session_factory) for _ in range(2)]
+        released = await asyncio.gather(*(sweeper.sweep() for sweeper in sweepers))
+        assert sum(released) == users * quota
+
+        async with session_factory() as session:
+            remaining = await session.scalars(
+                select(TouristRight.remaining).where(TouristRight.city_tier == CityTierEnum.MAIN)
+            )
+            assert set(remaining) == {quota}
+            statuses = await session.scalars(select(RightsReservation.status).distinct())
+            assert set(statuses) == {RightsReservationStatusEnum.RELEASED}
+        await engine.dispose()
@@ -0,0 +1,149 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from httpx import ASGITransport
+from jose import jwt
+
+from app.main import app
+from app.models import User, UserTypeEnum
+from app.security import create_access_token, get_password_hash, user_token_claims
+from app.crud import user_crud
+from app.utils.principal_cache import principal_cache
+from app.utils.token_revocations import token_revocation_feed
+from app.tests.conftest import TestingSessionLocal
+
+
+async def create_user() -> User:
+    user_obj = User(
+        email="test.me@example.com",
+        phone_number="0812345678",
+        citizen_id="0123456789123",
+        first_name_th="ชื่อภาษาไทย",
+        last_name_th="นามสกุลภาษาไทย",
+        user_type=UserTypeEnum.TOURIST.value,
+        agreed_to_terms=True,
+        password_hash=get_password_hash("TestPassword"),
+    )
+    async with TestingSessionLocal() as session:
+        session.add(user_obj)
+        await session.commit()
+        await session.refresh(user_obj)
+    return user_obj
+
+
+@pytest.mark.asyncio
+async def test_read_me_uses_principal_cache(prepare_database):
+    user = await create_user()
+    access_token = create_access_token(data={"sub": str(user.id)})
+
+    before = principal_cache.stats()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        headers = {"Authorization": f"Bearer {access_token}"}
+
+        first = await client.get("/api/users/me", headers=headers)
+        assert first.status_code == status.HTTP_200_OK
+        assert first.json()["email"] == "test.me@example.com"
+        assert principal_cache.stats()["misses"] == before["misses"] + 1
+
+        second = await client.get("/api/users/me", headers=headers)
+        assert second.status_code == status.HTTP_200_OK
+        assert second.json() == first.json()
+        assert principal_cache.stats()["hits"] == before["hits"] + 1
+
+
+@pytest.mark.asyncio
+async def test_claims_routes_trust_token_claims(prepare_database):
+    user = await create_user()
+    access_token = create_access_token(data=user_token_claims(user, include_profile=True))
+    claims = jwt.get_unverified_claims(access_token)["usr"]
+    assert "citizen_id" not in claims
+    assert "phone_number" not in claims
+
+    before = principal_cache.stats()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = await client.get("/api/users/me/coupons/", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+
+        after = principal_cache.stats()
+        assert after["hits"] == before["hits"]
+        assert after["misses"] == before["misses"]
+
+        # * ข้อมูลส่วนตัวที่ไม่อยู่ใน token มาจากตาราง users
+        response = await client.get("/api/users/me", headers=headers)
+        assert response.json()["citizen_id"] == "0123456789123"
+        assert response.json()["user_type"] == UserTypeEnum.TOURIST.value
+
+
+@pytest.mark.asyncio
+async def test_token_version_bump_revokes_tokens(prepare_database):
+    user = await create_user()
+    access_token = create_access_token(data=user_token_claims(user, include_profile=True))
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = await client.get("/api/users/me/coupons/", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+
+        async with TestingSessionLocal() as session:
+            await user_crud.set_user_active(session, id=user.id, is_active=False)  # type: ignore
+
+        response = await client.post("/api/auth/logout", headers=headers)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        # * route ที่เชื่อ claims ก็ต้องปฏิเสธ token ที่ถูกเพิกถอนแล้วเช่นกัน
+        response = await client.get("/api/users/me/coupons/", headers=headers)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_claims_tokens(prepare_database):
+    user = await create_user()
+    access_token = create_access_token(data=user_token_claims(user, include_profile=True))
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = await client.post("/api/auth/logout", headers=headers)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        response = await client.get("/api/users/me/coupons/", headers=headers)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        # * worker อื่นหรือ process ที่ restart ไม่มีข้อมูลในหน่วยความจำ ได้รับจากตารางเมื่อ poll
+        principal_cache.clear()
+        assert await token_revocation_feed.refresh() == 1
+        assert await token_revocation_feed.refresh() == 0
+        response = await client.get("/api/users/me/coupons/", headers=headers)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        # * token ที่ออกหลัง logout ใช้ได้ตามปกติ
+        async with TestingSessionLocal() as session:
+            user = await session.get(User, user.id)
+        access_token = create_access_token(data=user_token_claims(user, include_profile=True))
+        response = await client.get(
+            "/api/users/me/coupons/", headers={"Authorization": f"Bearer {access_token}"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_logout_invalidates_principal_cache(prepare_database):
+    user = await create_user()
+    access_token = create_access_token(data={"sub": str(user.id)})
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        headers = {"Authorization": f"Bearer {access_token}"}
+
+        await client.get("/api/users/me", headers=headers)
+        assert principal_cache.stats()["size"] == 1
+
+        response = await client.post("/api/auth/logout", headers=headers)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert principal_cache.stats()["size"] == 0
+
+        response = await client.post("/api/auth/logout", headers=headers)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
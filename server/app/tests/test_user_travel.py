@@ -0,0 +1,687 @@
+from datetime import date
+
+import orjson
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from httpx import ASGITransport
+from sqlalchemy import event, update
+
+from app.configs.app_config import app_config
+from app.main import app
+from app.models import (
+    CityTierEnum,
+    Province,
+    User,
+    UserTravel,
+    UserTravelSummary,
+    UserTypeEnum,
+)
+from app.security import create_access_token, get_password_hash, user_token_claims
+from app.tests.conftest import TestingSessionLocal, engine_test
+
+
+async def create_user_and_province() -> tuple[dict, int]:
+    user_obj = User(
+        email="test.travel@example.com",
+        phone_number="0812345678",
+        citizen_id="0123456789123",
+        first_name_th="ชื่อภาษาไทย",
+        last_name_th="นามสกุลภาษาไทย",
+        user_type=UserTypeEnum.TOURIST.value,
+        agreed_to_terms=True,
+        password_hash=get_password_hash("TestPassword"),
+    )
+    province_obj = Province(
+        name_th="น่าน",
+        name_en="Nan",
+        region="North",
+        city_tier=CityTierEnum.SECONDARY.value,
+        tax_reduction_rate="1.50",
+    )
+    async with TestingSessionLocal() as session:
+        session.add_all([user_obj, province_obj])
+        await session.commit()
+        await session.refresh(user_obj)
+        await session.refresh(province_obj)
+
+    access_token = create_access_token(data=user_token_claims(user_obj, include_profile=True))
+    return {"Authorization": f"Bearer {access_token}"}, province_obj.id  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_read_travels_etag(prepare_database):
+    headers, province_id = await create_user_and_province()
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.get("/api/users/me/travels/", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "private, no-cache"
+
+        response = await client.get(
+            "/api/users/me/travels/", headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+
+        response = await client.post(
+            "/api/users/me/travels/",
+            headers=headers,
+            json={"province_id": province_id, "start_date": "2025-01-01", "end_date": "2025-01-03"},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        travel_id = response.json()["id"]
+
+        response = await client.get(
+            "/api/users/me/travels/", headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["items"]) == 1
+        etag = response.headers["etag"]
+
+        response = await client.put(
+            f"/api/users/me/travels/{travel_id}",
+            headers=headers,
+            json={"province_id": province_id, "start_date": "2025-01-01", "end_date": "2025-01-04"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        response = await client.get(
+            "/api/users/me/travels/", headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["items"][0]["end_date"] == "2025-01-04"
+
+
+@pytest.mark.asyncio
+async def test_read_travels_keyset_pagination(prepare_database):
+    headers, province_id = await create_user_and_province()
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        for start_date in ["2025-03-01", "2025-01-01", "2025-02-01", "2025-01-01", "2025-04-01"]:
+            await client.post(
+                "/api/users/me/travels/",
+                headers=headers,
+                params={"on_overlap": "report"},
+                json={
+                    "province_id": province_id,
+                    "start_date": start_date,
+                    "end_date": "2025-05-01",
+                },
+            )
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = await client.get("/api/users/me/travels/", headers=headers, params=params)
+            assert response.status_code == status.HTTP_200_OK
+            page = response.json()
+            assert len(page["items"]) <= 2
+            seen += [(travel["start_date"], travel["id"]) for travel in page["items"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == sorted(seen)
+        assert len(seen) == 5
+
+        response = await client.get(
+            "/api/users/me/travels/", headers=headers, params={"cursor": "not-a-cursor"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = await client.get("/api/users/me/travels/", headers=headers, params={"limit": 0})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_import_travels(prepare_database):
+    headers, province_id = await create_user_and_province()
+
+    rows = [
+        {"province_id": province_id, "start_date": "2025-01-01", "end_date": "2025-01-03"},
+        {"province_id": 9999, "start_date": "2025-01-01", "end_date": "2025-01-03"},
+        {"province_id": province_id, "start_date": "2025-01-05", "end_date": "2025-01-03"},
+        {"province_id": province_id, "start_date": "not-a-date", "end_date": "2025-01-03"},
+        {"province_id": province_id, "start_date": "2025-02-01", "end_date": "2025-02-02"},
+    ]
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.post("/api/users/me/travels/import", headers=headers, json=rows)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["imported"] == 2
+        assert data["failed"] == 3
+        assert [row["index"] for row in data["results"]] == [0, 1, 2, 3, 4]
+        assert data["results"][0]["id"] < data["results"][4]["id"]
+        assert data["results"][1]["error"] == "Province not found"
+        assert data["results"][2]["error"] == "Start date cannot be after end date"
+        assert data["results"][3]["id"] is None
+        assert "start_date" in data["results"][3]["error"]
+
+        async def ndjson_body():
+            yield b'{"province_id": %d, "start_date": "2025-03-01", ' % province_id
+            yield b'"end_date": "2025-03-02"}\n\n{"broken json\n'
+            yield b'{"province_id": %d, "start_date": "2025-04-01", ' % province_id
+            yield b'"end_date": "2025-04-02"}'
+
+        response = await client.post(
+            "/api/users/me/travels/import",
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+            content=ndjson_body(),
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["imported"] == 2
+        assert data["results"][1]["id"] is None
+
+        response = await client.get("/api/users/me/travels/", headers=headers)
+        assert len(response.json()["items"]) == 4
+
+        response = await client.post(
+            "/api/users/me/travels/import", headers=headers, json={"province_id": province_id}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_import_travels_row_limit(prepare_database, monkeypatch):
+    headers, province_id = await create_user_and_province()
+    monkeypatch.setattr(app_config, "TRAVEL_IMPORT_MAX_ROWS", 2)
+
+    row = {"province_id": province_id, "start_date": "2025-01-01", "end_date": "2025-01-03"}
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.post(
+            "/api/users/me/travels/import", headers=headers, json=[row] * 3
+        )
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+        response = await client.post(
+            "/api/users/me/travels/import",
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+            content=b"\n".join(orjson.dumps(row) for _ in range(3)),
+        )
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+        response = await client.get("/api/users/me/travels/", headers=headers)
+        assert response.json()["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_import_travels_statement_count(prepare_database):
+    headers, province_id = await create_user_and_province()
+    rows = [{"province_id": province_id, "start_date": "2025-01-01", "end_date": "2025-01-03"}] * 50
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    event.listen(engine_test.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+            # * ทุกแถวทับกัน ใช้ report เพื่อให้เพิ่มครบทั้ง 50 แถว
+            response = await client.post(
+                "/api/users/me/travels/import",
+                headers=headers,
+                params={"on_overlap": "report"},
+                json=rows,
+            )
+    finally:
+        event.remove(engine_test.sync_engine, "before_cursor_execute", count_statement)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["imported"] == 50
+    assert statements.count("INSERT") == 1
+
+
+@pytest.mark.asyncio
+async def test_import_travels_overlap_policy(prepare_database):
+    headers, province_id = await create_user_and_province()
+    rows = [
+        # * ทับกับแผนที่มีอยู่
+        {"province_id": province_id, "start_date": "2025-01-03", "end_date": "2025-01-04"},
+        {"province_id": province_id, "start_date": "2025-02-01", "end_date": "2025-02-05"},
+        # * ทับกับแถวก่อนหน้าในไฟล์เดียวกัน
+        {"province_id": province_id, "start_date": "2025-02-05", "end_date": "2025-02-06"},
+        {"province_id": province_id, "start_date": "2025-03-01", "end_date": "2025-03-02"},
+    ]
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.post(
+            "/api/users/me/travels/",
+            headers=headers,
+            json={"province_id": province_id, "start_date": "2025-01-01", "end_date": "2025-01-03"},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        existing_id = response.json()["id"]
+
+        response = await client.post("/api/users/me/travels/import", headers=headers, json=rows)
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert body["imported"] == 2
+        assert body["failed"] == 2
+        results = body["results"]
+        assert results[0]["id"] is None
+        assert results[0]["error"] == "Travel dates overlap with existing travel plans"
+        assert results[0]["overlapping_ids"] == [existing_id]
+        assert results[1]["id"] is not None
+        assert results[2]["id"] is None
+        assert results[2]["overlapping_ids"] == [results[1]["id"]]
+        assert results[3]["id"] is not None
+        assert results[3]["overlapping_ids"] == []
+
+        response = await client.post(
+            "/api/users/me/travels/import",
+            headers=headers,
+            params={"on_overlap": "report"},
+            json=rows[:3],
+        )
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert body["imported"] == 3
+        results = body["results"]
+        assert all(result["error"] is None for result in results)
+        assert existing_id in results[0]["overlapping_ids"]
+        assert results[2]["id"] in results[1]["overlapping_ids"]
+        assert results[1]["id"] in results[2]["overlapping_ids"]
+
+
+@pytest.mark.asyncio
+async def test_travel_writes_statement_count(prepare_database):
+    headers, province_id = await create_user_and_province()
+    travel = {"province_id": province_id, "start_date": "2025-01-01", "end_date": "2025-01-03"}
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        # * request แรกโหลด principal cache และ province catalogue ไว้ก่อน
+        response = await client.post(
+            "/api/users/me/travels/",
+            headers=headers,
+            json={**travel, "start_date": "2024-01-01", "end_date": "2024-01-03"},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        event.listen(engine_test.sync_engine, "before_cursor_execute", count_statement)
+        try:
+            response = await client.post("/api/users/me/travels/", headers=headers, json=travel)
+            assert response.status_code == status.HTTP_201_CREATED
+            assert response.json()["province"]["id"] == province_id
+            travel_id = response.json()["id"]
+            assert statements == ["SELECT", "INSERT"]
+
+            statements.clear()
+            response = await client.put(
+                f"/api/users/me/travels/{travel_id}",
+                headers=headers,
+                json={**travel, "end_date": "2025-01-05", "notes": "updated"},
+            )
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json()["end_date"] == "2025-01-05"
+            assert response.json()["notes"] == "updated"
+            assert statements == ["SELECT", "UPDATE"]
+
+            statements.clear()
+            response = await client.delete(f"/api/users/me/travels/{travel_id}", headers=headers)
+            assert response.status_code == status.HTTP_204_NO_CONTENT
+            assert statements == ["DELETE"]
+
+            statements.clear()
+            response = await client.delete(f"/api/users/me/travels/{travel_id}", headers=headers)
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+            response = await client.put(
+                f"/api/users/me/travels/{travel_id}", headers=headers, json=travel
+            )
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+            assert statements == ["DELETE", "SELECT", "UPDATE"]
+        finally:
+            event.remove(engine_test.sync_engine, "before_cursor_execute", count_statement)
+
+
+@pytest.mark.asyncio
+async def test_travel_overlap_detection(prepare_database):
+    headers, province_id = await create_user_and_province()
+
+    def travel(start_date: str, end_date: str) -> dict:
+        return {"province_id": province_id, "start_date": start_date, "end_date": end_date}
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.post(
+            "/api/users/me/travels/", headers=headers, json=travel("2025-01-01", "2025-01-05")
+        )
+        first_id = response.json()["id"]
+        response = await client.post(
+            "/api/users/me/travels/", headers=headers, json=travel("2025-01-10", "2025-01-12")
+        )
+        second_id = response.json()["id"]
+        assert "x-overlapping-travels" not in response.headers
+
+        response = await client.post(
+            "/api/users/me/travels/", headers=headers, json=travel("2025-01-05", "2025-01-10")
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.headers["x-overlapping-travels"] == f"{first_id},{second_id}"
+
+        response = await client.post(
+            "/api/users/me/travels/",
+            headers=headers,
+            params={"on_overlap": "report"},
+            json=travel("2025-01-04", "2025-01-06"),
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.headers["x-overlapping-travels"] == str(first_id)
+        third_id = response.json()["id"]
+
+        # * แก้ไขแผนเดิมโดยไม่นับตัวเองเป็นช่วงที่ทับ
+        response = await client.put(
+            f"/api/users/me/travels/{second_id}",
+            headers=headers,
+            json=travel("2025-01-09", "2025-01-13"),
+        )
+        assert response.status_code == status.HTTP_200_OK
+        response = await client.put(
+            f"/api/users/me/travels/{second_id}",
+            headers=headers,
+            json=travel("2025-01-06", "2025-01-13"),
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.headers["x-overlapping-travels"] == str(third_id)
+
+
+@pytest.mark.asyncio
+async def test_admin_travel_overlap_report(prepare_database, monkeypatch):
+    headers, province_id = await create_user_and_province()
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        for start_date, end_date in [
+            ("2025-01-01", "2025-01-10"),
+            ("2025-01-03", "2025-01-04"),
+            ("2025-01-04", "2025-01-06"),
+            ("2025-02-01", "2025-02-02"),
+        ]:
+            response = await client.post(
+                "/api/users/me/travels/",
+                headers=headers,
+                params={"on_overlap": "report"},
+                json={"province_id": province_id, "start_date": start_date, "end_date": end_date},
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+
+        monkeypatch.setattr(app_config, "ADMIN_API_KEY", "")
+        response = await client.get("/api/admin/travels/overlaps")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+        monkeypatch.setattr(app_config, "ADMIN_API_KEY", "admin-key")
+        response = await client.get("/api/admin/travels/overlaps", headers={"X-Admin-Key": "wrong"})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = await client.get(
+            "/api/admin/travels/overlaps", headers={"X-Admin-Key": "admin-key"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        report = response.json()
+        assert report["users"] == 1
+        assert report["travels"] == 4
+        pairs = {
+            (overlap["travel_id"], overlap["other_travel_id"], overlap["overlap_start"])
+            for overlap in report["overlaps"]
+        }
+        assert pairs == {(1, 2, "2025-01-03"), (1, 3, "2025-01-04"), (2, 3, "2025-01-04")}
+        assert report["next_cursor"] is None
+
+        async with TestingSessionLocal() as session:
+            other = User(
+                email="other.travel@example.com",
+                phone_number="0898765432",
+                citizen_id="3210987654321",
+                first_name_th="ชื่อ",
+                last_name_th="นามสกุล",
+                user_type=UserTypeEnum.TOURIST.value,
+                password_hash="hash",
+            )
+            session.add(other)
+            await session.flush()
+            session.add_all(
+                UserTravel(
+                    user_id=other.id,
+                    province_id=province_id,
+                    start_date=date(2025, 3, day),
+                    end_date=date(2025, 3, day + 1),
+                )
+                for day in (1, 2)
+            )
+            await session.commit()
+
+        # * แบ่งหน้าตามผู้ใช้ รายการของผู้ใช้คนเดียวไม่ถูกแบ่งข้ามหน้า
+        response = await client.get(
+            "/api/admin/travels/overlaps", headers={"X-Admin-Key": "admin-key"}, params={"limit": 1}
+        )
+        first_page = response.json()
+        assert first_page["users"] == 1
+        assert len(first_page["overlaps"]) == 3
+        assert first_page["next_cursor"] is not None
+
+        response = await client.get(
+            "/api/admin/travels/overlaps",
+            headers={"X-Admin-Key": "admin-key"},
+            params={"limit": 1, "cursor": first_page["next_cursor"]},
+        )
+        second_page = response.json()
+        assert second_page["users"] == 1
+        assert second_page["travels"] == 2
+        assert [overlap["user_id"] for overlap in second_page["overlaps"]] == [other.id]
+        assert second_page["next_cursor"] is None
+
+        response = await client.get(
+            "/api/admin/travels/overlaps",
+            headers={"X-Admin-Key": "admin-key"},
+            params={"cursor": "bad"},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_read_travels_date_range_and_calendar(prepare_database):
+    headers, province_id = await create_user_and_province()
+    async with TestingSessionLocal() as session:
+        province_obj = Province(
+            name_th="แพร่", region="North", city_tier=CityTierEnum.SECONDARY.value
+        )
+        session.add(province_obj)
+        await session.commit()
+        await session.refresh(province_obj)
+    other_province_id = province_obj.id
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        for travel_province_id, start_date, end_date in [
+            (province_id, "2024-12-30", "2025-01-02"),
+            (other_province_id, "2025-01-10", "2025-01-11"),
+            (province_id, "2025-01-31", "2025-02-03"),
+            (province_id, "2025-03-01", "2025-03-02"),
+        ]:
+            response = await client.post(
+                "/api/users/me/travels/",
+                headers=headers,
+                json={
+                    "province_id": travel_province_id,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                },
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+
+        response = await client.get(
+            "/api/users/me/travels/",
+            headers=headers,
+            params={"from": "2025-01-02", "to": "2025-01-31"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [travel["start_date"] for travel in response.json()["items"]] == [
+            "2024-12-30",
+            "2025-01-10",
+            "2025-01-31",
+        ]
+
+        response = await client.get(
+            "/api/users/me/travels/", headers=headers, params={"from": "2025-02-04"}
+        )
+        assert [travel["start_date"] for travel in response.json()["items"]] == ["2025-03-01"]
+
+        response = await client.get(
+            "/api/users/me/travels/",
+            headers=headers,
+            params={"from": "2025-02-01", "to": "2025-01-01"},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = await client.get(
+            "/api/users/me/travels/calendar", headers=headers, params={"month": "2025-01"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        calendar = response.json()
+        assert calendar["month"] == "2025-01"
+        assert [(entry["province"]["id"], entry["days"]) for entry in calendar["provinces"]] == [
+            (province_id, ["2025-01-01", "2025-01-02", "2025-01-31"]),
+            (other_province_id, ["2025-01-10", "2025-01-11"]),
+        ]
+
+        response = await client.get(
+            "/api/users/me/travels/calendar",
+            headers={**headers, "If-None-Match": response.headers["etag"]},
+            params={"month": "2025-01"},
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        for month in ("2025-13", "0000-01"):
+            response = await client.get(
+                "/api/users/me/travels/calendar", headers=headers, params={"month": month}
+            )
+            assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        response = await client.get(
+            "/api/users/me/travels/calendar", headers=headers, params={"month": "0001-01"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_travel_summary_incremental_and_rebuild(prepare_database, monkeypatch):
+    headers, secondary_id = await create_user_and_province()
+    async with TestingSessionLocal() as session:
+        main_province = Province(
+            name_th="เชียงใหม่",
+            name_en="Chiang Mai",
+            region="North",
+            city_tier=CityTierEnum.MAIN.value,
+            tax_reduction_rate="1.00",
+        )
+        session.add(main_province)
+        await session.commit()
+        main_id = main_province.id
+
+    expected = {
+        "trips": 3,
+        "travel_days": 8,
+        "daily_spend": "2000.00",
+        "estimated_subsidy": "8800.00",
+        "estimated_tax_deduction": "22000.00",
+        "tiers": [
+            {
+                "city_tier": "MAIN",
+                "trips": 1,
+                "travel_days": 2,
+                "estimated_subsidy": "1600.00",
+                "estimated_tax_deduction": "4000.00",
+            },
+            {
+                "city_tier": "SECONDARY",
+                "trips": 2,
+                "travel_days": 6,
+                "estimated_subsidy": "7200.00",
+                "estimated_tax_deduction": "18000.00",
+            },
+        ],
+    }
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.get("/api/users/me/travels/summary", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["estimated_subsidy"] == "0.00"
+        assert response.json()["tiers"] == []
+
+        ids = []
+        for province_id, start_date, end_date in [
+            (secondary_id, "2025-01-01", "2025-01-03"),
+            (main_id, "2025-02-01", "2025-02-02"),
+        ]:
+            response = await client.post(
+                "/api/users/me/travels/",
+                headers=headers,
+                json={"province_id": province_id, "start_date": start_date, "end_date": end_date},
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+            ids.append(response.json()["id"])
+
+        response = await client.put(
+            f"/api/users/me/travels/{ids[0]}",
+            headers=headers,
+            json={
+                "province_id": secondary_id,
+                "start_date": "2025-01-01",
+                "end_date": "2025-01-05",
+            },
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        response = await client.post(
+            "/api/users/me/travels/import",
+            headers=headers,
+            json=[
+                {"province_id": secondary_id, "start_date": "2025-03-01", "end_date": "2025-03-01"},
+                {"province_id": main_id, "start_date": "2025-03-10", "end_date": "2025-03-11"},
+            ],
+        )
+        assert response.json()["imported"] == 2
+
+        response = await client.delete(f"/api/users/me/travels/{ids[1]}", headers=headers)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        response = await client.get("/api/users/me/travels/summary", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == expected
+        etag = response.headers["etag"]
+
+        response = await client.get(
+            "/api/users/me/travels/summary", headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        # * ทำให้ตารางสรุปเพี้ยน แล้วให้ rebuild คำนวณใหม่จาก user_travels
+        async with TestingSessionLocal() as session:
+            await session.execute(update(UserTravelSummary).values(trips=99, rate_day_points=0))
+            await session.commit()
+
+        monkeypatch.setattr(app_config, "ADMIN_API_KEY", "admin-key")
+        response = await client.post(
+            "/api/admin/travels/summary/rebuild", headers={"X-Admin-Key": "admin-key"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"rows": 2}
+
+        response = await client.get("/api/users/me/travels/summary", headers=headers)
+        assert response.json() == expected
@@ -0,0 +1,73 @@
+# utils/budget_rebalancer.py
+import asyncio
+import logging
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.configs.app_config import app_config
+from app.crud.budget_crud import rebalance_budget
+from app.database.session import WriteSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class BudgetRebalancer:
+    """งาน background ที่กระจายงบคงเหลือให้ทุก shard เท่ากันทุก interval วินาที
+    shard ที่ถูกใช้มากจะได้งบเติมจาก shard ที่ว่าง การหักงบจึงแทบไม่ต้องย้ายไป shard อื่น
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], interval: float = 60.0):
+        self.session_factory = session_factory
+        self.interval = interval
+
+        self._task: asyncio.Task | None = None
+        self._runs = 0
+        self._changed_shards = 0
+        self._failures = 0
+        self._last_run_seconds = 0.0
+
+    async def rebalance(self) -> int:
+        started = time.perf_counter()
+        async with self.session_factory() as session:
+            changed = await rebalance_budget(session)
+        self._runs += 1
+        self._changed_shards += changed
+        self._last_run_seconds = time.perf_counter() - started
+        return changed
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.rebalance()
+            except Exception as e:
+                self._failures += 1
+                logger.warning("⚠️ Budget rebalance failed: %s", e)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def shutdown(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "running": self._task is not None and not self._task.done(),
+            "runs": self._runs,
+            "changed_shards": self._changed_shards,
+            "failures": self._failures,
+            "last_run_ms": round(self._last_run_seconds * 1000, 3),
+        }
+
+
+budget_rebalancer = BudgetRebalancer(
+    WriteSessionLocal, interval=app_config.SUBSIDY_BUDGET_REBALANCE_INTERVAL_SECONDS
+)
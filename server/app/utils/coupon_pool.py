@@ -0,0 +1,149 @@
+# utils/coupon_pool.py
+import asyncio
+import base64
+import logging
+import secrets
+import time
+from collections import deque
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.future import select
+
+from app.configs.app_config import app_config
+from app.database.session import ReadSessionLocal
+from app.models import ECoupon
+
+logger = logging.getLogger(__name__)
+
+COUPON_CODE_LENGTH = 20
+# * base32 ได้ 8 ตัวอักษรต่อ 5 ไบต์ สุ่ม 15 ไบต์ได้ 24 ตัว ตัดเหลือ 20 ตัว = 100 บิต
+_CODE_BYTES = 15
+_CODE_CHARS = 24
+
+
+def generate_coupon_codes(count: int) -> list[str]:
+    """สุ่มรหัสคูปองครั้งละหลายรหัสด้วย secrets + base32 (A-Z, 2-7) ในการเรียกเดียว"""
+    encoded = base64.b32encode(secrets.token_bytes(_CODE_BYTES * count)).decode()
+    return [
+        encoded[start : start + COUPON_CODE_LENGTH]
+        for start in range(0, _CODE_CHARS * count, _CODE_CHARS)
+    ]
+
+
+class CouponCodePool:
+    """รหัสคูปองที่สุ่มและตรวจว่าไม่ซ้ำกับ e_coupons ไว้ล่วงหน้า
+
+    เมื่อจำนวนรหัสต่ำกว่า low watermark จะเติมใน background ครั้งละ batch
+    โดยตรวจซ้ำทั้ง batch ด้วย query เดียว การออกคูปองตอนเช็คอินจึงไม่ต้องสุ่มและตรวจทีละรหัส
+    unique constraint ของ coupon_code ยังเป็นด่านสุดท้ายกรณีหลาย worker สุ่มได้รหัสเดียวกัน
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        size: int = 4096,
+        low_watermark: int = 1024,
+        refill_batch: int = 512,
+    ):
+        self.session_factory = session_factory
+        self.size = size
+        self.low_watermark = low_watermark
+        self.refill_batch = refill_batch
+
+        self._codes: deque[str] = deque()
+        self._refiller: asyncio.Task | None = None
+        self._issued = 0
+        self._misses = 0
+        self._refills = 0
+        self._collisions = 0
+        self._refill_seconds = 0.0
+        self._last_refill_seconds = 0.0
+        self._max_refill_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    async def take(self, count: int) -> list[str]:
+        # * ถ้ารหัสไม่พอ ให้เติมทันทีใน request นี้ (นับเป็น miss) แล้วค่อยเติมต่อใน background
+        while len(self._codes) < count:
+            self._misses += 1
+            await self.refill(max(count - len(self._codes), self.refill_batch))
+
+        codes = [self._codes.popleft() for _ in range(count)]
+        self._issued += count
+        if len(self._codes) < self.low_watermark:
+            self.schedule_refill()
+        return codes
+
+    def put_back(self, codes: list[str]) -> None:
+        """คืนรหัสที่ take ไปแต่ไม่ได้ใช้ ไว้หัวคิวตามลำดับเดิม"""
+        self._codes.extendleft(reversed(codes))
+        self._issued -= len(codes)
+
+    def schedule_refill(self) -> None:
+        if self._refiller is None or self._refiller.done():
+            self._refiller = asyncio.create_task(self._refill_to_size())
+
+    async def _refill_to_size(self) -> None:
+        try:
+            while len(self._codes) < self.size:
+                await self.refill(min(self.refill_batch, self.size - len(self._codes)))
+        except Exception as e:
+            logger.warning("⚠️ Coupon code pool refill failed: %s", e)
+
+    async def refill(self, count: int) -> int:
+        """สุ่ม count รหัส ตัดรหัสที่ซ้ำในชุดเดียวกัน ใน pool หรือใน e_coupons แล้วเติมเข้า pool"""
+        started = time.perf_counter()
+        candidates = set(generate_coupon_codes(count)).difference(self._codes)
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(ECoupon.coupon_code).where(ECoupon.coupon_code.in_(candidates))
+            )
+            taken = set(result.scalars().all())
+
+        codes = candidates - taken
+        self._codes.extend(codes)
+
+        elapsed = time.perf_counter() - started
+        self._refills += 1
+        self._collisions += count - len(codes)
+        self._refill_seconds += elapsed
+        self._last_refill_seconds = elapsed
+        self._max_refill_seconds = max(self._max_refill_seconds, elapsed)
+        return len(codes)
+
+    async def shutdown(self) -> None:
+        if self._refiller is not None and not self._refiller.done():
+            self._refiller.cancel()
+            try:
+                await self._refiller
+            except asyncio.CancelledError:
+                pass
+
+    def clear(self) -> None:
+        self._codes.clear()
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self._codes),
+            "size": self.size,
+            "low_watermark": self.low_watermark,
+            "issued": self._issued,
+            "misses": self._misses,
+            "refills": self._refills,
+            "collisions": self._collisions,
+            "refilling": self._refiller is not None and not self._refiller.done(),
+            "last_refill_ms": round(self._last_refill_seconds * 1000, 3),
+            "avg_refill_ms": (
+                round(self._refill_seconds / self._refills * 1000, 3) if self._refills else 0.0
+            ),
+            "max_refill_ms": round(self._max_refill_seconds * 1000, 3),
+        }
+
+
+coupon_code_pool = CouponCodePool(
+    ReadSessionLocal,
+    size=app_config.COUPON_CODE_POOL_SIZE,
+    low_watermark=app_config.COUPON_CODE_POOL_LOW_WATERMARK,
+    refill_batch=app_config.COUPON_CODE_REFILL_BATCH,
+)
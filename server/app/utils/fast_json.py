@@ -0,0 +1,70 @@
+# utils/fast_json.py
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Coroutine
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+from app.configs.app_config import app_config
+
+
+def _default(obj: Any) -> Any:
+    # * Decimal เป็น string ให้ตรงกับ Pydantic เพื่อไม่เสียความละเอียดของจำนวนเงิน
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+
+def loads(data: bytes | str) -> Any:
+    return orjson.loads(data)
+
+
+async def iter_ndjson_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """แยก body แบบ NDJSON ที่ทยอยส่งมาเป็นทีละบรรทัด ไม่ต้องรอให้ได้ body ครบทั้งก้อน"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class FastJSONRequest(Request):
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            # * orjson.JSONDecodeError สืบทอดจาก json.JSONDecodeError FastAPI จึงตอบ 422 เหมือนเดิม
+            self._json = loads(await self.body())
+        return self._json
+
+
+class FastJSONRoute(APIRoute):
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        original_route_handler = super().get_route_handler()
+
+        async def custom_route_handler(request: Request) -> Response:
+            request = FastJSONRequest(request.scope, request.receive)
+            return await original_route_handler(request)
+
+        return custom_route_handler
+
+
+if app_config.JSON_BACKEND == "orjson":
+    JSONResponseClass: type[JSONResponse] = FastJSONResponse
+    JSONRouteClass: type[APIRoute] = FastJSONRoute
+else:
+    JSONResponseClass = JSONResponse
+    JSONRouteClass = APIRoute
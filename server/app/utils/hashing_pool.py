@@ -0,0 +1,92 @@
+# utils/hashing_pool.py
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Literal
+
+
+class HashingPoolSaturatedError(Exception):
+    pass
+
+
+class HashingPoolTimeoutError(Exception):
+    pass
+
+
+class HashingPool:
+    """Bounded worker pool สำหรับงาน CPU หนักอย่าง bcrypt ไม่ให้บล็อก event loop"""
+
+    def __init__(
+        self,
+        kind: Literal["thread", "process"] = "thread",
+        max_workers: int = 4,
+        queue_limit: int = 64,
+        timeout: float = 5.0,
+    ):
+        self.kind = kind
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+
+        self._executor: Executor | None = None
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._timeouts = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="hashing"
+                )
+        return self._executor
+
+    def _release(self, future: asyncio.Future) -> None:
+        # * นับงานว่าจบเมื่อ worker ทำเสร็จจริง ไม่ใช่ตอนที่ผู้เรียก timeout
+        # * งานที่ error หรือถูกยกเลิกนับแยก ไม่ให้ throughput สูงเกินจริง
+        self._pending -= 1
+        if future.cancelled() or future.exception() is not None:
+            self._failed += 1
+        else:
+            self._completed += 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.max_workers + self.queue_limit:
+            self._rejected += 1
+            raise HashingPoolSaturatedError("Hashing pool is saturated")
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_executor(), fn, *args)
+        self._pending += 1
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            raise HashingPoolTimeoutError("Hashing operation timed out")
+
+    def stats(self) -> dict:
+        in_flight = min(self._pending, self.max_workers)
+        queued = self._pending - in_flight
+        capacity = self.max_workers + self.queue_limit
+        return {
+            "kind": self.kind,
+            "workers": self.max_workers,
+            "in_flight": in_flight,
+            "queued": queued,
+            "queue_limit": self.queue_limit,
+            "saturation": round(self._pending / capacity, 3) if capacity else 1.0,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "timeouts": self._timeouts,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,60 @@
+# utils/http_cache.py
+import hashlib
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: object) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    # * If-None-Match ใช้ weak comparison จึงตัด W/ ออกก่อนเทียบ
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+def accepts_encoding(request: Request, coding: str) -> bool:
+    """ตรวจ Accept-Encoding ตาม q-value ค่า q=0 หมายถึงไม่รับ ส่วน * ใช้เมื่อไม่ได้ระบุ coding นั้นตรงๆ"""
+    wildcard: float | None = None
+    for item in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+
+        if name == coding:
+            return q > 0
+        if name == "*":
+            wildcard = q
+    return wildcard is not None and wildcard > 0
+
+
+def cache_headers(etag: str, cache_control: str, vary: str | None = None) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if vary is not None:
+        headers["Vary"] = vary
+    return headers
+
+
+def not_modified_response(etag: str, cache_control: str, vary: str | None = None) -> Response:
+    # * 304 ต้องส่ง Vary เดียวกับ 200 ไม่อย่างนั้น cache จะใช้ผลตรวจซ้ำนี้กับทุก encoding
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=cache_headers(etag, cache_control, vary),
+    )
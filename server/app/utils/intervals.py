@@ -0,0 +1,33 @@
+# utils/intervals.py
+import heapq
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, Iterator
+
+
+@dataclass(frozen=True, slots=True)
+class Overlap:
+    id: int
+    other_id: int
+    start_date: date
+    end_date: date
+
+
+def sweep_overlaps(intervals: Iterable[tuple[int, date, date]]) -> Iterator[Overlap]:
+    """หาคู่ช่วงวันที่ [start, end] ที่ทับกัน จาก (id, start, end) ที่เรียงตาม start มาแล้ว
+
+    เก็บช่วงที่ยังไม่สิ้นสุดไว้ใน heap ตาม end แต่ละช่วงใหม่เทียบเฉพาะช่วงที่ยังค้างอยู่
+    ใช้เวลา O(n log n + k) เมื่อ k คือจำนวนคู่ที่ทับกัน แทนการเทียบทุกคู่ O(n²)
+    """
+    active: list[tuple[date, int, date]] = []
+    for id, start_date, end_date in intervals:
+        while active and active[0][0] < start_date:
+            heapq.heappop(active)
+        for other_end, other_id, other_start in active:
+            yield Overlap(
+                id=other_id,
+                other_id=id,
+                start_date=max(start_date, other_start),
+                end_date=min(end_date, other_end),
+            )
+        heapq.heappush(active, (end_date, id, start_date))
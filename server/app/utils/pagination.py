@@ -0,0 +1,19 @@
+# utils/pagination.py
+import base64
+from typing import Any
+
+from app.utils.fast_json import dumps, loads
+
+
+def encode_cursor(*values: Any) -> str:
+    return base64.urlsafe_b64encode(dumps(list(values))).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    try:
+        values = loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
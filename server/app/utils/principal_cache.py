@@ -0,0 +1,186 @@
+# utils/principal_cache.py
+import time
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.configs.app_config import app_config
+from app.models import User, UserTypeEnum
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """สำเนาข้อมูลผู้ใช้แบบอ่านอย่างเดียว ไม่ผูกกับ session ของ SQLAlchemy"""
+
+    id: int
+    email: str
+    # * ไม่อยู่ใน claims ของ access token จึงเป็น None เมื่อสร้างจาก claims
+    phone_number: str | None
+    citizen_id: str | None
+    first_name_th: str
+    last_name_th: str
+    user_type: UserTypeEnum
+    agreed_to_terms: bool
+    is_active: bool
+    token_version: int
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,  # type: ignore
+            email=user.email,  # type: ignore
+            phone_number=user.phone_number,  # type: ignore
+            citizen_id=user.citizen_id,  # type: ignore
+            first_name_th=user.first_name_th,  # type: ignore
+            last_name_th=user.last_name_th,  # type: ignore
+            user_type=user.user_type,  # type: ignore
+            agreed_to_terms=bool(user.agreed_to_terms),
+            is_active=bool(user.is_active),
+            token_version=user.token_version or 0,  # type: ignore
+            created_at=user.created_at,  # type: ignore
+            updated_at=user.updated_at,  # type: ignore
+        )
+
+    @classmethod
+    def from_claims(cls, user_id: int, token_version: int, claims: dict) -> "UserSnapshot":
+        return cls(
+            id=user_id,
+            email=claims["email"],
+            phone_number=None,
+            citizen_id=None,
+            first_name_th=claims["first_name_th"],
+            last_name_th=claims["last_name_th"],
+            user_type=UserTypeEnum(claims["user_type"]),
+            agreed_to_terms=bool(claims["agreed_to_terms"]),
+            is_active=bool(claims["is_active"]),
+            token_version=token_version,
+            created_at=datetime.fromisoformat(claims["created_at"]),
+            updated_at=datetime.fromisoformat(claims["updated_at"]),
+        )
+
+    def to_claims(self) -> dict:
+        # * token ถูกถอดอ่านได้โดยไม่ต้องมี secret จึงไม่ใส่เลขบัตรประชาชนและเบอร์โทร
+        return {
+            "email": self.email,
+            "first_name_th": self.first_name_th,
+            "last_name_th": self.last_name_th,
+            "user_type": self.user_type.value,
+            "agreed_to_terms": self.agreed_to_terms,
+            "is_active": self.is_active,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+
+class PrincipalCache:
+    """LRU + TTL cache ของผู้ใช้ที่ยืนยันตัวตนแล้ว key = (user id, digest ของ token)
+
+    เก็บ token_version ต่ำสุดที่ยังใช้ได้ของผู้ใช้ที่เพิ่งถูกเพิกถอน token ไว้ด้วย
+    route ที่เชื่อ claims ใน token จึงปฏิเสธ token เก่าได้โดยไม่ต้องอ่านตาราง users
+    แต่ละรายการเก็บไว้นาน revocation_ttl วินาที (อายุของ access token)
+    หลังจากนั้น token เก่าหมดอายุไปเองแล้ว
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0, revocation_ttl: float = 0.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.revocation_ttl = revocation_ttl
+
+        self._entries: OrderedDict[tuple[int, str], tuple[float, UserSnapshot]] = OrderedDict()
+        self._keys_by_user: dict[int, set[tuple[int, str]]] = {}
+        self._min_versions: OrderedDict[int, tuple[float, int]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def token_digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, user_id: int, token: str) -> UserSnapshot | None:
+        key = (user_id, self.token_digest(token))
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        expires_at, snapshot = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return snapshot
+
+    def set(self, token: str, snapshot: UserSnapshot) -> None:
+        key = (snapshot.id, self.token_digest(token))
+        self._entries[key] = (time.monotonic() + self.ttl, snapshot)
+        self._entries.move_to_end(key)
+        self._keys_by_user.setdefault(snapshot.id, set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self._evictions += 1
+
+    def invalidate_user(self, user_id: int, token_version: int | None = None) -> None:
+        """ลบ cache ของผู้ใช้ ถ้าส่ง token_version มา token ที่ version ต่ำกว่านั้นจะถูกปฏิเสธด้วย"""
+        for key in self._keys_by_user.pop(user_id, set()):
+            self._entries.pop(key, None)
+        self._invalidations += 1
+
+        if token_version is not None:
+            now = time.monotonic()
+            # * อายุของทุกรายการเท่ากัน ลำดับการใส่จึงเป็นลำดับการหมดอายุ ตัดจากหัวได้เลย
+            while self._min_versions:
+                user, (expires_at, _) = next(iter(self._min_versions.items()))
+                if expires_at >= now:
+                    break
+                del self._min_versions[user]
+            # * การเพิกถอนจาก worker อื่นอาจมาถึงช้ากว่าของ process นี้ เก็บ version ที่สูงกว่าไว้
+            _, previous = self._min_versions.pop(user_id, (0.0, token_version))
+            self._min_versions[user_id] = (now + self.revocation_ttl, max(previous, token_version))
+
+    def is_revoked(self, user_id: int, token_version: int) -> bool:
+        entry = self._min_versions.get(user_id)
+        return entry is not None and entry[0] >= time.monotonic() and token_version < entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_user.clear()
+        self._min_versions.clear()
+
+    def _remove(self, key: tuple[int, str]) -> None:
+        self._entries.pop(key, None)
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": round(self._hits / lookups, 3) if lookups else 0.0,
+            "evictions": self._evictions,
+            "invalidations": self._invalidations,
+            "revoked_users": len(self._min_versions),
+        }
+
+
+principal_cache = PrincipalCache(
+    max_size=app_config.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=app_config.PRINCIPAL_CACHE_TTL,
+    revocation_ttl=app_config.ACCESS_TOKEN_EXPIRE * 60,
+)
@@ -0,0 +1,207 @@
+# utils/project_settings.py
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field, fields
+from decimal import Decimal, InvalidOperation
+from types import MappingProxyType
+from typing import Mapping
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.future import select
+
+from app.configs.app_config import app_config
+from app.database.session import ReadSessionLocal
+from app.models import CityTierEnum, ProjectConfig, ProjectConfigVersion
+from app.utils.quote_engine import QuoteEngine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class ProjectSettings:
+    """ค่าตั้งค่าที่ปรับได้ขณะระบบทำงาน ชื่อ field ตรงกับ config_key ในตาราง project_config
+    key ที่ไม่มีในตารางใช้ค่าจาก AppConfig
+    """
+
+    coupon_amount: Decimal
+    coupons_per_night: int
+    subsidy_cap_per_night: Decimal
+    subsidy_rate_main_city: Decimal
+    subsidy_rate_secondary_city: Decimal
+    rights_main_city_quota: int
+    rights_secondary_city_quota: int
+    rights_reservation_ttl_seconds: int
+    travel_summary_daily_spend: Decimal
+
+    version: int = field(default=0, compare=False)
+    values: Mapping[str, str] = field(default_factory=dict, compare=False)
+    quote_engine: QuoteEngine = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        subsidy_rates = {
+            CityTierEnum.MAIN: self.subsidy_rate_main_city,
+            CityTierEnum.SECONDARY: self.subsidy_rate_secondary_city,
+        }
+        object.__setattr__(
+            self, "quote_engine", QuoteEngine(self.subsidy_cap_per_night, subsidy_rates)
+        )
+
+    @classmethod
+    def from_values(cls, version: int, values: dict[str, str]) -> "ProjectSettings":
+        settings = {}
+        for name, parse in SETTING_TYPES.items():
+            value = values.get(name)
+            if value is not None:
+                try:
+                    settings[name] = parse_setting(name, value)
+                    continue
+                except ValueError:
+                    logger.warning("⚠️ Invalid project config %s=%r, using default", name, value)
+            settings[name] = parse(getattr(app_config, name.upper()))
+        return cls(**settings, version=version, values=MappingProxyType(dict(values)))
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in SETTING_TYPES}
+
+
+SETTING_TYPES: dict[str, type] = {
+    f.name: f.type  # type: ignore
+    for f in fields(ProjectSettings)
+    if f.name not in ("version", "values", "quote_engine")
+}
+
+
+# * อัตราอุดหนุนเป็นสัดส่วนของค่าที่พัก เกิน 1 จะทำให้รัฐจ่ายมากกว่าค่าใช้จ่ายจริง
+SETTING_MAXIMUMS: dict[str, Decimal] = {
+    "subsidy_rate_main_city": Decimal("1"),
+    "subsidy_rate_secondary_city": Decimal("1"),
+}
+
+
+def parse_setting(name: str, value: str) -> Decimal | int:
+    """แปลงค่าจากตารางตามชนิดของ field ค่าติดลบ ไม่จำกัด เกินค่าสูงสุด หรือแปลงไม่ได้ถือว่าไม่ถูกต้อง"""
+    parse = SETTING_TYPES[name]
+    try:
+        parsed = parse(value)
+        valid = parsed >= 0 and (not isinstance(parsed, Decimal) or parsed.is_finite())
+    except (InvalidOperation, ValueError):
+        valid = False
+    if not valid:
+        raise ValueError(f"{name} must be a non-negative {parse.__name__}")
+
+    maximum = SETTING_MAXIMUMS.get(name)
+    if maximum is not None and parsed > maximum:
+        raise ValueError(f"{name} must be between 0 and {maximum}")
+    return parsed
+
+
+class ProjectSettingsCache:
+    """ค่าตั้งค่าโครงการในหน่วยความจำ อ่านผ่าน current ได้ทันทีโดยไม่ต้องล็อก
+
+    การโหลดใหม่สร้าง snapshot ใหม่ทั้งก้อนแล้วสลับ reference เดียว request ที่ถือ snapshot เดิมอยู่
+    จึงเห็นค่าชุดเดียวกันตลอด งาน background อ่านเฉพาะเลข version ทุก poll_interval วินาที
+    และโหลดทั้งตารางเมื่อ version เปลี่ยนเท่านั้น
+    """
+
+    def __init__(
+        self, session_factory: async_sessionmaker[AsyncSession], poll_interval: float = 5.0
+    ):
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+
+        self._snapshot = ProjectSettings.from_values(0, {})
+        self._loaded = False
+        self._task: asyncio.Task | None = None
+        self._polls = 0
+        self._reloads = 0
+        self._failures = 0
+        self._last_reload_seconds = 0.0
+
+    @property
+    def current(self) -> ProjectSettings:
+        return self._snapshot
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    async def _read_version(self, session: AsyncSession) -> int:
+        version = await session.scalar(
+            select(ProjectConfigVersion.version).where(ProjectConfigVersion.id == 1)
+        )
+        return version or 0
+
+    async def reload(self) -> ProjectSettings:
+        started = time.perf_counter()
+        async with self.session_factory() as session:
+            # * อ่าน version ก่อนและหลังอ่านแถว ถ้าไม่ตรงกันแปลว่ามีการแก้ระหว่างอ่าน ให้อ่านใหม่
+            while True:
+                version = await self._read_version(session)
+                result = await session.execute(
+                    select(ProjectConfig.config_key, ProjectConfig.config_value)
+                )
+                values = {key: value for key, value in result}
+                if await self._read_version(session) == version:
+                    break
+        snapshot = ProjectSettings.from_values(version, values)
+        # * การโหลดสองครั้งที่ซ้อนกันต้องไม่เอา snapshot เก่ากว่ามาทับของใหม่
+        if self._loaded and version < self._snapshot.version:
+            return self._snapshot
+        self._snapshot = snapshot
+        self._loaded = True
+        self._reloads += 1
+        self._last_reload_seconds = time.perf_counter() - started
+        return snapshot
+
+    async def refresh(self) -> bool:
+        """โหลดใหม่เมื่อ version ในฐานข้อมูลต่างจาก snapshot ปัจจุบัน คืน True ถ้ามีการโหลด"""
+        self._polls += 1
+        async with self.session_factory() as session:
+            version = await self._read_version(session)
+        if self._loaded and version == self._snapshot.version:
+            return False
+        await self.reload()
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                self._failures += 1
+                logger.warning("⚠️ Project config refresh failed: %s", e)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def shutdown(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def clear(self) -> None:
+        self._snapshot = ProjectSettings.from_values(0, {})
+        self._loaded = False
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "version": self._snapshot.version,
+            "poll_interval_seconds": self.poll_interval,
+            "running": self._task is not None and not self._task.done(),
+            "polls": self._polls,
+            "reloads": self._reloads,
+            "failures": self._failures,
+            "last_reload_ms": round(self._last_reload_seconds * 1000, 3),
+        }
+
+
+project_settings = ProjectSettingsCache(
+    ReadSessionLocal, poll_interval=app_config.PROJECT_CONFIG_POLL_INTERVAL_SECONDS
+)
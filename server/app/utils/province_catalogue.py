@@ -0,0 +1,110 @@
+# utils/province_catalogue.py
+import hashlib
+from dataclasses import dataclass
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Mapping
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import Province, CityTierEnum
+
+
+@dataclass(frozen=True, slots=True)
+class ProvinceRecord:
+    id: int
+    name_th: str
+    name_en: str | None
+    region: str
+    city_tier: CityTierEnum
+    tax_reduction_rate: Decimal
+    tax_description: str | None
+
+    @classmethod
+    def from_province(cls, province: Province) -> "ProvinceRecord":
+        return cls(
+            id=province.id,  # type: ignore
+            name_th=province.name_th,  # type: ignore
+            name_en=province.name_en,  # type: ignore
+            region=province.region,  # type: ignore
+            city_tier=CityTierEnum(province.city_tier),
+            tax_reduction_rate=Decimal(province.tax_reduction_rate or 0),
+            tax_description=province.tax_description,  # type: ignore
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogueSnapshot:
+    version: int
+    fingerprint: str
+    records: tuple[ProvinceRecord, ...]
+    by_id: Mapping[int, ProvinceRecord]
+    by_name_th: Mapping[str, ProvinceRecord]
+    by_tier: Mapping[CityTierEnum, tuple[ProvinceRecord, ...]]
+
+    @classmethod
+    def build(cls, version: int, records: list[ProvinceRecord]) -> "CatalogueSnapshot":
+        records = sorted(records, key=lambda record: record.id)
+        # * fingerprint คำนวณครั้งเดียวต่อ snapshot ใช้เป็น ETag ที่ตรงกันทุก worker
+        fingerprint = hashlib.sha1(repr(records).encode()).hexdigest()
+        return cls(
+            version=version,
+            fingerprint=fingerprint,
+            records=tuple(records),
+            by_id=MappingProxyType({record.id: record for record in records}),
+            by_name_th=MappingProxyType({record.name_th: record for record in records}),
+            by_tier=MappingProxyType(
+                {
+                    tier: tuple(record for record in records if record.city_tier == tier)
+                    for tier in CityTierEnum
+                }
+            ),
+        )
+
+
+class ProvinceCatalogue:
+    """ข้อมูลจังหวัดในหน่วยความจำ สลับ snapshot ทั้งก้อนและเพิ่ม version ทุกครั้งที่ข้อมูลเปลี่ยน"""
+
+    def __init__(self):
+        self._snapshot: CatalogueSnapshot | None = None
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    async def load(self, db: AsyncSession) -> CatalogueSnapshot:
+        result = await db.execute(select(Province))
+        records = [ProvinceRecord.from_province(province) for province in result.scalars().all()]
+        return self._swap(records)
+
+    async def get(self, db: AsyncSession) -> CatalogueSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = await self.load(db)
+        return snapshot
+
+    def add(self, record: ProvinceRecord) -> CatalogueSnapshot:
+        records = list(self._snapshot.records) if self._snapshot else []
+        records.append(record)
+        return self._swap(records)
+
+    def clear(self) -> None:
+        self._snapshot = None
+
+    def _swap(self, records: list[ProvinceRecord]) -> CatalogueSnapshot:
+        self._version += 1
+        snapshot = CatalogueSnapshot.build(self._version, records)
+        self._snapshot = snapshot
+        return snapshot
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._snapshot is not None,
+            "version": self._version,
+            "size": len(self._snapshot.records) if self._snapshot else 0,
+        }
+
+
+province_catalogue = ProvinceCatalogue()
@@ -0,0 +1,62 @@
+# utils/province_response_cache.py
+import gzip
+from pydantic import TypeAdapter
+
+from app.configs.app_config import app_config
+from app.models import CityTierEnum
+from app.schemas.province_schema import ProvinceOut
+from app.utils.province_catalogue import CatalogueSnapshot
+
+province_list_adapter = TypeAdapter(list[ProvinceOut])
+
+
+class ProvinceResponseCache:
+    """เก็บ JSON bytes ของรายการจังหวัดแยกตาม city_tier สร้างใหม่เมื่อ catalogue เปลี่ยน"""
+
+    def __init__(self, gzip_enabled: bool = True, gzip_min_size: int = 1024):
+        self.gzip_enabled = gzip_enabled
+        self.gzip_min_size = gzip_min_size
+
+        self._fingerprint: str | None = None
+        self._bodies: dict[tuple[CityTierEnum | None, bool], bytes] = {}
+        self._builds = 0
+
+    def get(
+        self, catalogue: CatalogueSnapshot, city_tier: CityTierEnum | None, accept_gzip: bool
+    ) -> tuple[bytes, bool]:
+        if catalogue.fingerprint != self._fingerprint:
+            self._rebuild(catalogue)
+
+        use_gzip = accept_gzip and (city_tier, True) in self._bodies
+        return self._bodies[(city_tier, use_gzip)], use_gzip
+
+    def _rebuild(self, catalogue: CatalogueSnapshot) -> None:
+        bodies: dict[tuple[CityTierEnum | None, bool], bytes] = {}
+        variants: dict[CityTierEnum | None, tuple] = {None: catalogue.records}
+        variants.update(catalogue.by_tier)
+
+        for city_tier, records in variants.items():
+            provinces = province_list_adapter.validate_python(records, from_attributes=True)
+            body = province_list_adapter.dump_json(provinces)
+            bodies[(city_tier, False)] = body
+            if self.gzip_enabled and len(body) >= self.gzip_min_size:
+                bodies[(city_tier, True)] = gzip.compress(body, mtime=0)
+
+        # * สลับทั้ง dict ในครั้งเดียว request ที่กำลังทำงานจะไม่เห็นข้อมูลครึ่งๆ กลางๆ
+        self._bodies = bodies
+        self._fingerprint = catalogue.fingerprint
+        self._builds += 1
+
+    def clear(self) -> None:
+        self._fingerprint = None
+        self._bodies = {}
+
+    def stats(self) -> dict:
+        return {
+            "builds": self._builds,
+            "variants": len(self._bodies),
+            "bytes": sum(len(body) for body in self._bodies.values()),
+        }
+
+
+province_response_cache = ProvinceResponseCache(gzip_enabled=app_config.PROVINCE_LIST_GZIP)
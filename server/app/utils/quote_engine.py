@@ -0,0 +1,181 @@
+# utils/quote_engine.py
+from dataclasses import dataclass
+from decimal import ROUND_DOWN, Decimal
+from typing import Mapping, Protocol, Sequence
+
+from app.models import CityTierEnum
+from app.utils.province_catalogue import CatalogueSnapshot, ProvinceRecord
+
+SATANG = Decimal("0.01")
+
+
+class UnknownProvinceError(LookupError):
+    def __init__(self, province_id: int):
+        super().__init__(f"Province {province_id} not found")
+        self.province_id = province_id
+
+
+class QuoteLine(Protocol):
+    province_id: int
+    nights: int
+    total_cost: Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class Quote:
+    province_id: int
+    nights: int
+    total_cost: Decimal
+    subsidy_rate: Decimal
+    government_subsidy: Decimal
+    tourist_payment: Decimal
+
+
+def to_satang(amount: Decimal) -> int:
+    return int(amount.quantize(SATANG).scaleb(2))
+
+
+def from_satang(satang: int) -> Decimal:
+    return Decimal(satang).scaleb(-2)
+
+
+def format_satang(satang: int) -> str:
+    sign = "-" if satang < 0 else ""
+    baht, remainder = divmod(abs(satang), 100)
+    return f"{sign}{baht}.{remainder:02d}"
+
+
+@dataclass(frozen=True, slots=True)
+class QuoteBatch:
+    """ผลของ batch เก็บเป็นคอลัมน์จำนวนเต็มหน่วยสตางค์ แปลงเป็น Decimal/string เมื่อใช้เท่านั้น"""
+
+    province_ids: list[int]
+    nights: list[int]
+    rates: list[Decimal]
+    total_satang: list[int]
+    subsidy_satang: list[int]
+
+    def __len__(self) -> int:
+        return len(self.province_ids)
+
+    def quotes(self) -> list[Quote]:
+        return [
+            Quote(
+                province_id=province_id,
+                nights=nights,
+                total_cost=from_satang(total),
+                subsidy_rate=rate,
+                government_subsidy=from_satang(subsidy),
+                tourist_payment=from_satang(total - subsidy),
+            )
+            for province_id, nights, rate, total, subsidy in zip(
+                self.province_ids, self.nights, self.rates, self.total_satang, self.subsidy_satang
+            )
+        ]
+
+    def rows(self) -> list[dict]:
+        """แถวพร้อมแปลงเป็น JSON จำนวนเงินเป็น string แบบเดียวกับที่ Pydantic ส่ง Decimal"""
+        rate_strings = {rate: str(rate) for rate in set(self.rates)}
+        # * จำนวนเงินใน batch ไม่ติดลบเสมอ จึงจัดรูปแบบ inline ได้โดยไม่ต้องเรียก format_satang
+        return [
+            {
+                "province_id": province_id,
+                "nights": nights,
+                "total_cost": f"{total // 100}.{total % 100:02d}",
+                "subsidy_rate": rate_strings[rate],
+                "government_subsidy": f"{subsidy // 100}.{subsidy % 100:02d}",
+                "tourist_payment": f"{(total - subsidy) // 100}.{(total - subsidy) % 100:02d}",
+            }
+            for province_id, nights, rate, total, subsidy in zip(
+                self.province_ids, self.nights, self.rates, self.total_satang, self.subsidy_satang
+            )
+        ]
+
+    def totals(self) -> dict:
+        total = sum(self.total_satang)
+        subsidy = sum(self.subsidy_satang)
+        return {
+            "total_cost": format_satang(total),
+            "government_subsidy": format_satang(subsidy),
+            "tourist_payment": format_satang(total - subsidy),
+        }
+
+
+def estimate_tax_deduction(daily_spend: Decimal, rate_day_points: int) -> Decimal:
+    """ประมาณค่าใช้จ่ายที่นำไปลดหย่อนภาษีได้: ค่าใช้จ่ายต่อวัน × Σ(วัน × tax_reduction_rate)
+
+    tax_reduction_rate ของจังหวัดเป็นตัวคูณค่าลดหย่อน (1.00 หรือ 1.50 เท่าของค่าใช้จ่ายจริง)
+    ไม่เกี่ยวกับส่วนที่รัฐช่วยจ่าย rate_day_points คือ Σ(วัน × อัตรา × 100) จากตารางสรุป
+    """
+    return from_satang(to_satang(daily_spend) * rate_day_points // 100)
+
+
+class QuoteEngine:
+    """คำนวณส่วนที่รัฐช่วยจ่ายและส่วนที่นักท่องเที่ยวจ่าย
+
+    government_subsidy = min(total_cost × subsidy_rate, เพดานต่อคืน × จำนวนคืน, total_cost)
+    subsidy_rate คือสัดส่วนที่รัฐช่วยจ่ายตามประเภทเมืองของจังหวัด (ไม่ใช่ tax_reduction_rate)
+    ปัดเศษลงระดับสตางค์ รัฐจึงไม่จ่ายเกิน และ tourist_payment = total_cost - government_subsidy พอดี
+    """
+
+    def __init__(self, cap_per_night: Decimal, subsidy_rates: Mapping[CityTierEnum, Decimal]):
+        self.cap_per_night = cap_per_night
+        self.subsidy_rates = subsidy_rates
+        self._cap_satang = to_satang(cap_per_night)
+
+    def quote(self, line: QuoteLine, province: ProvinceRecord) -> Quote:
+        total_cost = line.total_cost.quantize(SATANG)
+        rate = self.subsidy_rates[province.city_tier]
+        subsidy = min(total_cost * rate, self.cap_per_night * line.nights, total_cost).quantize(
+            SATANG, rounding=ROUND_DOWN
+        )
+        return Quote(
+            province_id=line.province_id,
+            nights=line.nights,
+            total_cost=total_cost,
+            subsidy_rate=rate,
+            government_subsidy=subsidy,
+            tourist_payment=total_cost - subsidy,
+        )
+
+    def quote_batch(self, catalogue: CatalogueSnapshot, lines: Sequence[QuoteLine]) -> QuoteBatch:
+        """คำนวณทั้ง batch ด้วยเลขจำนวนเต็มหน่วยสตางค์ ได้ผลตรงกับ quote() ทุกบรรทัด"""
+        province_ids = [line.province_id for line in lines]
+        nights = [line.nights for line in lines]
+        total_satang = [to_satang(line.total_cost) for line in lines]
+
+        # * แปลงอัตราเป็นเศษส่วนจำนวนเต็มครั้งเดียวต่อประเภทเมือง การหารปัดลง (//) จึงตรงกับ ROUND_DOWN
+        tier_ratios = {
+            city_tier: (rate, *rate.as_integer_ratio())
+            for city_tier, rate in self.subsidy_rates.items()
+        }
+        ratios: dict[int, tuple[Decimal, int, int]] = {}
+        for province_id in set(province_ids):
+            province = catalogue.by_id.get(province_id)
+            if province is None:
+                raise UnknownProvinceError(province_id)
+            ratios[province_id] = tier_ratios[province.city_tier]
+
+        cap_satang = self._cap_satang
+        line_ratios = [ratios[province_id] for province_id in province_ids]
+        subsidy_satang = [
+            min(total * numerator // denominator, cap_satang * night, total)
+            for (_, numerator, denominator), total, night in zip(line_ratios, total_satang, nights)
+        ]
+        return QuoteBatch(
+            province_ids=province_ids,
+            nights=nights,
+            rates=[rate for rate, _, _ in line_ratios],
+            total_satang=total_satang,
+            subsidy_satang=subsidy_satang,
+        )
+
+    def estimate_subsidy(
+        self, daily_spend: Decimal, travel_days: int, city_tier: CityTierEnum
+    ) -> Decimal:
+        """ประมาณส่วนที่รัฐช่วยจ่ายจากยอดสรุป: ค่าใช้จ่ายต่อวัน × วัน × subsidy_rate ของประเภทเมือง
+        ไม่เกินเพดานต่อคืน × จำนวนวัน คิดเป็นสตางค์แล้วปัดลงแบบ quote()
+        """
+        numerator, denominator = self.subsidy_rates[city_tier].as_integer_ratio()
+        estimate = to_satang(daily_spend) * travel_days * numerator // denominator
+        return from_satang(min(estimate, self._cap_satang * travel_days))
@@ -0,0 +1,71 @@
+# utils/rights_sweeper.py
+import asyncio
+import logging
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.configs.app_config import app_config
+from app.crud.rights_crud import release_expired_reservations
+from app.database.session import WriteSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class RightsSweeper:
+    """งาน background ที่ปล่อยการจองสิทธิ์ที่หมดเวลาเป็นชุดทุก interval วินาที"""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], interval: float = 30.0):
+        self.session_factory = session_factory
+        self.interval = interval
+
+        self._task: asyncio.Task | None = None
+        self._sweeps = 0
+        self._released = 0
+        self._failures = 0
+        self._last_sweep_seconds = 0.0
+
+    async def sweep(self) -> int:
+        started = time.perf_counter()
+        async with self.session_factory() as session:
+            released = await release_expired_reservations(session)
+        self._sweeps += 1
+        self._released += released
+        self._last_sweep_seconds = time.perf_counter() - started
+        if released:
+            logger.info("🧹 Released %d expired rights reservations", released)
+        return released
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                self._failures += 1
+                logger.warning("⚠️ Rights reservation sweep failed: %s", e)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def shutdown(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "running": self._task is not None and not self._task.done(),
+            "sweeps": self._sweeps,
+            "released": self._released,
+            "failures": self._failures,
+            "last_sweep_ms": round(self._last_sweep_seconds * 1000, 3),
+        }
+
+
+rights_sweeper = RightsSweeper(WriteSessionLocal, interval=app_config.RIGHTS_SWEEP_INTERVAL_SECONDS)
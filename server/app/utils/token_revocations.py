@@ -0,0 +1,108 @@
+# utils/token_revocations.py
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.future import select
+
+from app.configs.app_config import app_config
+from app.database.session import ReadSessionLocal
+from app.models import TokenRevocation
+from app.utils.principal_cache import PrincipalCache, principal_cache
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRevocationFeed:
+    """ส่งการเพิกถอน token จากตาราง token_revocations เข้า principal_cache ของ worker นี้
+
+    trigger บนตาราง users บันทึกแถวทุกครั้งที่ token_version เพิ่มขึ้น ไม่ว่าจะแก้จาก worker ใด
+    งาน background อ่านเฉพาะแถวที่ id มากกว่าที่เห็นล่าสุดทุก poll_interval วินาที
+    token ที่ถูกเพิกถอนบน worker อื่นจึงถูกปฏิเสธภายในหนึ่งรอบ poll และยังมีผลหลัง restart
+    เพราะรอบแรกอ่านทุกแถวที่ยังไม่พ้นอายุของ access token
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        cache: PrincipalCache,
+        poll_interval: float = 2.0,
+    ):
+        self.session_factory = session_factory
+        self.cache = cache
+        self.poll_interval = poll_interval
+
+        self._last_id = 0
+        self._task: asyncio.Task | None = None
+        self._polls = 0
+        self._applied = 0
+        self._failures = 0
+        self._last_poll_seconds = 0.0
+
+    async def refresh(self) -> int:
+        """อ่านการเพิกถอนใหม่แล้วบันทึกลง cache คืนจำนวนแถวที่อ่านได้"""
+        started = time.perf_counter()
+        # * token ที่ออกก่อนการเพิกถอนนานกว่าอายุของ access token หมดอายุไปเองแล้ว
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+            seconds=self.cache.revocation_ttl
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(TokenRevocation.id, TokenRevocation.user_id, TokenRevocation.token_version)
+                .where(TokenRevocation.id > self._last_id, TokenRevocation.revoked_at >= cutoff)
+                .order_by(TokenRevocation.id)
+            )
+            rows = result.all()
+
+        for row in rows:
+            self.cache.invalidate_user(row.user_id, token_version=row.token_version)
+        if rows:
+            self._last_id = rows[-1].id
+        self._polls += 1
+        self._applied += len(rows)
+        self._last_poll_seconds = time.perf_counter() - started
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                self._failures += 1
+                logger.warning("⚠️ Token revocation poll failed: %s", e)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def shutdown(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def clear(self) -> None:
+        self._last_id = 0
+
+    def stats(self) -> dict:
+        return {
+            "poll_interval_seconds": self.poll_interval,
+            "running": self._task is not None and not self._task.done(),
+            "last_id": self._last_id,
+            "polls": self._polls,
+            "applied": self._applied,
+            "failures": self._failures,
+            "last_poll_ms": round(self._last_poll_seconds * 1000, 3),
+        }
+
+
+token_revocation_feed = TokenRevocationFeed(
+    ReadSessionLocal,
+    principal_cache,
+    poll_interval=app_config.TOKEN_REVOCATION_POLL_INTERVAL_SECONDS,
+)
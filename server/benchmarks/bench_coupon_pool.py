@@ -0,0 +1,162 @@
+# benchmarks/bench_coupon_pool.py
+# * python -m benchmarks.bench_coupon_pool
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.database.base import Base
+from app.database.session import create_sqlite_engine
+from app.models import (
+    Booking,
+    BookingStatusEnum,
+    BusinessTypeEnum,
+    CityTierEnum,
+    ECoupon,
+    Operator,
+    Province,
+    User,
+    UserTypeEnum,
+)
+from app.utils.coupon_pool import CouponCodePool, generate_coupon_codes
+
+BOOKINGS = 2000
+NIGHTS = 3
+CLIENTS = 100
+
+
+async def seed(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(User).values(
+                id=1,
+                email="bench@example.com",
+                phone_number="0812345678",
+                citizen_id="0123456789123",
+                password_hash="hash",
+                first_name_th="ชื่อ",
+                last_name_th="นามสกุล",
+                user_type=UserTypeEnum.TOURIST,
+            )
+        )
+        await conn.execute(
+            insert(Province).values(
+                id=1, name_th="น่าน", region="North", city_tier=CityTierEnum.SECONDARY
+            )
+        )
+        await conn.execute(
+            insert(Operator).values(
+                id=1,
+                user_id=1,
+                business_name="โรงแรม",
+                business_type=BusinessTypeEnum.HOTEL,
+                address="น่าน",
+                province_id=1,
+            )
+        )
+        await conn.execute(
+            insert(Booking),
+            [
+                {
+                    "id": booking_id,
+                    "tourist_id": 1,
+                    "hotel_operator_id": 1,
+                    "check_in_date": date(2025, 1, 1),
+                    "check_out_date": date(2025, 1, 1 + NIGHTS),
+                    "num_nights": NIGHTS,
+                    "total_cost": Decimal("3000.00"),
+                    "subsidy_rate": Decimal("0.60"),
+                    "government_subsidy": Decimal("1800.00"),
+                    "tourist_payment": Decimal("1200.00"),
+                    "booking_status": BookingStatusEnum.CHECKED_IN,
+                }
+                for booking_id in range(1, BOOKINGS + 1)
+            ],
+        )
+
+
+def coupon_row(booking_id: int, code: str) -> dict:
+    return {
+        "booking_id": booking_id,
+        "tourist_id": 1,
+        "coupon_code": code,
+        "issue_date": date(2025, 1, 1),
+        "expiry_datetime": datetime(2025, 1, 1 + NIGHTS, 23, 59, 59),
+    }
+
+
+async def issue_on_demand(session: AsyncSession, booking_id: int) -> None:
+    # * แบบเดิม: สุ่มทีละรหัส ตรวจซ้ำทีละ query แล้ว INSERT ทีละแถว
+    for _ in range(NIGHTS):
+        while True:
+            (code,) = generate_coupon_codes(1)
+            taken = await session.scalar(select(ECoupon.id).where(ECoupon.coupon_code == code))
+            if taken is None:
+                break
+        await session.execute(insert(ECoupon).values(coupon_row(booking_id, code)))
+    await session.commit()
+
+
+async def run(pooled: bool) -> tuple[float, float, dict | None]:
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+        engine = create_sqlite_engine(url, profile="tuned", pool_size=8)
+        session_factory = async_sessionmaker(
+            bind=engine, class_=AsyncSession, expire_on_commit=False
+        )
+        await seed(engine)
+        pool = CouponCodePool(session_factory) if pooled else None
+        if pool is not None:
+            await pool.refill(pool.size)
+
+        queue = list(range(1, BOOKINGS + 1))
+        latencies: list[float] = []
+
+        async def client() -> None:
+            while queue:
+                booking_id = queue.pop()
+                started = time.perf_counter()
+                async with session_factory() as session:
+                    if pool is not None:
+                        codes = await pool.take(NIGHTS)
+                        await session.execute(
+                            insert(ECoupon), [coupon_row(booking_id, code) for code in codes]
+                        )
+                        await session.commit()
+                    else:
+                        await issue_on_demand(session, booking_id)
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(CLIENTS)))
+        elapsed = time.perf_counter() - started
+        if pool is not None:
+            await pool.shutdown()
+        await engine.dispose()
+
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        return BOOKINGS / elapsed, p99 * 1000, pool.stats() if pool else None
+
+
+async def main() -> None:
+    print(f"{BOOKINGS} bookings x {NIGHTS} coupons, {CLIENTS} concurrent check-ins")
+    print(f"{'mode':<22} {'bookings/s':>10} {'p99 ms':>8}")
+    for pooled in (False, True):
+        rate, p99, stats = await run(pooled)
+        mode = "pool + bulk insert" if pooled else "generate + check each"
+        print(f"{mode:<22} {rate:>10.1f} {p99:>8.1f}")
+        if stats:
+            print(
+                f"  pool depth {stats['depth']}, refills {stats['refills']}, "
+                f"avg refill {stats['avg_refill_ms']} ms, max {stats['max_refill_ms']} ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
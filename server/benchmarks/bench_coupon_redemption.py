@@ -0,0 +1,120 @@
+# benchmarks/bench_coupon_redemption.py
+# * python -m benchmarks.bench_coupon_redemption
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.crud import coupon_crud
+from app.database.session import create_sqlite_engine
+from app.models import CouponStatusEnum, CouponTransaction, ECoupon
+from app.tests.test_coupon import seed_hot_coupons
+
+REDEEMERS = (100, 250, 500)
+HOT_COUPONS = 10
+TOTAL_AMOUNT = Decimal("500.00")
+
+
+async def redeem_read_check_write(session: AsyncSession, coupon_code: str) -> None:
+    # * แบบเดิม: อ่านสถานะด้วย ORM ตรวจใน Python แล้วค่อยเขียนกลับ
+    coupon = (
+        await session.execute(select(ECoupon).where(ECoupon.coupon_code == coupon_code))
+    ).scalar_one()
+    if coupon.status != CouponStatusEnum.ACTIVE:
+        raise HTTPException(status_code=409, detail="Coupon is USED")
+    coupon.status = CouponStatusEnum.USED  # type: ignore
+    session.add(
+        CouponTransaction(
+            coupon_id=coupon.id,
+            service_operator_id=1,
+            total_amount=TOTAL_AMOUNT,
+            discount_applied=min(coupon.amount, TOTAL_AMOUNT),  # type: ignore
+            transaction_time=datetime.now(timezone.utc).replace(tzinfo=None),
+        )
+    )
+    await session.commit()
+
+
+async def run(redeemers: int, conditional: bool) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+        # * แบบเดิมใช้ engine legacy (transaction แบบ deferred) ส่วนแบบใหม่ใช้ writer ที่ตั้งค่าแล้ว
+        engine = create_sqlite_engine(
+            url, profile="tuned" if conditional else "legacy", pool_size=1
+        )
+        session_factory = async_sessionmaker(
+            bind=engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with engine.begin() as conn:
+            await seed_hot_coupons(conn, coupons=HOT_COUPONS)
+
+        outcomes = {"redeemed": 0, "rejected": 0, "races": 0, "errors": 0}
+        latencies: list[float] = []
+
+        async def redeemer(attempt: int) -> None:
+            coupon_code = f"HOT{attempt % HOT_COUPONS:017d}"
+            started = time.perf_counter()
+            async with session_factory() as session:
+                try:
+                    if conditional:
+                        await coupon_crud.redeem_coupon(
+                            session,
+                            operator_id=1,
+                            coupon_code=coupon_code,
+                            total_amount=TOTAL_AMOUNT,
+                            idempotency_key=f"scan-{attempt}",
+                        )
+                    else:
+                        await redeem_read_check_write(session, coupon_code)
+                    outcomes["redeemed"] += 1
+                except HTTPException:
+                    outcomes["rejected"] += 1
+                except IntegrityError:
+                    # * อ่านได้ ACTIVE แต่แพ้ตอนเขียน มีเพียง unique constraint ที่กันไม่ให้ใช้ซ้ำ
+                    outcomes["races"] += 1
+                except OperationalError:
+                    outcomes["errors"] += 1
+            latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(redeemer(attempt) for attempt in range(redeemers)))
+        elapsed = time.perf_counter() - started
+
+        async with session_factory() as session:
+            transactions = await session.scalar(select(func.count(CouponTransaction.id)))
+        await engine.dispose()
+
+        latencies.sort()
+        return {
+            **outcomes,
+            "double_spent": (transactions or 0) - HOT_COUPONS,
+            "requests_per_s": redeemers / elapsed,
+            "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        }
+
+
+async def main() -> None:
+    print(f"{HOT_COUPONS} hot coupons")
+    print(
+        f"{'redeemers':>9} {'mode':<20} {'req/s':>8} {'p99 ms':>8} "
+        f"{'redeemed':>8} {'double':>6} {'races':>6} {'errors':>6}"
+    )
+    for redeemers in REDEEMERS:
+        for conditional in (False, True):
+            result = await run(redeemers, conditional)
+            mode = "conditional UPDATE" if conditional else "read-check-write"
+            print(
+                f"{redeemers:>9} {mode:<20} {result['requests_per_s']:>8.1f} "
+                f"{result['p99_ms']:>8.1f} {result['redeemed']:>8} "
+                f"{result['double_spent']:>6} {result['races']:>6} {result['errors']:>6}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
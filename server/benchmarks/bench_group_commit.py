@@ -0,0 +1,94 @@
+# benchmarks/bench_group_commit.py
+# * python -m benchmarks.bench_group_commit
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.database.base import Base
+from app.database.group_commit import GroupCommitter
+from app.database.session import create_sqlite_engine
+from app.models import CityTierEnum, Province, User, UserTravel, UserTypeEnum
+
+CLIENTS = (50, 100, 250, 500)
+DURATION = 3.0
+
+
+async def seed(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(User).values(
+                id=1,
+                email="bench@example.com",
+                phone_number="0812345678",
+                citizen_id="0123456789123",
+                password_hash="hash",
+                first_name_th="ชื่อ",
+                last_name_th="นามสกุล",
+                user_type=UserTypeEnum.TOURIST,
+            )
+        )
+        await conn.execute(
+            insert(Province).values(
+                id=1, name_th="น่าน", region="North", city_tier=CityTierEnum.SECONDARY
+            )
+        )
+
+
+async def add_travel(session: AsyncSession) -> None:
+    session.add(
+        UserTravel(user_id=1, province_id=1, start_date=date(2025, 1, 1), end_date=date(2025, 1, 2))
+    )
+    await session.flush()
+
+
+async def run(clients: int, grouped: bool) -> tuple[float, float]:
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+        engine = create_sqlite_engine(url, profile="tuned", pool_size=1)
+        session_factory = async_sessionmaker(
+            bind=engine, class_=AsyncSession, expire_on_commit=False
+        )
+        await seed(engine)
+        committer = GroupCommitter(session_factory) if grouped else None
+
+        writes = 0
+        latencies: list[float] = []
+        deadline = time.perf_counter() + DURATION
+
+        async def client() -> None:
+            nonlocal writes
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                if committer is not None:
+                    await committer.submit(add_travel)
+                else:
+                    async with session_factory() as session:
+                        await add_travel(session)
+                        await session.commit()
+                latencies.append(time.perf_counter() - started)
+                writes += 1
+
+        await asyncio.gather(*(client() for _ in range(clients)))
+        await engine.dispose()
+
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0.0
+        return writes / DURATION, p99 * 1000
+
+
+async def main() -> None:
+    print(f"{'clients':>7} {'mode':<18} {'writes/s':>9} {'p99 ms':>8}")
+    for clients in CLIENTS:
+        for grouped in (False, True):
+            rate, p99 = await run(clients, grouped)
+            mode = "group commit" if grouped else "commit per request"
+            print(f"{clients:>7} {mode:<18} {rate:>9.1f} {p99:>8.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+# benchmarks/bench_json.py
+# * python -m benchmarks.bench_json
+import json
+import timeit
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.models import CityTierEnum, UserTypeEnum
+from app.schemas.user_schema import UserOut
+from app.schemas.user_travel_schema import UserTravelOut
+from app.utils.fast_json import FastJSONResponse, loads
+
+TRAVELS = 500
+ROUNDS = 200
+
+travel_list_adapter = TypeAdapter(list[UserTravelOut])
+
+
+def build_payload() -> tuple[UserOut, list[UserTravelOut]]:
+    now = datetime.now(timezone.utc)
+    user = UserOut(
+        id=1,
+        email="user.name@example.com",
+        phone_number="0812345678",
+        citizen_id="1234567890123",
+        first_name_th="สมชาย",
+        last_name_th="ใจดี",
+        user_type=UserTypeEnum.TOURIST,
+        agreed_to_terms=True,
+        is_active=True,
+        created_at=now,
+        updated_at=now,
+    )
+    province = {
+        "id": 1,
+        "name_th": "น่าน",
+        "name_en": "Nan",
+        "region": "North",
+        "city_tier": CityTierEnum.SECONDARY,
+        "tax_reduction_rate": Decimal("0.60"),
+        "tax_description": "ลดหย่อนภาษีสำหรับการท่องเที่ยวเมืองรอง",
+    }
+    travels = [
+        UserTravelOut(
+            id=index,
+            user_id=1,
+            province_id=1,
+            start_date=date(2025, 1, 1) + timedelta(days=index),
+            end_date=date(2025, 1, 3) + timedelta(days=index),
+            notes="ไปเที่ยวกับครอบครัว",
+            created_at=now,
+            updated_at=now,
+            province=province,  # type: ignore
+        )
+        for index in range(TRAVELS)
+    ]
+    return user, travels
+
+
+def main() -> None:
+    user, travels = build_payload()
+    user_content = user.model_dump(mode="json")
+    travels_content = travel_list_adapter.dump_python(travels, mode="json")
+    request_body = JSONResponse(travels_content).body
+
+    results = {
+        "encode UserOut (stdlib)": timeit.timeit(
+            lambda: JSONResponse(user_content).body, number=ROUNDS
+        ),
+        "encode UserOut (orjson)": timeit.timeit(
+            lambda: FastJSONResponse(user_content).body, number=ROUNDS
+        ),
+        f"encode {TRAVELS} travels (stdlib)": timeit.timeit(
+            lambda: JSONResponse(travels_content).body, number=ROUNDS
+        ),
+        f"encode {TRAVELS} travels (orjson)": timeit.timeit(
+            lambda: FastJSONResponse(travels_content).body, number=ROUNDS
+        ),
+        f"decode {TRAVELS} travels (stdlib)": timeit.timeit(
+            lambda: json.loads(request_body), number=ROUNDS
+        ),
+        f"decode {TRAVELS} travels (orjson)": timeit.timeit(
+            lambda: loads(request_body), number=ROUNDS
+        ),
+    }
+
+    print(f"travel list body: {len(request_body)} bytes")
+    for name, seconds in results.items():
+        print(f"{name:<32} {seconds / ROUNDS * 1e6:>10.1f} µs/op")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/bench_province_list.py
+# * python -m benchmarks.bench_province_list
+import timeit
+from decimal import Decimal
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models import CityTierEnum
+from app.schemas.province_schema import ProvinceOut
+from app.utils.province_catalogue import CatalogueSnapshot, ProvinceRecord
+from app.utils.province_response_cache import ProvinceResponseCache
+
+ROUNDS = 2000
+
+
+def build_catalogue(size: int = 77) -> CatalogueSnapshot:
+    records = [
+        ProvinceRecord(
+            id=index,
+            name_th=f"จังหวัดที่{index}",
+            name_en=f"Province {index}",
+            region="North",
+            city_tier=CityTierEnum.MAIN if index % 3 == 0 else CityTierEnum.SECONDARY,
+            tax_reduction_rate=Decimal("0.60"),
+            tax_description="ลดหย่อนภาษีสำหรับการท่องเที่ยวเมืองรอง",
+        )
+        for index in range(1, size + 1)
+    ]
+    return CatalogueSnapshot.build(1, records)
+
+
+def current_path(catalogue: CatalogueSnapshot) -> bytes:
+    provinces = [
+        ProvinceOut.model_validate(record, from_attributes=True) for record in catalogue.records
+    ]
+    return JSONResponse(jsonable_encoder(provinces)).body
+
+
+def main() -> None:
+    catalogue = build_catalogue()
+    cache = ProvinceResponseCache(gzip_enabled=True)
+
+    results = {
+        "validate + encode per request": timeit.timeit(
+            lambda: current_path(catalogue), number=ROUNDS
+        ),
+        "cached bytes": timeit.timeit(
+            lambda: cache.get(catalogue, None, accept_gzip=False), number=ROUNDS
+        ),
+        "cached gzip bytes": timeit.timeit(
+            lambda: cache.get(catalogue, None, accept_gzip=True), number=ROUNDS
+        ),
+    }
+
+    body, _ = cache.get(catalogue, None, accept_gzip=False)
+    gzip_body, _ = cache.get(catalogue, None, accept_gzip=True)
+    print(f"{len(catalogue.records)} provinces, {len(body)} bytes ({len(gzip_body)} gzipped)")
+    for name, seconds in results.items():
+        print(f"{name:<32} {seconds / ROUNDS * 1e6:>10.1f} µs/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_quote_engine.py
+# * python -m benchmarks.bench_quote_engine
+import random
+import time
+from decimal import Decimal
+
+from app.models import CityTierEnum
+from app.routes.quote_route import build_quote_batch_response
+from app.schemas.quote_schema import QuoteLineIn
+from app.utils.fast_json import dumps
+from app.utils.province_catalogue import CatalogueSnapshot, ProvinceRecord
+from app.utils.project_settings import project_settings
+
+LINES = 100_000
+
+
+def build_catalogue() -> CatalogueSnapshot:
+    return CatalogueSnapshot.build(
+        1,
+        [
+            ProvinceRecord(
+                id=province_id,
+                name_th=f"จังหวัด {province_id}",
+                name_en=None,
+                region="North",
+                city_tier=CityTierEnum.MAIN if province_id <= 22 else CityTierEnum.SECONDARY,
+                tax_reduction_rate=Decimal("1.00") if province_id <= 22 else Decimal("1.50"),
+                tax_description=None,
+            )
+            for province_id in range(1, 78)
+        ],
+    )
+
+
+def timed(label: str, fn) -> object:
+    started = time.perf_counter()
+    result = fn()
+    print(f"{label:<32} {(time.perf_counter() - started) * 1000:>8.1f} ms")
+    return result
+
+
+def main() -> None:
+    catalogue = build_catalogue()
+    rng = random.Random(7)
+    raw_lines = [
+        {
+            "province_id": rng.randint(1, 77),
+            "nights": rng.randint(1, 5),
+            "total_cost": f"{rng.randint(0, 2_000_000) / 100:.2f}",
+        }
+        for _ in range(LINES)
+    ]
+    lines = [QuoteLineIn.model_validate(line) for line in raw_lines]
+    body = dumps({"lines": raw_lines})
+    quote_engine = project_settings.current.quote_engine
+
+    print(f"{LINES} quote lines")
+    timed(
+        "Decimal quote() per line",
+        lambda: [quote_engine.quote(line, catalogue.by_id[line.province_id]) for line in lines],
+    )
+    batch = timed(
+        "quote_batch() satang columns", lambda: quote_engine.quote_batch(catalogue, lines)
+    )
+    timed("batch rows() for JSON", lambda: batch.rows())  # type: ignore
+    timed("endpoint body -> JSON bytes", lambda: build_quote_batch_response(body, catalogue))
+
+
+if __name__ == "__main__":
+    main()
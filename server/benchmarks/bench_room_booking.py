@@ -0,0 +1,168 @@
+# benchmarks/bench_room_booking.py
+# * python -m benchmarks.bench_room_booking
+import asyncio
+import os
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.crud import booking_crud
+from app.database.session import create_sqlite_engine
+from app.models import Booking, BookingStatusEnum, RoomInventory
+from app.tests.test_booking import FLASH_SALE_START, seed_flash_sale
+from app.utils.province_catalogue import province_catalogue
+
+BOOKERS = (200, 500, 1000)
+ROOMS = 50
+DAYS = 3
+# * ช่วงเข้าพัก (คืนแรก, วันเช็คเอาท์) นับจากวันเปิดขาย ทับกันบางคืน
+STAYS = [(0, 2), (1, 3), (0, 3), (0, 1)]
+
+
+async def book_read_check_write(
+    session: AsyncSession, tourist_id: int, check_in: date, check_out: date
+) -> None:
+    # * แบบเดิม: อ่านห้องว่างทุกคืนด้วย ORM ตรวจใน Python แล้วหักทีละแถว
+    nights = (
+        (
+            await session.execute(
+                select(RoomInventory).where(
+                    RoomInventory.operator_id == 1,
+                    RoomInventory.stay_date >= check_in,
+                    RoomInventory.stay_date < check_out,
+                )
+            )
+        )
+        .scalars()
+        .all()
+    )
+    if len(nights) != (check_out - check_in).days or any(
+        night.available_rooms <= 0 for night in nights
+    ):
+        raise HTTPException(status_code=409, detail="No rooms available")
+    for night in nights:
+        night.available_rooms -= 1  # type: ignore
+    total_cost = sum((night.price_per_night for night in nights), Decimal("0.00"))
+    session.add(
+        Booking(
+            tourist_id=tourist_id,
+            hotel_operator_id=1,
+            check_in_date=check_in,
+            check_out_date=check_out,
+            num_nights=len(nights),
+            total_cost=total_cost,
+            subsidy_rate=Decimal("0.40"),
+            government_subsidy=total_cost * Decimal("0.40"),
+            tourist_payment=total_cost * Decimal("0.60"),
+            booking_status=BookingStatusEnum.BOOKED,
+        )
+    )
+    await session.commit()
+
+
+async def run(bookers: int, conditional: bool) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+        # * แบบเดิมใช้ engine legacy (transaction แบบ deferred) ส่วนแบบใหม่ใช้ writer ที่ตั้งค่าแล้ว
+        engine = create_sqlite_engine(
+            url, profile="tuned" if conditional else "legacy", pool_size=1
+        )
+        session_factory = async_sessionmaker(
+            bind=engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with engine.begin() as conn:
+            await seed_flash_sale(conn, rooms=ROOMS, days=DAYS, tourists=bookers)
+        province_catalogue.clear()
+
+        outcomes = {"booked": 0, "sold_out": 0, "errors": 0}
+        latencies: list[float] = []
+
+        async def booker(tourist_id: int) -> None:
+            first_night, check_out_day = STAYS[tourist_id % len(STAYS)]
+            check_in = FLASH_SALE_START + timedelta(days=first_night)
+            check_out = FLASH_SALE_START + timedelta(days=check_out_day)
+            started = time.perf_counter()
+            async with session_factory() as session:
+                try:
+                    if conditional:
+                        await booking_crud.create_booking(
+                            session,
+                            tourist_id=tourist_id,
+                            hotel_operator_id=1,
+                            check_in_date=check_in,
+                            check_out_date=check_out,
+                        )
+                    else:
+                        await book_read_check_write(session, tourist_id, check_in, check_out)
+                    outcomes["booked"] += 1
+                except HTTPException:
+                    outcomes["sold_out"] += 1
+                except (IntegrityError, OperationalError):
+                    outcomes["errors"] += 1
+            latencies.append(time.perf_counter() - started)
+
+        # * เปิดขายพร้อมกันทุกคน
+        started = time.perf_counter()
+        await asyncio.gather(*(booker(tourist_id) for tourist_id in range(2, bookers + 2)))
+        elapsed = time.perf_counter() - started
+
+        async with session_factory() as session:
+            bookings = (
+                await session.execute(
+                    select(Booking.check_in_date, Booking.check_out_date).where(
+                        Booking.booking_status == BookingStatusEnum.BOOKED
+                    )
+                )
+            ).all()
+            inventory = (
+                await session.execute(
+                    select(RoomInventory.stay_date, RoomInventory.available_rooms)
+                )
+            ).all()
+        await engine.dispose()
+        province_catalogue.clear()
+
+        booked_nights = Counter(
+            booking.check_in_date + timedelta(days=offset)
+            for booking in bookings
+            for offset in range((booking.check_out_date - booking.check_in_date).days)
+        )
+        latencies.sort()
+        return {
+            **outcomes,
+            # * คืนที่ขายเกินจำนวนห้อง และคืนที่ยอดห้องว่างไม่ตรงกับการจองที่บันทึกไว้
+            "oversold": sum(max(count - ROOMS, 0) for count in booked_nights.values()),
+            "mismatched": sum(
+                abs(booked_nights[stay_date] - (ROOMS - available))
+                for stay_date, available in inventory
+            ),
+            "requests_per_s": bookers / elapsed,
+            "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        }
+
+
+async def main() -> None:
+    print(f"flash sale: {ROOMS} rooms x {DAYS} nights, stays {STAYS}")
+    print(
+        f"{'bookers':>7} {'mode':<20} {'req/s':>8} {'p99 ms':>8} {'booked':>6} "
+        f"{'soldout':>7} {'oversold':>8} {'mismatch':>8} {'errors':>6}"
+    )
+    for bookers in BOOKERS:
+        for conditional in (False, True):
+            result = await run(bookers, conditional)
+            mode = "conditional UPDATE" if conditional else "read-check-write"
+            print(
+                f"{bookers:>7} {mode:<20} {result['requests_per_s']:>8.1f} "
+                f"{result['p99_ms']:>8.1f} {result['booked']:>6} {result['sold_out']:>7} "
+                f"{result['oversold']:>8} {result['mismatched']:>8} {result['errors']:>6}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
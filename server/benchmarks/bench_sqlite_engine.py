@@ -0,0 +1,101 @@
+# benchmarks/bench_sqlite_engine.py
+# * python -m benchmarks.bench_sqlite_engine
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.database.base import Base
+from app.database.session import create_sqlite_engine
+from app.models import CityTierEnum, Province, User, UserTravel, UserTypeEnum
+
+READERS = 32
+WRITERS = 8
+DURATION = 5.0
+
+
+async def seed(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(User).values(
+                id=1,
+                email="bench@example.com",
+                phone_number="0812345678",
+                citizen_id="0123456789123",
+                password_hash="hash",
+                first_name_th="ชื่อ",
+                last_name_th="นามสกุล",
+                user_type=UserTypeEnum.TOURIST,
+            )
+        )
+        await conn.execute(
+            insert(Province).values(
+                id=1, name_th="น่าน", region="North", city_tier=CityTierEnum.SECONDARY
+            )
+        )
+
+
+async def run_profile(profile: str) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+        engine = create_sqlite_engine(url, profile=profile)  # type: ignore
+        session_factory = async_sessionmaker(bind=engine, class_=AsyncSession)
+        await seed(engine)
+
+        counters = {"reads": 0, "writes": 0, "errors": 0}
+        deadline = time.perf_counter() + DURATION
+
+        async def reader() -> None:
+            while time.perf_counter() < deadline:
+                try:
+                    async with session_factory() as session:
+                        result = await session.execute(
+                            select(UserTravel).filter(UserTravel.user_id == 1).limit(50)
+                        )
+                        result.scalars().all()
+                    counters["reads"] += 1
+                except OperationalError:
+                    counters["errors"] += 1
+
+        async def writer() -> None:
+            while time.perf_counter() < deadline:
+                try:
+                    async with session_factory() as session:
+                        session.add(
+                            UserTravel(
+                                user_id=1,
+                                province_id=1,
+                                start_date=date(2025, 1, 1),
+                                end_date=date(2025, 1, 2),
+                            )
+                        )
+                        await session.commit()
+                    counters["writes"] += 1
+                except OperationalError:
+                    counters["errors"] += 1
+
+        await asyncio.gather(
+            *(reader() for _ in range(READERS)), *(writer() for _ in range(WRITERS))
+        )
+        await engine.dispose()
+        return counters
+
+
+async def main() -> None:
+    print(f"{READERS} readers + {WRITERS} writers for {DURATION:.0f}s per profile")
+    for profile in ("legacy", "tuned"):
+        counters = await run_profile(profile)
+        print(
+            f"{profile:<8} reads/s {counters['reads'] / DURATION:>9.1f}"
+            f"   writes/s {counters['writes'] / DURATION:>8.1f}"
+            f"   errors {counters['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())